@@ -0,0 +1,336 @@
+"""Vectorized batch engine that steps many Pacman games at once.
+
+Every game's state lives in NumPy arrays indexed by game (and ghost), so one
+call to BatchGame.step advances all of them with the same movement, collision
+and scoring rules as game_core.GameCore. Finished games are reset in place.
+Requires NumPy.
+"""
+import numpy as np
+
+from game_core import (CELL_SIZE, PLAYING, GAME_OVER, WIN, PACMAN_START, GHOST_SPAWNS,
+                       START_LIVES, DOT_SCORE, PELLET_SCORE, CATCH_DISTANCE_SQ,
+                       create_maze, create_dots, create_power_pellets)
+from maze import Maze
+from movement import (SUBPIXELS, CELL_UNITS, DIRECTION_BITS, DIRECTION_DX,
+                      DIRECTION_DY, OPPOSITE, Walkability, to_units)
+from pathfinding import (MODE_SCHEDULE, SCATTER, CHASE, CLYDE_SHYNESS, UNREACHABLE,
+                         BOUNDED_SEARCH_CELLS, distance_table, scatter_corners)
+
+PACMAN_STEP = to_units(2)
+GHOST_STEP = to_units(1.5)
+
+# The all-pairs distance table takes 2 * cells ** 2 bytes (128 MB here); past
+# this size GhostAI's searches are bounded and no full table exists
+MAX_CELLS = BOUNDED_SEARCH_CELLS
+
+# Per-direction tables (0: right, 1: down, 2: left, 3: up)
+DIR_DX = np.array(DIRECTION_DX, dtype=np.int64)
+DIR_DY = np.array(DIRECTION_DY, dtype=np.int64)
+DIR_BITS = np.array(DIRECTION_BITS, dtype=np.uint8)
+DIR_OPPOSITE = np.array(OPPOSITE, dtype=np.int64)
+
+
+def maze_array(maze=None):
+    """Return the maze grid as a (height, width) uint8 array"""
+    if maze is None:
+        maze = create_maze()
+    if isinstance(maze, Maze):
+        return np.frombuffer(maze.cells, dtype=np.uint8).reshape(maze.height, maze.width).copy()
+    return np.asarray(maze, dtype=np.uint8)
+
+
+def distance_array(table):
+    """Full all-pairs distance table as a (cells, cells) uint16 array"""
+    if table.size > MAX_CELLS:
+        raise ValueError(f"BatchGame needs an all-pairs distance table; "
+                         f"mazes are limited to {MAX_CELLS} cells, got {table.size}")
+    table.precompute()
+    distances = np.full((table.size, table.size), UNREACHABLE, dtype=np.uint16)
+    for cell, row in table.rows.items():
+        distances[cell] = np.frombuffer(row, dtype=np.uint16)
+    return distances
+
+
+def mode_array():
+    """Ghost mode for each frame up to the last switch of MODE_SCHEDULE"""
+    modes = []
+    for scatter, chase in MODE_SCHEDULE:
+        modes += [SCATTER] * scatter
+        if chase is not None:
+            modes += [CHASE] * chase
+    modes.append(CHASE)
+    return np.array(modes, dtype=np.int64)
+
+
+def item_bitmap(positions, shape):
+    """Turn a list of pixel centres into a boolean per-cell bitmap"""
+    bitmap = np.zeros(shape, dtype=bool)
+    for x, y in positions:
+        bitmap[y // CELL_SIZE, x // CELL_SIZE] = True
+    return bitmap
+
+
+class BatchGame:
+    """N independent games stored as arrays and stepped together.
+
+    Finished games are reset at the end of every step, so all games are
+    playing when a step starts and no per-game state masks are needed.
+    """
+
+    def __init__(self, num_games, seed=None, maze=None):
+        self.num_games = num_games
+        self.maze = maze_array(maze)
+        self.width = self.maze.shape[1]
+        maze_rows = self.maze.tolist()
+        walkability = Walkability(maze_rows)
+        self.walk = np.frombuffer(bytes(walkability.masks), dtype=np.uint8)
+        self.offsets = np.array([1, self.width, -1, -self.width], dtype=np.int64)
+        self.initial_dots = item_bitmap(create_dots(maze_rows), self.maze.shape)
+        self.initial_pellets = item_bitmap(create_power_pellets(maze_rows), self.maze.shape)
+        self.initial_count = int(self.initial_dots.sum() + self.initial_pellets.sum())
+        self.num_ghosts = len(GHOST_SPAWNS)
+        self.ghost_start_x = np.array([to_units(g[0]) for g in GHOST_SPAWNS], dtype=np.int64)
+        self.ghost_start_y = np.array([to_units(g[1]) for g in GHOST_SPAWNS], dtype=np.int64)
+
+        # Ghost targeting tables, matching pathfinding.GhostAI
+        table = distance_table(walkability)
+        self.distances = distance_array(table)
+        self.nearest_open = np.frombuffer(table.nearest_open_cells(), dtype=np.int64)
+        self.modes = mode_array()
+        names = [g[3] for g in GHOST_SPAWNS]
+        corners = scatter_corners(table)
+        self.ghost_corner = np.array([corners.get(name, -1) for name in names], dtype=np.int64)
+        self.ghost_is = {name: np.array([n == name for n in names]) for name in corners}
+        self.blinky = names.index("Blinky") if "Blinky" in names else None
+
+        n, g = num_games, self.num_ghosts
+        # Positions are fixed-point sub-pixel units, as in movement.Mover;
+        # gap is the distance left to the next cell centre (0 at a centre)
+        self.pacman_x = np.empty(n, dtype=np.int64)
+        self.pacman_y = np.empty(n, dtype=np.int64)
+        self.pacman_gap = np.empty(n, dtype=np.int64)
+        self.pacman_direction = np.empty(n, dtype=np.int64)
+        self.pacman_next_direction = np.empty(n, dtype=np.int64)
+        self.ghost_x = np.empty((n, g), dtype=np.int64)
+        self.ghost_y = np.empty((n, g), dtype=np.int64)
+        self.ghost_gap = np.empty((n, g), dtype=np.int64)
+        self.ghost_direction = np.empty((n, g), dtype=np.int64)
+        self.ghost_next_direction = np.empty((n, g), dtype=np.int64)
+        self.dots = np.empty((n,) + self.maze.shape, dtype=bool)
+        self.pellets = np.empty((n,) + self.maze.shape, dtype=bool)
+        self.dot_count = np.empty(n, dtype=np.int64)
+        self.score = np.empty(n, dtype=np.int64)
+        self.lives = np.empty(n, dtype=np.int64)
+        self.state = np.empty(n, dtype=np.int64)
+        self.frame = np.empty(n, dtype=np.int64)
+        # Score and outcome of the episode that ended on the last step
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_state = np.full(n, PLAYING, dtype=np.int64)
+        # Offset of each game's first cell in the flattened item bitmaps
+        self.cell_base = np.arange(n, dtype=np.int64) * self.maze.size
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Reset every game and reseed the batch RNG"""
+        self.rng = np.random.default_rng(seed)
+        self.reset_games(np.ones(self.num_games, dtype=bool))
+
+    def reset_games(self, mask):
+        """Reset the games selected by a boolean mask"""
+        self.pacman_x[mask] = to_units(PACMAN_START[0])
+        self.pacman_y[mask] = to_units(PACMAN_START[1])
+        self.pacman_gap[mask] = 0
+        self.pacman_direction[mask] = 0
+        self.pacman_next_direction[mask] = 0
+        self.reset_ghosts(mask)
+        self.ghost_direction[mask] = 0
+        self.ghost_next_direction[mask] = 0
+        self.dots[mask] = self.initial_dots
+        self.pellets[mask] = self.initial_pellets
+        self.dot_count[mask] = self.initial_count
+        self.score[mask] = 0
+        self.lives[mask] = START_LIVES
+        self.state[mask] = PLAYING
+        self.frame[mask] = 0
+
+    def reset_ghosts(self, mask):
+        self.ghost_x[mask] = self.ghost_start_x
+        self.ghost_y[mask] = self.ghost_start_y
+        self.ghost_gap[mask] = 0
+
+    def advance(self, x, y, gap, direction, next_direction, step, ghosts):
+        """Vectorized Mover.advance over flat arrays, updated in place.
+
+        Actors travel straight towards the next cell centre in one pass; only
+        the few that reach a centre with distance to spare look up the
+        walkability table and decide where to go.
+        """
+        # Reversing turns the distance ahead into the distance behind
+        reverse = next_direction == DIR_OPPOSITE[direction]
+        np.copyto(direction, next_direction, where=reverse)
+        np.subtract(CELL_UNITS, gap, out=gap, where=reverse & (gap > 0))
+
+        travel = np.minimum(gap, step)
+        x += DIR_DX[direction] * travel
+        y += DIR_DY[direction] * travel
+        gap -= travel
+
+        # A step is shorter than a cell, so at most one centre is reached
+        idx = np.flatnonzero(travel < step)
+        if not idx.size:
+            return
+        cell = (y[idx] // CELL_UNITS) * self.width + x[idx] // CELL_UNITS
+        mask = self.walk[cell]
+        heading = direction[idx]
+        if ghosts:
+            heading = self.steer(idx, cell, mask, heading)
+            next_direction[idx] = heading
+        else:
+            wanted = next_direction[idx]
+            heading = np.where(mask & DIR_BITS[wanted], wanted, heading)
+        open_ahead = (mask & DIR_BITS[heading]) != 0
+        direction[idx] = heading
+
+        rest = np.where(open_ahead, step - travel[idx], 0)
+        x[idx] += DIR_DX[heading] * rest
+        y[idx] += DIR_DY[heading] * rest
+        gap[idx] = np.where(open_ahead, CELL_UNITS - rest, 0)
+
+    def move_ghosts(self):
+        # Ghosts turn around whenever the scatter / chase mode changes
+        self.mode = self.modes[np.minimum(self.frame, self.modes.size - 1)]
+        switched = np.flatnonzero(self.mode != self.modes[np.minimum(self.frame - 1, self.modes.size - 1)])
+        if switched.size:
+            self.ghost_next_direction[switched] = DIR_OPPOSITE[self.ghost_direction[switched]]
+
+        # Shared per-game targeting state, as in GhostAI.update
+        self.pacman_cell = (self.pacman_y // CELL_UNITS) * self.width + self.pacman_x // CELL_UNITS
+        if self.blinky is not None:
+            self.blinky_cell = ((self.ghost_y[:, self.blinky] // CELL_UNITS) * self.width
+                                + self.ghost_x[:, self.blinky] // CELL_UNITS)
+
+        self.advance(self.ghost_x.reshape(-1), self.ghost_y.reshape(-1),
+                     self.ghost_gap.reshape(-1), self.ghost_direction.reshape(-1),
+                     self.ghost_next_direction.reshape(-1), GHOST_STEP, ghosts=True)
+
+    def open_cell(self, cell_x, cell_y):
+        """Vectorized DistanceTable.nearest_open"""
+        cell_x = np.clip(cell_x, 0, self.width - 1)
+        cell_y = np.clip(cell_y, 0, self.maze.shape[0] - 1)
+        return self.nearest_open[cell_y * self.width + cell_x]
+
+    def ahead_of_pacman(self, games, cells):
+        pacman_cell = self.pacman_cell[games]
+        direction = self.pacman_direction[games]
+        return self.open_cell(pacman_cell % self.width + DIR_DX[direction] * cells,
+                              pacman_cell // self.width + DIR_DY[direction] * cells)
+
+    def steer(self, idx, cell, mask, heading):
+        """Vectorized GhostAI.choose_direction for ghosts at cell centres"""
+        games = idx // self.num_ghosts
+        kinds = idx % self.num_ghosts
+        pacman_cell = self.pacman_cell[games]
+        target = pacman_cell.copy()
+
+        chasing = self.mode[games] == CHASE
+        pinky = chasing & self.ghost_is["Pinky"][kinds]
+        if pinky.any():
+            target[pinky] = self.ahead_of_pacman(games[pinky], 4)
+        inky = chasing & self.ghost_is["Inky"][kinds]
+        if inky.any() and self.blinky is not None:
+            pivot = self.ahead_of_pacman(games[inky], 2)
+            blinky = self.blinky_cell[games[inky]]
+            target[inky] = self.open_cell(2 * (pivot % self.width) - blinky % self.width,
+                                          2 * (pivot // self.width) - blinky // self.width)
+        home = self.ghost_corner[kinds] >= 0
+        home &= ~chasing | (self.ghost_is["Clyde"][kinds]
+                            & (self.distances[pacman_cell, cell] < CLYDE_SHYNESS))
+        target[home] = self.ghost_corner[kinds[home]]
+
+        # Open exits other than straight back, nearest to the target first;
+        # jitter under one cell breaks ties at random
+        exits = cell[:, None] + self.offsets
+        distance = self.distances[target[:, None], exits] + self.rng.random(exits.shape) * 0.5
+        options = (mask[:, None] & DIR_BITS) != 0
+        back = DIR_OPPOSITE[heading]
+        forward = options.copy()
+        forward[np.arange(idx.size), back] = False
+        choice = np.where(forward, distance, np.inf).argmin(axis=1)
+        dead_end = ~forward.any(axis=1)
+        if dead_end.any():
+            choice[dead_end] = np.where(options[dead_end, back[dead_end]],
+                                        back[dead_end], heading[dead_end])
+        return choice
+
+    def collect(self, items, radius):
+        """Clear items within radius of Pacman and return how many were taken.
+
+        Pacman is always on a grid line and both pickup radii are under a
+        cell, so only its own cell and the neighbour it is heading between
+        can be in reach.
+        """
+        px = self.pacman_x // SUBPIXELS
+        py = self.pacman_y // SUBPIXELS
+        cell_x = px // CELL_SIZE
+        cell_y = py // CELL_SIZE
+        off_x = px - (cell_x * CELL_SIZE + CELL_SIZE // 2)
+        off_y = py - (cell_y * CELL_SIZE + CELL_SIZE // 2)
+        side_x = np.sign(off_x)
+        side_y = np.sign(off_y)
+        flat = items.reshape(-1)
+        limit = radius * radius
+
+        own = self.cell_base + cell_y * self.width + cell_x
+        own_hit = (off_x * off_x + off_y * off_y < limit) & flat[own]
+        far_x = off_x - side_x * CELL_SIZE
+        far_y = off_y - side_y * CELL_SIZE
+        near = own + side_y * self.width + side_x
+        near_hit = (far_x * far_x + far_y * far_y < limit) & (near != own) & flat[near]
+        flat[own[own_hit]] = False
+        flat[near[near_hit]] = False
+        return own_hit.astype(np.int64) + near_hit
+
+    def step(self, actions=None):
+        """Advance every game one frame and return (rewards, dones).
+
+        actions is an array of directions, one per game, or None to keep the
+        current inputs. Games that finish are reset before returning; their
+        last score and state are kept in final_score and final_state.
+        """
+        if actions is not None:
+            self.pacman_next_direction[:] = actions
+        self.frame += 1
+        previous_score = self.score.copy()
+
+        self.advance(self.pacman_x, self.pacman_y, self.pacman_gap, self.pacman_direction,
+                     self.pacman_next_direction, PACMAN_STEP, ghosts=False)
+        self.move_ghosts()
+
+        dots = self.collect(self.dots, 15)
+        pellets = self.collect(self.pellets, 18)
+        self.score += dots * DOT_SCORE + pellets * PELLET_SCORE
+        self.dot_count -= dots + pellets
+
+        # Ghost collisions: a death resets positions, so only the first ghost
+        # counts unless it was the last life
+        dx = self.pacman_x[:, None] - self.ghost_x
+        dy = self.pacman_y[:, None] - self.ghost_y
+        hits = (dx * dx + dy * dy < CATCH_DISTANCE_SQ).sum(axis=1)
+        if hits.any():
+            respawn = (hits > 0) & (self.lives > 1)
+            self.lives -= np.where(respawn, 1, hits)
+            self.state[(hits > 0) & (self.lives <= 0)] = GAME_OVER
+            self.pacman_x[respawn] = to_units(PACMAN_START[0])
+            self.pacman_y[respawn] = to_units(PACMAN_START[1])
+            self.pacman_gap[respawn] = 0
+            self.reset_ghosts(respawn)
+
+        self.state[self.dot_count == 0] = WIN
+
+        rewards = self.score - previous_score
+        dones = self.state != PLAYING
+        if dones.any():
+            self.final_score[dones] = self.score[dones]
+            self.final_state[dones] = self.state[dones]
+            self.reset_games(dones)
+        return rewards, dones
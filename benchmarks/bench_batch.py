@@ -0,0 +1,46 @@
+"""Compare BatchGame throughput with looping over GameCore objects.
+
+Usage: python benchmarks/bench_batch.py [num_games] [steps]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from batch_env import BatchGame
+from game_core import GameCore
+
+
+def bench_loop(num_games, steps):
+    games = [GameCore(seed=i) for i in range(num_games)]
+    start = time.perf_counter()
+    for step in range(steps):
+        action = (step // 30) % 4
+        for game in games:
+            _, done = game.step(action)
+            if done:
+                game.reset()
+    return num_games * steps / (time.perf_counter() - start)
+
+
+def bench_batch(num_games, steps):
+    batch = BatchGame(num_games, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, size=(steps // 30 + 1, num_games))
+    start = time.perf_counter()
+    for step in range(steps):
+        batch.step(actions[step // 30])
+    return num_games * steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    loop_rate = bench_loop(min(num_games, 16), steps)
+    batch_rate = bench_batch(num_games, steps)
+    print(f"GameCore loop : {loop_rate:12,.0f} game-steps/s")
+    print(f"BatchGame x{num_games}: {batch_rate:12,.0f} game-steps/s")
+    print(f"speedup       : {batch_rate / loop_rate:12.1f}x")
@@ -0,0 +1,98 @@
+"""Cost of gameplay capture on the game loop (SDL dummy video driver).
+
+Frames are paced at 60 per second like the real game loop. The script
+times the work of each frame, Game.draw() plus a simulation tick, with
+capture off, with the background writer (raw and compressed), and with the naive
+approach of converting and writing each frame inside the loop. Reports the
+main-thread frame time and how many frames the writer dropped, and checks
+that captured frames read back identical to the screen.
+
+Usage: python benchmarks/bench_capture.py [frames]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from capture import FrameCapture, frame_surface, read_capture
+from pac_man import Game
+
+FPS = 60
+
+
+class SynchronousCapture:
+    """Convert and write every frame in the game loop, for comparison"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+
+    def capture(self, surface, tick=0):
+        self.file.write(pygame.image.tobytes(surface, "RGB"))
+
+    def close(self):
+        self.file.close()
+
+
+def run(capture, frames):
+    game = Game(seed=0)
+    game.verbose = False
+    game.capture = capture
+    rng = random.Random(0)
+    times = []
+    deadline = time.perf_counter()
+    for frame in range(frames):
+        start = time.perf_counter()
+        if frame % 20 == 0:
+            game.pacman.next_direction = rng.randrange(4)
+        game.update()
+        game.draw()
+        times.append(time.perf_counter() - start)
+        deadline += 1 / FPS
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+    if capture is not None:
+        capture.close()
+    times.sort()
+    return 1e3 * statistics.median(times), 1e3 * times[int(0.99 * len(times))]
+
+
+def check_round_trip(path):
+    game = Game(seed=0)
+    game.verbose = False
+    capture = game.capture = FrameCapture(path)
+    expected = []
+    for _ in range(10):
+        game.update()
+        game.draw()
+        expected.append(pygame.image.tobytes(game.screen, "RGB"))
+    capture.close()
+    frames = read_capture(path)
+    info = next(frames)
+    for (tick, data), screen in zip(frames, expected):
+        if pygame.image.tobytes(frame_surface(info, data), "RGB") != screen:
+            raise AssertionError(f"captured frame at tick {tick} differs from the screen")
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "capture.pmv")
+        check_round_trip(path)
+        print("round trip: captured frames match the screen")
+        print(f"{'mode':14} {'p50 ms':>8} {'p99 ms':>8} {'dropped':>8}")
+        for mode in ("off", "raw", "compressed", "synchronous"):
+            if mode == "off":
+                capture = None
+            elif mode == "synchronous":
+                capture = SynchronousCapture(path)
+            else:
+                capture = FrameCapture(path, compress=mode == "compressed")
+            p50, p99 = run(capture, frames)
+            dropped = getattr(capture, "dropped", 0)
+            print(f"{mode:14} {p50:8.2f} {p99:8.2f} {dropped:8}")
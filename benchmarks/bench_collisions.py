@@ -0,0 +1,101 @@
+"""Ghost collision checks: spatial hash against testing every ghost.
+
+BruteForceCore restores the old loop over all ghosts. Both games play the
+same inputs and must end in the same state; then, for 10, 100 and 1000
+ghosts, the script times a whole update(), the Pacman-vs-ghosts check alone
+and a ghost-vs-ghost pair query.
+
+Usage: python benchmarks/bench_collisions.py [--quick]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_core import CATCH_DISTANCE, CATCH_DISTANCE_SQ, GAME_OVER, PLAYING, GameCore
+from pathfinding import distance_table
+from suite import configure, stepper
+
+GHOST_COUNTS = [10, 100, 1000]
+# Small enough for the whole distance table to stay cached, so update()
+# timings are not dominated by ghost path searches
+MAZE_SIZE = (64, 48)
+FRAMES = 2000
+
+
+class BruteForceCore(GameCore):
+    def check_ghost_collisions(self):
+        for ghost in self.ghosts:
+            dx = self.pacman.fx - ghost.fx
+            dy = self.pacman.fy - ghost.fy
+            if dx * dx + dy * dy < CATCH_DISTANCE_SQ:
+                self.lives -= 1
+                if self.lives <= 0:
+                    self.state = GAME_OVER
+                else:
+                    self.reset_positions()
+
+
+def all_pairs(ghosts, radius):
+    limit = radius * radius
+    found = []
+    for i, ghost in enumerate(ghosts):
+        for j in range(i + 1, len(ghosts)):
+            dx = ghost.fx - ghosts[j].fx
+            dy = ghost.fy - ghosts[j].fy
+            if dx * dx + dy * dy < limit:
+                found.append((i, j))
+    return found
+
+
+def play(game, frames):
+    rng = random.Random(0)
+    deaths = 0
+    for frame in range(frames):
+        if frame % 15 == 0:
+            action = rng.randrange(4)
+        lives = game.lives
+        game.step(action)
+        deaths += lives - game.lives if game.state == PLAYING else 0
+        if game.state != PLAYING:
+            game.reset(frame)
+    return game.state_hash(), deaths
+
+
+def per_call(function, min_time):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        for _ in range(20):
+            function()
+        calls += 20
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+if __name__ == "__main__":
+    min_time = 0.2 if "--quick" in sys.argv else 1.0
+    width, height = MAZE_SIZE
+    for ghosts in GHOST_COUNTS:
+        hashed = configure(GameCore, width, height, ghosts)(seed=1)
+        brute = configure(BruteForceCore, width, height, ghosts)(seed=1)
+        result = play(hashed, FRAMES)
+        if result != play(brute, FRAMES):
+            raise AssertionError(f"spatial hash changed the game with {ghosts} ghosts")
+        if hashed.spatial.pairs(CATCH_DISTANCE) != all_pairs(hashed.ghosts, CATCH_DISTANCE):
+            raise AssertionError(f"pair query missed ghosts with {ghosts} ghosts")
+        print(f"{ghosts} ghosts: identical over {FRAMES} frames ({result[1]} deaths)")
+
+        distance_table(hashed.walk).precompute()
+        hashed.reset(0)
+        brute.reset(0)
+        update = (per_call(stepper(brute), min_time), per_call(stepper(hashed), min_time))
+        check = (per_call(brute.check_ghost_collisions, min_time),
+                 per_call(hashed.check_ghost_collisions, min_time))
+        pairs = (per_call(lambda: all_pairs(hashed.ghosts, CATCH_DISTANCE), min_time),
+                 per_call(lambda: hashed.spatial.pairs(CATCH_DISTANCE), min_time))
+        for name, (old, new) in (("update", update), ("pacman vs ghosts", check),
+                                 ("ghost pairs", pairs)):
+            print(f"  {name:17} all ghosts {old:10.1f} us   spatial hash {new:8.1f} us"
+                  f"   {old / new:6.1f}x")
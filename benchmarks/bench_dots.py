@@ -0,0 +1,58 @@
+"""Per-frame dot collection cost: list scan versus the cell-indexed ItemGrid.
+
+The list scan is the original Game.update loop. With ItemGrid the cost per
+frame should stay flat as the number of dots grows.
+
+Usage: python benchmarks/bench_dots.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_core import CELL_SIZE, ItemGrid
+
+FRAMES = 2000
+
+
+def dot_positions(side):
+    half = CELL_SIZE // 2
+    return [(x * CELL_SIZE + half, y * CELL_SIZE + half) for y in range(side) for x in range(side)]
+
+
+def pacman_path(side):
+    rng = random.Random(0)
+    return [(rng.randrange(side * CELL_SIZE), rng.randrange(side * CELL_SIZE)) for _ in range(FRAMES)]
+
+
+def bench_list(dots, path):
+    start = time.perf_counter()
+    for px, py in path:
+        for dot in dots[:]:
+            dot_x, dot_y = dot
+            distance = ((px - dot_x) ** 2 + (py - dot_y) ** 2) ** 0.5
+            if distance < 15:
+                dots.remove(dot)
+    return (time.perf_counter() - start) / len(path)
+
+
+def bench_grid(grid, path):
+    start = time.perf_counter()
+    for px, py in path:
+        grid.collect(px, py, 15)
+    return (time.perf_counter() - start) / len(path)
+
+
+if __name__ == "__main__":
+    print(f"{'dots':>9} {'list scan':>12} {'ItemGrid':>12}")
+    for side in (10, 20, 40, 80, 160, 320):
+        positions = dot_positions(side)
+        path = pacman_path(side)
+        grid_time = bench_grid(ItemGrid(side, side, positions), path)
+        if side <= 80:
+            list_time = f"{bench_list(list(positions), path[:200]) * 1e6:9.1f} us"
+        else:
+            list_time = "(skipped)"
+        print(f"{len(positions):>9} {list_time:>12} {grid_time * 1e6:9.2f} us")
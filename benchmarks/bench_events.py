@@ -0,0 +1,89 @@
+"""Event stream: synchronous prints against the ring buffer and EventLog.
+
+Plays the same seeded games twice. The first run prints every event as it
+happens, the way GameCore.update() used to, to a line-buffered file so each
+message costs a write system call as it does on a terminal. The second run
+emits into the EventBuffer while a background EventLog writes JSON lines.
+Prints the mean, 99th percentile and worst tick times of both, and checks
+that both runs logged the same events.
+
+Usage: python benchmarks/bench_events.py [--games N] [--sink PATH]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import TEXT, event_text
+from game_core import PLAYING, GameCore
+
+
+def play(game, games, on_tick=None):
+    """Tick times in microseconds over seeded games with random turns"""
+    times = []
+    for seed in range(games):
+        game.reset(seed)
+        rng = random.Random(seed)
+        while game.state == PLAYING:
+            action = rng.randrange(4) if game.frame % 20 == 0 else None
+            start = time.perf_counter()
+            game.step(action)
+            if on_tick is not None:
+                on_tick()
+            times.append((time.perf_counter() - start) * 1e6)
+    return sorted(times)
+
+
+def printing(game, sink):
+    """Print each event during the tick, as the old verbose update() did"""
+    subscription = game.events.subscribe()
+
+    def on_tick():
+        for event in subscription.poll():
+            print(event_text(event), file=sink)
+    return on_tick
+
+
+def stats(times):
+    return (f"mean {sum(times) / len(times):7.1f} us   p99 {times[len(times) * 99 // 100]:7.1f} us"
+            f"   worst {times[-1]:8.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark buffered game events against prints")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--sink", default=os.devnull,
+                        help="where the printed run writes (default: the null device)")
+    args = parser.parse_args()
+
+    game = GameCore(seed=0)
+    # Warm the lazily filled ghost distance table before timing either run
+    play(game, args.games)
+    directory = tempfile.mkdtemp()
+    printed_path = os.path.join(directory, "printed.txt")
+    logged_path = os.path.join(directory, "logged.txt")
+
+    with open(args.sink, "w", buffering=1) as sink, open(printed_path, "w") as copy:
+        subscription = game.events.subscribe()
+        on_tick = printing(game, sink)
+
+        def print_and_copy():
+            on_tick()
+            for event in subscription.poll():
+                copy.write(event_text(event) + "\n")
+        printed = play(game, args.games, print_and_copy)
+
+    log = game.log_events(logged_path, TEXT)
+    buffered = play(game, args.games)
+    game.close_event_logs()
+
+    with open(printed_path) as f, open(logged_path) as g:
+        if f.read() != g.read():
+            raise AssertionError("the buffered log differs from the printed events")
+    print(f"{len(printed)} ticks, {log.written} events, none missed: {log.missed == 0}")
+    print(f"print per event     {stats(printed)}")
+    print(f"ring buffer + log   {stats(buffered)}")
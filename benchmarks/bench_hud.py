@@ -0,0 +1,106 @@
+"""HUD and overlay cost per frame: cached Hud against rendering every frame.
+
+Times drawing the score and lives, and the game over overlay, three ways:
+the way Game.draw used to (font.render for every label and a new overlay
+Surface each frame), with hud.Hud's cached labels, and with
+Hud.draw_cached, which puts back the composited HUD while nothing changed.
+Covers a steady score and a score that changes every frame, and checks that
+every way draws identical pixels.
+
+Usage: python benchmarks/bench_hud.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from constants import RED, SCREEN_HEIGHT, SCREEN_WIDTH
+from hud import BLACK, LARGE, SMALL, WHITE, YELLOW, Hud, load_font
+
+
+class UncachedHud:
+    """The previous per-frame HUD and overlay drawing"""
+
+    def __init__(self):
+        self.font = load_font(LARGE)
+        self.small_font = load_font(SMALL)
+
+    def draw(self, screen, score, lives):
+        rect = screen.blit(self.font.render(f"Score: {score}", True, BLACK), (12, 12))
+        rect.union_ip(screen.blit(self.font.render(f"Score: {score}", True, WHITE), (10, 10)))
+        rect.union_ip(screen.blit(self.font.render(f"Lives: {lives}", True, BLACK), (12, 52)))
+        rect.union_ip(screen.blit(self.font.render(f"Lives: {lives}", True, WHITE), (10, 50)))
+        for i in range(lives):
+            rect.union_ip(pygame.draw.circle(screen, YELLOW, (120 + i * 25, 65), 8))
+        return rect
+
+    def draw_message(self, screen, title, color):
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        overlay.set_alpha(128)
+        overlay.fill(BLACK)
+        screen.blit(overlay, (0, 0))
+        title_text = self.font.render(title, True, color)
+        restart_text = self.small_font.render("Press SPACE to restart", True, WHITE)
+        screen.blit(title_text, title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20)))
+        screen.blit(restart_text,
+                    restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20)))
+
+
+def backdrop():
+    """A busy frame to draw over, so blending is exercised"""
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for y in range(0, SCREEN_HEIGHT, 20):
+        for x in range(0, SCREEN_WIDTH, 20):
+            surface.fill(((x * 7) % 256, (y * 5) % 256, (x + y) % 256), (x, y, 20, 20))
+    return surface
+
+
+def per_frame(function, min_time=0.5):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        function(calls)
+        calls += 1
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def check(screen, background, old, new):
+    draws = [old.draw, new.draw,
+             lambda screen, score, lives: new.draw_cached(screen, score, lives, 0)]
+    for score, lives in [(0, 3), (1230, 2), (1230, 2), (99990, 1), (40, 0)]:
+        frames = []
+        for draw in draws:
+            screen.blit(background, (0, 0))
+            draw(screen, score, lives)
+            if lives == 0:
+                new.draw_message(screen, "GAME OVER", RED)
+            frames.append(pygame.image.tostring(screen, "RGB"))
+        if len(set(frames)) != 1:
+            raise AssertionError(f"cached HUD differs at score {score}, lives {lives}")
+
+
+if __name__ == "__main__":
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    background = backdrop()
+    old = UncachedHud()
+    new = Hud((SCREEN_WIDTH, SCREEN_HEIGHT))
+    check(screen, background, old, new)
+    print("cached and uncached HUDs draw identical pixels")
+
+    print(f"{'us per frame':22} {'uncached':>10} {'labels':>10} {'composited':>10}")
+    cases = [
+        ("HUD, steady score", lambda i: 1230),
+        ("HUD, score changing", lambda i: 10 * i),
+    ]
+    for name, score in cases:
+        times = [per_frame(lambda i: old.draw(screen, score(i), 3)),
+                 per_frame(lambda i: new.draw(screen, score(i), 3)),
+                 per_frame(lambda i: new.draw_cached(screen, score(i), 3, 0))]
+        print(f"{name:22} {times[0]:10.1f} {times[1]:10.1f} {times[2]:10.1f}")
+    times = [per_frame(lambda i: hud.draw_message(screen, "GAME OVER", RED)) for hud in (old, new)]
+    print(f"{'game over overlay':22} {times[0]:10.1f} {times[1]:10.1f}")
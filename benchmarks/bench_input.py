@@ -0,0 +1,99 @@
+"""Input handling: taps kept by the InputQueue, and press-to-flip latency.
+
+First, plays seeded games headlessly and taps two different directions
+between some frames, with several ticks per frame as in a catch-up burst.
+It counts the taps Pacman actually turned for under the old rule, where the
+last key before a tick wins, and under InputQueue. Then it runs the real
+game loop under the SDL dummy video driver, posting key presses at random
+moments, and prints the InputQueue's press-to-flip and press-to-turn
+statistics.
+
+Usage: python benchmarks/bench_input.py [--frames N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from game_core import PLAYING, GameCore
+from input_queue import InputQueue
+
+
+class LastTapWins(InputQueue):
+    """The old behaviour: one slot, overwritten by every tap"""
+
+    def push(self, direction, pressed_at=None):
+        if self.pending:
+            self.dropped += 1
+        self.pending.clear()
+        super().push(direction, pressed_at)
+
+
+def taps_taken(inputs, games, ticks_per_frame=2):
+    """Taps pushed and taps Pacman turned for over seeded games"""
+    pushed = 0
+    for seed in range(games):
+        game = GameCore(seed=seed)
+        inputs.clear()
+        rng = random.Random(seed)
+        while game.state == PLAYING and game.frame < 3000:
+            if rng.random() < 0.2:
+                first = rng.randrange(4)
+                for direction in (first, (first + rng.choice((1, 3))) % 4):
+                    inputs.push(direction)
+                    pushed += 1
+            for _ in range(ticks_per_frame):
+                inputs.before_tick(game.pacman)
+                game.update()
+                inputs.after_tick(game.pacman)
+    return pushed, inputs.turn_delay.count
+
+
+def live_latency(frames):
+    """Run the game loop for frames frames, pressing keys at random"""
+    import pygame
+    from pac_man import KEY_DIRECTIONS, Game
+
+    game = Game(seed=0)
+    rng = random.Random(0)
+    keys = list(KEY_DIRECTIONS)
+    tick = 1.0 / game.tick_rate
+    lag = 0.0
+    previous = time.perf_counter()
+    for _ in range(frames):
+        # A press lands somewhere within the frame, before events are read
+        time.sleep(rng.random() * 0.004)
+        if rng.random() < 0.3:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(keys)))
+        now = time.perf_counter()
+        lag += now - previous
+        previous = now
+        game.handle_events()
+        steps = 0
+        while lag >= tick and steps < game.max_catchup:
+            game.update()
+            lag -= tick
+            steps += 1
+        lag %= tick
+        game.alpha = lag / tick
+        game.draw()
+        game.clock.tick(game.fps)
+        if game.state != PLAYING:
+            game.reset_game()
+    return game.inputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the timestamped input queue")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=600)
+    args = parser.parse_args()
+
+    for name, inputs in (("last tap wins", LastTapWins()), ("input queue", InputQueue())):
+        pushed, taken = taps_taken(inputs, args.games)
+        print(f"{name:14} {taken:5} of {pushed} taps turned Pacman ({100 * taken / pushed:.0f}%)")
+    print(live_latency(args.frames).report())
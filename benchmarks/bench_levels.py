@@ -0,0 +1,64 @@
+"""Level loading: compiling a text level against mapping its cached binary.
+
+For each maze size a generated maze is exported as a level file, then timed:
+
+    compile     first load: parse, masks, tables, write the cache
+    load        later loads: map the cached binary
+    generate    GameCore on a generated maze of the same size, for comparison
+    game        GameCore on the mapped level
+    reset       GameCore.reset() on the mapped level
+
+That a game on the mapped level plays exactly like one on the parsed level
+is checked by tests/test_levels.py.
+
+Usage: python benchmarks/bench_levels.py [--quick]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pathfinding
+from game_core import GameCore
+from levels import level_from_maze, load_level
+
+SIZES = [(40, 30), (200, 200), (1000, 1000)]
+QUICK_SIZES = [(40, 30), (200, 200)]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def write_level(directory, width, height):
+    game = GameCore(seed=0, maze_size=(width, height))
+    level = level_from_maze(game.maze, game.dots, game.power_pellets, game.pacman_start,
+                            game.ghost_spawns)
+    path = os.path.join(directory, f"maze_{width}x{height}.txt")
+    with open(path, "w") as f:
+        f.write(level.to_text())
+    return path
+
+
+if __name__ == "__main__":
+    sizes = QUICK_SIZES if "--quick" in sys.argv else SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'maze':>10} {'compile':>10} {'load':>10} {'generate':>10} {'game':>10} {'reset':>10}")
+        for width, height in sizes:
+            path = write_level(directory, width, height)
+            cache_dir = os.path.join(directory, f"cache_{width}x{height}")
+            pathfinding._tables.clear()
+            _, compile_ms = timed(lambda: load_level(path, cache_dir))
+            pathfinding._tables.clear()
+            level, load_ms = timed(lambda: load_level(path, cache_dir))
+            pathfinding._tables.clear()
+            _, generate_ms = timed(lambda: GameCore(seed=0, maze_size=(width, height)))
+            pathfinding._tables.clear()
+            game, game_ms = timed(lambda: GameCore(seed=0, level=level))
+            _, reset_ms = timed(lambda: game.reset(1))
+            print(f"{width:>5}x{height:<4} {compile_ms:8.1f}ms {load_ms:8.2f}ms "
+                  f"{generate_ms:8.1f}ms {game_ms:8.1f}ms {reset_ms:8.2f}ms")
@@ -0,0 +1,49 @@
+"""Tick time against maze size, pathfinding included.
+
+Plays seeded games with random turns on generated mazes of growing size and
+prints the median, 99th percentile and worst tick. Distance rows are filled
+lazily as Pacman and the ghost targets move, so the slow ticks are the ones
+that run a BFS; pathfinding.BOUNDED_SEARCH_CELLS decides how far that BFS
+may spread.
+
+Usage: python benchmarks/bench_maze_size.py [--frames N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_core import PLAYING, GameCore
+from profiler import percentile
+
+SIZES = [(40, 30), (64, 64), (100, 100), (250, 250), (1000, 1000)]
+
+
+def tick_times(width, height, frames):
+    """Sorted tick times in milliseconds over frames ticks, from a cold table"""
+    game = GameCore(seed=0, maze_size=(width, height))
+    rng = random.Random(0)
+    times = []
+    while len(times) < frames:
+        if game.state != PLAYING:
+            game.reset(len(times))
+        action = rng.randrange(4) if game.frame % 30 == 0 else None
+        start = time.perf_counter()
+        game.step(action)
+        times.append((time.perf_counter() - start) * 1e3)
+    return sorted(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'maze':>10}  {'p50 ms':>7}  {'p99 ms':>7}  {'max ms':>7}")
+    for width, height in SIZES:
+        times = tick_times(width, height, args.frames)
+        print(f"{width:>4}x{height:<5}  {percentile(times, 0.5):7.3f}  "
+              f"{percentile(times, 0.99):7.3f}  {times[-1]:7.3f}")
@@ -0,0 +1,118 @@
+"""Observation tensors: incremental updates against rebuilding every step.
+
+rebuild() builds the planes from scratch the straightforward way, from the
+maze rows, the remaining dots and pellets and the actor positions.
+Observation.update() must match it (and its downsampled copy must match
+max-pooling it) after every step of games that include deaths, resets and
+snapshot restores. Both are then timed per step next to GameCore.update()
+itself.
+
+Usage: python benchmarks/bench_observation.py [steps]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from game_core import CELL_SIZE, PLAYING, GameCore
+from observation import FIRST_GHOST, Observation
+from suite import configure
+
+FACTOR = 4
+
+
+def rebuild(game):
+    tensor = np.zeros((FIRST_GHOST + len(game.ghosts), len(game.maze), len(game.maze[0])),
+                      dtype=np.uint8)
+    for y, row in enumerate(game.maze):
+        for x, wall in enumerate(row):
+            tensor[0, y, x] = wall == 1
+    for channel, items in ((1, game.dots), (2, game.power_pellets)):
+        for x, y in items:
+            tensor[channel, y // CELL_SIZE, x // CELL_SIZE] = 1
+    for channel, actor in enumerate([game.pacman] + game.ghosts, 3):
+        tensor[channel, int(actor.y) // CELL_SIZE, int(actor.x) // CELL_SIZE] = 1
+    return tensor
+
+
+def pool(tensor, factor):
+    channels, height, width = tensor.shape
+    padded = np.zeros((channels, -(-height // factor) * factor, -(-width // factor) * factor),
+                      dtype=tensor.dtype)
+    padded[:, :height, :width] = tensor
+    return padded.reshape(channels, padded.shape[1] // factor, factor,
+                          padded.shape[2] // factor, factor).max(axis=(2, 4))
+
+
+def check(steps):
+    rng = random.Random(0)
+    game = GameCore(seed=0)
+    observation = Observation(game, downsample=FACTOR)
+    snapshot = game.snapshot()
+    for step in range(steps):
+        if step % 20 == 0:
+            action = rng.randrange(4)
+        game.step(action)
+        if game.state != PLAYING:
+            game.reset(step)
+        if rng.random() < 0.01:
+            snapshot = game.snapshot()
+        elif rng.random() < 0.005:
+            game.restore(snapshot)
+        expected = rebuild(game)
+        if not np.array_equal(observation.update(), expected):
+            raise AssertionError(f"observation diverged at step {step}")
+        if step % 7 == 0 and not np.array_equal(observation.downsampled(), pool(expected, FACTOR)):
+            raise AssertionError(f"downsampled observation diverged at step {step}")
+
+
+def per_step(game, observe, steps):
+    """Microseconds per call of observe() after each simulation step"""
+    rng = random.Random(1)
+    spent = 0.0
+    for step in range(steps):
+        if step % 20 == 0:
+            action = rng.randrange(4)
+        game.step(action)
+        if game.state != PLAYING:
+            game.reset(step)
+        start = time.perf_counter()
+        observe()
+        spent += time.perf_counter() - start
+    return spent / steps * 1e6
+
+
+def simulate(game, steps):
+    rng = random.Random(2)
+    start = time.perf_counter()
+    for step in range(steps):
+        if step % 20 == 0:
+            action = rng.randrange(4)
+        game.step(action)
+        if game.state != PLAYING:
+            game.reset(step)
+    return (time.perf_counter() - start) / steps * 1e6
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    check(steps)
+    print(f"equivalence: ok over {steps} steps with resets and restores")
+    print(f"{'maze':>9} {'simulate':>10} {'rebuild':>10} {'update':>10} {'+ pooled':>10}  us/step")
+    for width, height in ((40, 30), (80, 60), (160, 120)):
+        game = configure(GameCore, width, height, 4)(seed=0)
+        simulate(game, steps)
+        base = simulate(game, steps)
+        rebuilt = per_step(game, lambda: rebuild(game), min(steps, 300))
+        observation = Observation(game, downsample=FACTOR)
+        updated = per_step(game, observation.update, steps)
+
+        def pooled():
+            observation.update()
+            observation.downsampled()
+        pooled_time = per_step(game, pooled, steps)
+        print(f"{width:>4}x{height:<4} {base:10.1f} {rebuilt:10.1f} {updated:10.1f} {pooled_time:10.1f}")
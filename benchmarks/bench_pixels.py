@@ -0,0 +1,114 @@
+"""Pixel observations: PixelRenderer against the pygame renderer.
+
+Times an 84x84 frame from PixelRenderer for one game, for a batch of
+GameCores and for a batch_env.BatchGame, next to Game.draw() at full size
+plus smoothscale and surfarray to get the same 84x84 array (SDL dummy video
+driver). Also checks that batched and single renders agree and that eaten
+dots leave the image. Writes sample images with --save DIRECTORY.
+
+Usage: python benchmarks/bench_pixels.py [--save DIRECTORY]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+from batch_env import BatchGame
+from game_core import GHOST_SPAWNS, PLAYING, GameCore
+from pixels import DOT_COLOR, PixelRenderer
+
+SIZE = (84, 84)
+BATCH = 64
+BATCH_ENV = 256
+
+
+def played_games(count, steps):
+    games = []
+    rng = random.Random(0)
+    for seed in range(count):
+        game = GameCore(seed=seed)
+        for step in range(steps + seed * 7):
+            if step % 20 == 0:
+                action = rng.randrange(4)
+            game.step(action)
+            if game.state != PLAYING:
+                game.reset(seed)
+        games.append(game)
+    return games
+
+
+def per_frame(function, frames_per_call, min_time=0.5):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        function()
+        calls += 1
+    return (time.perf_counter() - start) / (calls * frames_per_call) * 1e6
+
+
+def check(renderer, games):
+    batch = renderer.render_batch(games)
+    for game, image in zip(games, batch):
+        if not np.array_equal(renderer.render(game), image):
+            raise AssertionError("batched render differs from a single render")
+    fresh = renderer.render(GameCore(seed=0))
+    dots = lambda image: int(np.all(image == DOT_COLOR, axis=-1).sum())
+    if not dots(batch[-1]) < dots(fresh):
+        raise AssertionError("eaten dots are still drawn")
+
+
+def pygame_frame(game):
+    import pygame
+    surface = pygame.transform.smoothscale(game.screen, SIZE)
+    return pygame.surfarray.array3d(surface)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy pixel renderer")
+    parser.add_argument("--save", metavar="DIRECTORY", help="write sample frames as PNG")
+    args = parser.parse_args()
+
+    games = played_games(BATCH, 200)
+    renderer = PixelRenderer(games[0].maze, SIZE)
+    check(renderer, games)
+    print("batched and single renders agree; eaten dots disappear")
+
+    out = np.empty((BATCH,) + SIZE[::-1] + (3,), dtype=np.uint8)
+    single = per_frame(lambda: renderer.render(games[0]), 1)
+    batched = per_frame(lambda: renderer.render_batch(games, out), BATCH)
+    batch = BatchGame(BATCH_ENV, seed=0)
+    for _ in range(100):
+        batch.step(np.random.default_rng(0).integers(0, 4, BATCH_ENV))
+    colors = [color for _, _, color, _ in GHOST_SPAWNS]
+    env_out = np.empty((BATCH_ENV,) + SIZE[::-1] + (3,), dtype=np.uint8)
+    vectorized = per_frame(lambda: renderer.render_batch_env(batch, colors, env_out), BATCH_ENV)
+
+    from pac_man import Game
+    game = Game(seed=0)
+    game.verbose = False
+
+    def full_draw():
+        game.step(0)
+        game.draw()
+        return pygame_frame(game)
+    reference = per_frame(full_draw, 1)
+
+    print(f"pygame draw + downscale       {reference:9.1f} us/frame")
+    print(f"PixelRenderer, one game       {single:9.1f} us/frame")
+    print(f"PixelRenderer, {BATCH} GameCores  {batched:9.1f} us/frame")
+    print(f"PixelRenderer, BatchGame {BATCH_ENV} {vectorized:9.1f} us/frame")
+
+    if args.save:
+        import pygame
+        os.makedirs(args.save, exist_ok=True)
+        for index, image in enumerate(out[:4]):
+            pygame.image.save(pygame.surfarray.make_surface(image.swapaxes(0, 1)),
+                              os.path.join(args.save, f"pixels_{index}.png"))
+        pygame.image.save(pygame.surfarray.make_surface(pygame_frame(game)),
+                          os.path.join(args.save, "pygame_downscaled.png"))
@@ -0,0 +1,63 @@
+"""Rollout throughput: episodes per second against the number of workers.
+
+Plays the same seeded episodes in this process and through rollout.rollouts
+with 1, 2, 4, ... workers up to the CPU count, checks that every run returns
+the same per-seed results, and prints episodes per second and the speedup
+over one worker.
+
+Usage: python benchmarks/bench_rollout.py [--episodes N] [--workers N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_core import GameCore
+from rollout import default_level, play_episode, rollouts
+
+
+def serial(level, seeds):
+    game = GameCore(seed=0, level=level)
+    return [play_episode(game, seed) for seed in seeds]
+
+
+def pooled(level, seeds, workers):
+    results = []
+    for batch in rollouts(seeds, level, workers):
+        results.extend(batch)
+    return sorted(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process rollout runner")
+    parser.add_argument("--episodes", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="largest worker count to try")
+    args = parser.parse_args()
+
+    level = default_level()
+    seeds = range(args.episodes)
+    start = time.perf_counter()
+    expected = serial(level, seeds)
+    elapsed = time.perf_counter() - start
+    print(f"{os.cpu_count()} CPUs, {args.episodes} episodes")
+    print(f"in process   {args.episodes / elapsed:8.1f} episodes/s")
+
+    counts = []
+    workers = 1
+    while workers < args.workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.workers)
+    base = None
+    for workers in counts:
+        start = time.perf_counter()
+        results = pooled(level, seeds, workers)
+        elapsed = time.perf_counter() - start
+        if results != expected:
+            raise AssertionError(f"{workers} workers returned different results")
+        rate = args.episodes / elapsed
+        base = base or rate
+        print(f"{workers:3} workers  {rate:8.1f} episodes/s  {rate / base:5.2f}x")
@@ -0,0 +1,83 @@
+"""Load test for server.py over localhost.
+
+Starts a GameServer and connects many HeadlessClients, a few of which steer
+Pacman at random, and runs the server in real time. Reports bandwidth per
+client, the messages received, server tick cost and ticks that ran late.
+That clients mirror the server exactly is checked by tests/test_server.py.
+
+Usage: python benchmarks/bench_server.py [--clients 10,100,500] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client import HeadlessClient
+from game_core import PLAYING, GameCore
+from server import GameServer
+
+PLAYERS = 3
+
+
+class TimedServer(GameServer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tick_times = []
+
+    def tick(self):
+        start = time.perf_counter()
+        super().tick()
+        self.tick_times.append(time.perf_counter() - start)
+
+
+async def steer_randomly(clients, server, rng):
+    while True:
+        await asyncio.sleep(0.25)
+        for client in clients:
+            client.steer(rng.randrange(4))
+        if server.game.state != PLAYING and rng.random() < 0.1:
+            clients[0].restart()
+
+
+async def load_test(count, seconds):
+    server = await TimedServer(GameCore(seed=1), keyframe_interval=300).start(port=0)
+    clients = [await HeadlessClient().connect(port=server.port) for _ in range(count)]
+    steering = asyncio.ensure_future(steer_randomly(clients[:PLAYERS], server, random.Random(0)))
+    await server.run(ticks=int(seconds * server.tick_rate))
+    steering.cancel()
+
+    # Let every client drain its socket before comparing
+    deadline = time.perf_counter() + 10
+    while (any(client.state.frame != server.game.frame or client.state.deltas == 0
+               for client in clients) and time.perf_counter() < deadline):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+
+    received = [client.bytes_received for client in clients]
+    deltas = sum(client.state.deltas for client in clients)
+    keyframes = sum(client.state.keyframes for client in clients)
+    skipped = sum(connection.skipped for connection in server.connections)
+    ticks = sorted(server.tick_times)
+    for client in clients:
+        await client.close()
+    await server.close()
+
+    print(f"{count:5} clients: {server.ticks} ticks, {server.late_ticks} late, "
+          f"tick p50 {1e3 * ticks[len(ticks) // 2]:.2f} ms p99 {1e3 * ticks[int(0.99 * len(ticks))]:.2f} ms")
+    print(f"             {statistics.mean(received) / seconds / 1024:6.2f} KiB/s per client, "
+          f"{deltas} deltas + {keyframes} keyframes received, {skipped} skipped for backlog")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the game server over localhost")
+    parser.add_argument("--clients", default="10,100,500",
+                        help="comma-separated client counts (default 10,100,500)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    for count in map(int, args.clients.split(",")):
+        asyncio.run(load_test(count, args.seconds))
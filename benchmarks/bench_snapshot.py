@@ -0,0 +1,33 @@
+"""Snapshot / restore cost for tree search.
+
+deepcopy of the game is timed for comparison. That restore() is exact is
+checked by tests/test_snapshot.py.
+
+Usage: python benchmarks/bench_snapshot.py
+"""
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_core import GameCore
+
+
+def time_per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+if __name__ == "__main__":
+    game = GameCore(seed=1)
+    for _ in range(300):
+        game.step(random.randrange(4))
+    snapshot = game.snapshot()
+    print(f"snapshot()    : {time_per_call(game.snapshot, 20000):8.2f} us")
+    print(f"restore()     : {time_per_call(lambda: game.restore(snapshot), 20000):8.2f} us")
+    print(f"deepcopy(game): {time_per_call(lambda: copy.deepcopy(game), 200):8.2f} us")
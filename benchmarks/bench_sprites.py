@@ -0,0 +1,72 @@
+"""Actor draw time: per-frame shape drawing versus the sprite atlas.
+
+Runs with the SDL dummy video driver, so no window is needed.
+
+Usage: python benchmarks/bench_sprites.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, GHOST_SPAWNS
+from pac_man import Pacman, Ghost
+from sprites import SpriteAtlas
+
+FRAMES = 50
+
+
+def make_actors(count, rng):
+    actors = []
+    for i in range(count):
+        x = rng.randrange(20, SCREEN_WIDTH - 20)
+        y = rng.randrange(20, SCREEN_HEIGHT - 20)
+        if i % 5 == 0:
+            actor = Pacman(x, y)
+            actor.direction = rng.randrange(4)
+            actor.mouth_animation = rng.random() * 10
+        else:
+            _, _, color, name = GHOST_SPAWNS[i % len(GHOST_SPAWNS)]
+            actor = Ghost(x + 0.5, y, color, name)
+            actor.body_animation = rng.random() * 10
+        actors.append(actor)
+    return actors
+
+
+def bench_direct(screen, actors):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for actor in actors:
+            actor.draw(screen)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def bench_atlas(screen, atlas, actors):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for actor in actors:
+            if isinstance(actor, Pacman):
+                atlas.draw_pacman(screen, actor)
+            else:
+                atlas.draw_ghost(screen, actor)
+    return (time.perf_counter() - start) / FRAMES
+
+
+if __name__ == "__main__":
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    start = time.perf_counter()
+    atlas = SpriteAtlas(Pacman, Ghost, [color for _, _, color, _ in GHOST_SPAWNS])
+    print(f"atlas: {len(atlas)} frames built in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    print(f"{'actors':>7} {'direct':>10} {'atlas':>10} {'speedup':>8}")
+    for count in (5, 50, 500, 2000):
+        actors = make_actors(count, random.Random(count))
+        direct = bench_direct(screen, actors)
+        blits = bench_atlas(screen, atlas, actors)
+        print(f"{count:>7} {direct * 1e3:8.2f}ms {blits * 1e3:8.2f}ms {direct / blits:7.1f}x")
+    pygame.quit()
@@ -0,0 +1,53 @@
+"""Startup cost of the game: import, Game() construction and the first frame.
+
+Each run is a fresh interpreter, so nothing is cached between runs. The
+script also checks that importing pac_man initialises no pygame subsystem.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import pac_man
+imported = time.perf_counter()
+import pygame
+initialised = pygame.display.get_init() or pygame.font.get_init() or pygame.mixer.get_init()
+game = pac_man.Game(seed=0)
+constructed = time.perf_counter()
+game.draw()
+drawn = time.perf_counter()
+print(json.dumps({"import": imported - start, "game": constructed - imported,
+                  "first_frame": drawn - constructed, "total": drawn - start,
+                  "initialised_on_import": bool(initialised)}))
+"""
+
+PHASES = ["import", "game", "first_frame", "total"]
+
+
+def run_once():
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "dummy"))
+    env.pop("PYGAME_HIDE_SUPPORT_PROMPT", None)
+    lines = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, check=True,
+                           capture_output=True, text=True).stdout.strip().splitlines()
+    if len(lines) > 1:
+        raise AssertionError(f"importing pac_man printed to stdout: {lines[:-1]}")
+    return json.loads(lines[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    results = [run_once() for _ in range(runs)]
+    if any(result["initialised_on_import"] for result in results):
+        raise AssertionError("importing pac_man initialised a pygame subsystem")
+    print(f"import initialises no pygame subsystem; median of {runs} fresh interpreters:")
+    for phase in PHASES:
+        values = [result[phase] * 1e3 for result in results]
+        print(f"  {phase:12} {statistics.median(values):8.1f} ms  (min {min(values):.1f})")
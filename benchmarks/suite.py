@@ -0,0 +1,197 @@
+"""Benchmark suite for the simulation and rendering hot paths.
+
+Measures, for every combination of maze size and ghost count:
+
+    update      headless GameCore.update() steps per second
+    draw        Game.draw() frames per second (SDL dummy video driver)
+    move        per-call cost of Pacman.move and Ghost.move
+    setup       create_maze, create_dots and reset_game cost
+
+Dot counts follow the maze size (every open cell holds a dot). Results are
+written as JSON so runs can be compared between commits:
+
+    python benchmarks/suite.py --output before.json
+    ... change something ...
+    python benchmarks/suite.py --output after.json --compare before.json
+
+Use --quick for a smaller grid and shorter timings.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from game_core import (CELL_SIZE, GHOST_SPAWNS, PLAYING, GameCore, create_dots, create_maze)
+
+MAZE_SIZES = [(40, 30), (80, 60), (160, 120)]
+GHOST_COUNTS = [4, 16, 64]
+QUICK_MAZE_SIZES = [(40, 30), (80, 60)]
+QUICK_GHOST_COUNTS = [4, 16]
+
+
+def spawn_points(maze, count, seed=0):
+    """Ghost spawns at random open cell centres, reusing the usual colours"""
+    rng = random.Random(seed)
+    half = CELL_SIZE // 2
+    cells = [(x, y) for y, row in enumerate(maze) for x, wall in enumerate(row)
+             if not wall and (x > 6 or y > 6)]
+    spawns = []
+    for i, (x, y) in enumerate(rng.sample(cells, count)):
+        _, _, color, name = GHOST_SPAWNS[i % len(GHOST_SPAWNS)]
+        spawns.append((x * CELL_SIZE + half, y * CELL_SIZE + half, color, name))
+    return spawns
+
+
+def configure(base, width, height, ghosts):
+    """Subclass of GameCore or Game with the given maze size and ghost count"""
+    maze = create_maze(width, height)
+    return type(base.__name__, (base,), {
+        "create_maze": lambda self: create_maze(width, height),
+        "ghost_spawns": spawn_points(maze, ghosts),
+    })
+
+
+def measure(function, min_time):
+    """Mean seconds per call, running for at least min_time seconds"""
+    function()
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    batch = 1
+    while elapsed < min_time:
+        for _ in range(batch):
+            function()
+        calls += batch
+        batch *= 2
+        elapsed = time.perf_counter() - start
+    return elapsed / calls
+
+
+def stepper(game):
+    rng = random.Random(0)
+    actions = [rng.randrange(4) for _ in range(1024)]
+    counter = [0]
+
+    def step():
+        counter[0] += 1
+        if game.state != PLAYING:
+            game.reset(0)
+        game.pacman.next_direction = actions[(counter[0] // 30) % len(actions)]
+        game.update()
+    return step
+
+
+def bench_simulation(width, height, ghosts, min_time):
+    game_class = configure(GameCore, width, height, ghosts)
+    game = game_class(seed=0)
+    params = {"maze": f"{width}x{height}", "ghosts": ghosts, "dots": len(game.dots)}
+    results = []
+
+    seconds = measure(stepper(game), min_time)
+    results.append(("update", params, 1 / seconds, "steps/s"))
+
+    game.reset(0)
+    seconds = measure(lambda: game.pacman.move(game.walk), min_time)
+    results.append(("pacman_move", params, seconds * 1e6, "us/call"))
+    ghost = game.ghosts[0]
+    seconds = measure(lambda: ghost.move(game.walk, game.pacman), min_time)
+    results.append(("ghost_move", params, seconds * 1e6, "us/call"))
+
+    seconds = measure(lambda: create_maze(width, height), min_time)
+    results.append(("create_maze", params, seconds * 1e3, "ms/call"))
+    maze = create_maze(width, height)
+    seconds = measure(lambda: create_dots(maze), min_time)
+    results.append(("create_dots", params, seconds * 1e3, "ms/call"))
+    seconds = measure(lambda: game.reset(0), min_time)
+    results.append(("reset_game", params, seconds * 1e3, "ms/call"))
+    return results
+
+
+def bench_draw(width, height, ghosts, min_time):
+    from pac_man import Game
+
+    results = []
+    for mode, options in (("full", {}), ("dirty", {"dirty_rects": True}),
+                          ("no_sprites", {"use_sprites": False})):
+        game = configure(Game, width, height, ghosts)(**options)
+        game.verbose = False
+        step = stepper(game)
+        params = {"maze": f"{width}x{height}", "ghosts": ghosts, "dots": len(game.dots),
+                  "mode": mode}
+
+        def frame():
+            step()
+            game.draw()
+        seconds = measure(frame, min_time)
+        results.append(("draw", params, 1 / seconds, "frames/s"))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["name"], json.dumps(r["params"], sort_keys=True)): r["value"]
+                for r in baseline["results"]}
+    print(f"\nchange against {baseline_path} ({baseline['meta'].get('commit')}):")
+    for result in results:
+        old = previous.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if old:
+            # Rates are better when higher, per-call costs when lower
+            if result["unit"].endswith("/s"):
+                speedup = result["value"] / old
+            else:
+                speedup = old / result["value"]
+            print(f"  {result['name']:12} {describe(result['params']):40} {speedup:6.2f}x faster")
+
+
+def describe(params):
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and rendering hot paths")
+    parser.add_argument("--output", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="show ratios against an earlier JSON run")
+    parser.add_argument("--quick", action="store_true", help="smaller grid, shorter timings")
+    parser.add_argument("--no-draw", action="store_true", help="skip the pygame benchmarks")
+    parser.add_argument("--min-time", type=float, default=None,
+                        help="seconds to run each measurement (default 0.5, 0.1 with --quick)")
+    args = parser.parse_args()
+
+    min_time = args.min_time or (0.1 if args.quick else 0.5)
+    maze_sizes = QUICK_MAZE_SIZES if args.quick else MAZE_SIZES
+    ghost_counts = QUICK_GHOST_COUNTS if args.quick else GHOST_COUNTS
+
+    results = []
+    for width, height in maze_sizes:
+        for ghosts in ghost_counts:
+            runs = bench_simulation(width, height, ghosts, min_time)
+            if not args.no_draw:
+                runs += bench_draw(width, height, ghosts, min_time)
+            for name, params, value, unit in runs:
+                print(f"{name:12} {describe(params):40} {value:14,.2f} {unit}")
+                results.append({"name": name, "params": params, "value": value, "unit": unit})
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        meta = {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(), "platform": platform.platform(),
+                "min_time": min_time}
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
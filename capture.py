@@ -0,0 +1,170 @@
+"""Gameplay video capture written on a background thread.
+
+After each frame is drawn, capture() copies the screen's pixels straight
+out of the surface's buffer into a pooled frame buffer. That is a single
+memcpy, with no pixel format conversion and no allocation. It then hands the
+frame to a bounded queue. A writer thread drains the queue to disk, raw or
+zlib-compressed (zlib runs without the GIL). If the writer falls behind, the
+pool runs dry and frames are dropped and counted instead of stalling the
+game.
+
+File layout (little-endian):
+
+    HEADER   magic, width, height, pitch, bytes per pixel, flags, RGBA masks
+    FRAME    tick number, data length; then the pixel rows as stored by the
+             surface, zlib-compressed if flags has COMPRESSED
+
+Usage: python capture.py info CAPTURE
+       python capture.py export CAPTURE DIRECTORY [--every N]
+"""
+import argparse
+import os
+import queue
+import struct
+import threading
+import zlib
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+MAGIC = b"PMV1"
+HEADER = struct.Struct("<4sHHIBB4I")
+FRAME = struct.Struct("<II")
+
+# Header flags
+COMPRESSED = 1
+
+# Frames waiting for the writer; half a second at 60 frames per second
+QUEUE_SIZE = 30
+COMPRESS_LEVEL = 1
+
+
+class FrameCapture:
+    """Copies frames out of a surface and writes them to path on a thread"""
+
+    def __init__(self, path, compress=False, queue_size=QUEUE_SIZE):
+        self.path = path
+        self.compress = compress
+        self.queue_size = queue_size
+        self.queue = queue.Queue()
+        # Frame buffers are allocated on demand up to queue_size and reused
+        self.free = queue.SimpleQueue()
+        self.allocated = 0
+        self.size = None
+        self.frame_bytes = 0
+        self.thread = None
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.bytes_written = 0
+
+    def start(self, surface):
+        width, height = surface.get_size()
+        self.size = (width, height)
+        self.frame_bytes = surface.get_pitch() * height
+        header = HEADER.pack(MAGIC, width, height, surface.get_pitch(), surface.get_bytesize(),
+                             COMPRESSED if self.compress else 0, *surface.get_masks())
+        self.thread = threading.Thread(target=self.write_frames, args=(header,),
+                                       name="frame-capture", daemon=True)
+        self.thread.start()
+
+    def capture(self, surface, tick=0):
+        """Queue a copy of surface's pixels; returns False if the frame was dropped"""
+        if self.size is None:
+            self.start(surface)
+        elif surface.get_size() != self.size:
+            raise ValueError(f"capture is {self.size}, surface is {surface.get_size()}")
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            if self.allocated >= self.queue_size:
+                self.dropped += 1
+                return False
+            buffer = bytearray(self.frame_bytes)
+            self.allocated += 1
+        # The buffer proxy locks the surface only for the copy
+        buffer[:] = surface.get_buffer()
+        self.queue.put((tick, buffer))
+        self.captured += 1
+        return True
+
+    def write_frames(self, header):
+        with open(self.path, "wb") as f:
+            f.write(header)
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                tick, buffer = item
+                data = zlib.compress(buffer, COMPRESS_LEVEL) if self.compress else buffer
+                f.write(FRAME.pack(tick, len(data)))
+                f.write(data)
+                self.free.put(buffer)
+                self.written += 1
+                self.bytes_written += FRAME.size + len(data)
+
+    def close(self):
+        """Write out every queued frame and stop the writer"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def report(self):
+        total = self.captured + self.dropped
+        dropped = 100 * self.dropped / total if total else 0.0
+        return (f"captured {self.captured} frames to {self.path} "
+                f"({self.bytes_written / 2 ** 20:.1f} MiB), "
+                f"dropped {self.dropped} ({dropped:.1f}%) the writer could not keep up with")
+
+
+def read_capture(path):
+    """Yield the header fields, then (tick, pixel data) for every frame"""
+    with open(path, "rb") as f:
+        magic, width, height, pitch, bytesize, flags, *masks = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a frame capture")
+        yield {"size": (width, height), "pitch": pitch, "bytesize": bytesize,
+               "compressed": bool(flags & COMPRESSED), "masks": tuple(masks)}
+        while True:
+            frame = f.read(FRAME.size)
+            if len(frame) < FRAME.size:
+                return
+            tick, length = FRAME.unpack(frame)
+            data = f.read(length)
+            yield tick, zlib.decompress(data) if flags & COMPRESSED else data
+
+
+def frame_surface(info, data):
+    """Surface holding one captured frame"""
+    surface = pygame.Surface(info["size"], 0, info["bytesize"] * 8, info["masks"])
+    if surface.get_pitch() != info["pitch"]:
+        raise ValueError("frame rows do not match this platform's surface layout")
+    surface.get_buffer().write(data)
+    return surface
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export a gameplay capture")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info_command = commands.add_parser("info", help="print the capture's size and frame count")
+    info_command.add_argument("capture")
+    export = commands.add_parser("export", help="write frames as PNG images")
+    export.add_argument("capture")
+    export.add_argument("directory")
+    export.add_argument("--every", type=int, default=1, help="export every Nth frame")
+    args = parser.parse_args()
+
+    frames = read_capture(args.capture)
+    info = next(frames)
+    if args.command == "info":
+        ticks = [tick for tick, _ in frames]
+        print(f"{info['size'][0]}x{info['size'][1]}, {len(ticks)} frames, "
+              f"{'compressed' if info['compressed'] else 'raw'}, "
+              f"ticks {ticks[0] if ticks else '-'}..{ticks[-1] if ticks else '-'}")
+    else:
+        os.makedirs(args.directory, exist_ok=True)
+        for index, (tick, data) in enumerate(frames):
+            if index % args.every == 0:
+                pygame.image.save(frame_surface(info, data),
+                                  os.path.join(args.directory, f"frame_{index:06}.png"))
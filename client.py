@@ -0,0 +1,78 @@
+"""Headless client for server.py.
+
+Keeps a ClientState mirror of the server's game up to date and can steer
+Pacman. It draws nothing, so it doubles as a spectator for tooling and as
+a simulated player in load tests.
+
+Usage: python client.py [--port 7777] [--seconds 10] [--random-inputs]
+"""
+import argparse
+import asyncio
+import random
+
+from server import (DEFAULT_PORT, INPUT, MAX_STATE_MESSAGE, RESTART, ClientState, ProtocolError,
+                    frame_message, read_message)
+
+
+class HeadlessClient:
+    """One connection to a GameServer and the game state it has streamed"""
+
+    def __init__(self):
+        self.state = ClientState()
+        self.reader = None
+        self.writer = None
+        self.bytes_received = 0
+        self.messages = 0
+        self.task = None
+
+    async def connect(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.task = asyncio.ensure_future(self.receive())
+        return self
+
+    async def receive(self):
+        try:
+            while True:
+                payload = await read_message(self.reader, MAX_STATE_MESSAGE)
+                # Payload plus its varint length prefix
+                self.bytes_received += len(payload) + max(1, (len(payload).bit_length() + 6) // 7)
+                self.messages += 1
+                self.state.apply(payload)
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            self.writer.close()
+
+    def steer(self, direction):
+        self.writer.write(frame_message(bytes([INPUT, direction])))
+
+    def restart(self):
+        self.writer.write(frame_message(bytes([RESTART])))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.task is not None:
+            await self.task
+
+
+async def watch(host, port, seconds, random_inputs):
+    client = await HeadlessClient().connect(host, port)
+    rng = random.Random()
+    for second in range(seconds):
+        if random_inputs:
+            client.steer(rng.randrange(4))
+        await asyncio.sleep(1)
+        state = client.state
+        print(f"{second + 1:3}s frame {state.frame:6} score {state.score:5} lives {state.lives} "
+              f"received {client.bytes_received:8,} bytes in {client.messages} messages")
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch (or steer) a game on server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--random-inputs", action="store_true",
+                        help="steer Pacman in a random direction every second")
+    args = parser.parse_args()
+    asyncio.run(watch(args.host, args.port, args.seconds, args.random_inputs))
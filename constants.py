@@ -0,0 +1,38 @@
+"""Shared game constants, importable without pygame or the simulation."""
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+CELL_SIZE = 20
+MAZE_WIDTH = SCREEN_WIDTH // CELL_SIZE
+MAZE_HEIGHT = SCREEN_HEIGHT // CELL_SIZE
+
+# Actor colours (plain RGB tuples, used by the renderer)
+RED = (220, 20, 60)
+PINK = (255, 105, 180)
+CYAN = (0, 206, 209)
+ORANGE = (255, 140, 0)
+
+# Game states
+PLAYING = 0
+GAME_OVER = 1
+WIN = 2
+
+# Directions
+RIGHT = 0
+DOWN = 1
+LEFT = 2
+UP = 3
+
+# Spawn points in pixels, on open cell centres (row 12 has no walls)
+PACMAN_START = (CELL_SIZE * 3 + CELL_SIZE // 2, CELL_SIZE * 3 + CELL_SIZE // 2)
+GHOST_SPAWNS = [
+    (CELL_SIZE * 15 + CELL_SIZE // 2, CELL_SIZE * 12 + CELL_SIZE // 2, RED, "Blinky"),
+    (CELL_SIZE * 20 + CELL_SIZE // 2, CELL_SIZE * 12 + CELL_SIZE // 2, PINK, "Pinky"),
+    (CELL_SIZE * 25 + CELL_SIZE // 2, CELL_SIZE * 12 + CELL_SIZE // 2, CYAN, "Inky"),
+    (CELL_SIZE * 30 + CELL_SIZE // 2, CELL_SIZE * 12 + CELL_SIZE // 2, ORANGE, "Clyde"),
+]
+
+START_LIVES = 3
+DOT_SCORE = 10
+PELLET_SCORE = 50
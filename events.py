@@ -0,0 +1,240 @@
+"""Structured game events in a preallocated ring buffer.
+
+GameCore emits typed events (dots and pellets eaten, lives lost, state
+changes) with their tick into an EventBuffer instead of printing. Each event
+is four integers written into a fixed array('q'), so emitting costs a few
+stores and never does I/O or allocates. Consumers read at their own pace:
+
+    Subscription    poll() returns the events since the last poll, for the
+                    HUD, telemetry or tests; events overwritten before a
+                    poll are counted in missed
+    EventLog        a background thread that flushes new events in batches
+                    to a JSON-lines, text or binary log
+
+The game thread is the only writer and readers only copy, so no lock is
+taken. A reader that falls more than the capacity behind loses the oldest
+events and counts them instead of holding up the game.
+
+Binary log layout: b"PME1", then per event tick, kind, a, b as little-endian
+int64. What a and b hold depends on the kind:
+
+    dot_eaten       dots eaten this tick, score
+    pellet_eaten    pellets eaten this tick, score
+    life_lost       lives left, index of the ghost
+    state_change    old state, new state (also emitted by every reset)
+
+Usage: python events.py LOG    print a binary event log as JSON lines
+"""
+import argparse
+import json
+import sys
+import threading
+from array import array
+from collections import namedtuple
+
+from constants import GAME_OVER, PLAYING, WIN
+
+DOT_EATEN = 0
+PELLET_EATEN = 1
+LIFE_LOST = 2
+STATE_CHANGE = 3
+
+EVENT_NAMES = ("dot_eaten", "pellet_eaten", "life_lost", "state_change")
+FIELD_NAMES = (("count", "score"), ("count", "score"), ("lives", "ghost"), ("old", "new"))
+STATE_NAMES = {PLAYING: "playing", GAME_OVER: "game_over", WIN: "won"}
+
+# Log formats
+JSONL = "jsonl"
+TEXT = "text"
+BINARY = "binary"
+
+MAGIC = b"PME1"
+FIELDS = 4
+CAPACITY = 1024
+FLUSH_INTERVAL = 0.25
+
+Event = namedtuple("Event", "tick kind a b")
+
+
+class EventBuffer:
+    """Ring of the latest capacity events; head counts every event ever emitted"""
+
+    def __init__(self, capacity=CAPACITY):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.data = array('q', [0]) * (capacity * FIELDS)
+        self.head = 0
+
+    def emit(self, tick, kind, a=0, b=0):
+        data = self.data
+        slot = (self.head & self.mask) * FIELDS
+        data[slot] = tick
+        data[slot + 1] = kind
+        data[slot + 2] = a
+        data[slot + 3] = b
+        self.head += 1
+
+    def read(self, cursor):
+        """Events from cursor on as a flat array; returns (records, new cursor, missed)"""
+        head = self.head
+        start = max(cursor, head - self.capacity)
+        first = (start & self.mask) * FIELDS
+        last = (head & self.mask) * FIELDS
+        if head - start == 0:
+            records = array('q')
+        elif first < last:
+            records = self.data[first:last]
+        else:
+            records = self.data[first:] + self.data[:last]
+        # Slots the game overwrote while they were copied are dropped
+        overwritten = min(self.head - self.capacity, head) - start
+        if overwritten > 0:
+            del records[:overwritten * FIELDS]
+            start += overwritten
+        return records, head, start - cursor
+
+    def subscribe(self):
+        """Subscription to events emitted from now on"""
+        return Subscription(self)
+
+
+def unpack(records):
+    """Events of a flat record array"""
+    return [Event(*records[i:i + FIELDS]) for i in range(0, len(records), FIELDS)]
+
+
+class Subscription:
+    """A reader of an EventBuffer with its own cursor"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.cursor = buffer.head
+        self.missed = 0
+
+    def records(self):
+        """Flat array of the events emitted since the last read"""
+        records, self.cursor, missed = self.buffer.read(self.cursor)
+        self.missed += missed
+        return records
+
+    def poll(self):
+        """Events emitted since the last poll, oldest first"""
+        return unpack(self.records())
+
+
+def event_dict(event):
+    a_name, b_name = FIELD_NAMES[event.kind]
+    a, b = event.a, event.b
+    if event.kind == STATE_CHANGE:
+        a, b = STATE_NAMES[a], STATE_NAMES[b]
+    return {"tick": event.tick, "event": EVENT_NAMES[event.kind], a_name: a, b_name: b}
+
+
+def event_text(event):
+    """Console line for an event"""
+    if event.kind == DOT_EATEN:
+        message = f"Collected {event.a} dots! Score: {event.b}"
+    elif event.kind == PELLET_EATEN:
+        message = f"Power pellet collected! Score: {event.b}"
+    elif event.kind == LIFE_LOST:
+        message = f"Ghost collision! Lives: {event.a}"
+    elif event.b == PLAYING:
+        message = "New game"
+    else:
+        message = "Game over!" if event.b == GAME_OVER else "You win!"
+    return f"[{event.tick:6}] {message}"
+
+
+def format_for(path):
+    """Log format implied by a file name: .jsonl, .txt or binary otherwise"""
+    if path.endswith(".jsonl"):
+        return JSONL
+    if path.endswith(".txt"):
+        return TEXT
+    return BINARY
+
+
+class EventLog:
+    """Background thread writing a buffer's events to target in batches.
+
+    target is a path or an open file (text formats only); format is JSONL,
+    TEXT or BINARY.
+    """
+
+    def __init__(self, buffer, target, format=JSONL, interval=FLUSH_INTERVAL):
+        self.subscription = buffer.subscribe()
+        self.format = format
+        self.interval = interval
+        if isinstance(target, str):
+            if format == BINARY:
+                self.file = open(target, "wb")
+            else:
+                self.file = open(target, "w", encoding="utf-8")
+            self.owned = True
+        else:
+            self.file = target
+            self.owned = False
+        if format == BINARY:
+            self.file.write(MAGIC)
+        self.written = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="event-log", daemon=True)
+        self.thread.start()
+
+    @property
+    def missed(self):
+        return self.subscription.missed
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        records = self.subscription.records()
+        if not records:
+            return
+        if self.format == BINARY:
+            if sys.byteorder != "little":
+                records.byteswap()
+            self.file.write(records.tobytes())
+        elif self.format == TEXT:
+            self.file.write("".join(event_text(event) + "\n" for event in unpack(records)))
+        else:
+            self.file.write("".join(json.dumps(event_dict(event)) + "\n"
+                                    for event in unpack(records)))
+        self.file.flush()
+        self.written += len(records) // FIELDS
+
+    def close(self):
+        """Stop the thread after writing every event emitted so far"""
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+            self.flush()
+            if self.owned:
+                self.file.close()
+
+
+def read_log(path):
+    """Events of a binary log"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a binary event log")
+        data = f.read()
+    # A log cut off mid-write ends in a partial event, which is ignored
+    records = array('q')
+    records.frombytes(data[:len(data) - len(data) % (FIELDS * records.itemsize)])
+    if sys.byteorder != "little":
+        records.byteswap()
+    return unpack(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a binary event log as JSON lines")
+    parser.add_argument("log")
+    args = parser.parse_args()
+    for event in read_log(args.log):
+        print(json.dumps(event_dict(event)))
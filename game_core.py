@@ -0,0 +1,622 @@
+"""Headless Pacman simulation core.
+
+Holds the maze, the actors and the game rules without importing pygame, so
+episodes can be stepped as fast as the CPU allows on machines with no display.
+The pygame renderer in pac_man.py is a thin layer on top of GameCore.
+"""
+import argparse
+import atexit
+import hashlib
+import random
+import struct
+import sys
+
+from constants import (CELL_SIZE, MAZE_WIDTH, MAZE_HEIGHT, PLAYING, GAME_OVER, WIN,
+                       PACMAN_START, GHOST_SPAWNS, START_LIVES, DOT_SCORE, PELLET_SCORE)
+from movement import SUBPIXELS, DIRECTION_BITS, Mover, Walkability, to_units
+from events import (DOT_EATEN, PELLET_EATEN, LIFE_LOST, STATE_CHANGE, JSONL, TEXT,
+                    EventBuffer, EventLog)
+from maze import Maze
+from pathfinding import GhostAI, distance_table
+from recording import Recording
+from spatial import SpatialHash
+
+# Ghosts catch Pacman when their centres are closer than 18 pixels
+CATCH_DISTANCE = to_units(18)
+CATCH_DISTANCE_SQ = CATCH_DISTANCE ** 2
+
+# Smallest generated maze whose border stays closed around the starting area
+MIN_MAZE_SIZE = (8, 8)
+
+
+def create_maze(width=MAZE_WIDTH, height=MAZE_HEIGHT):
+    """Build a Maze of 0 (open) and 1 (wall) cells; the default size fills the screen"""
+    maze = Maze(width, height)
+
+    # Create border walls
+    for x in range(width):
+        maze[0][x] = 1
+        maze[height-1][x] = 1
+    for y in range(height):
+        maze[y][0] = 1
+        maze[y][width-1] = 1
+
+    # Create more interesting maze patterns
+    # Horizontal walls
+    for y in range(3, height-3, 6):
+        for x in range(3, width-3):
+            if x % 8 != 0 and x % 8 != 1:
+                maze[y][x] = 1
+
+    # Vertical walls
+    for x in range(6, width-6, 12):
+        for y in range(6, height-6):
+            if y % 6 != 0:
+                maze[y][x] = 1
+
+    # Add some boxes
+    box_positions = [(10, 8), (25, 8), (10, 20), (25, 20)]
+    for bx, by in box_positions:
+        for i in range(3):
+            for j in range(3):
+                if bx+i < width and by+j < height:
+                    maze[by+j][bx+i] = 1
+
+    # Ensure starting area is clear
+    for y in range(2, 6):
+        for x in range(2, 6):
+            if y < height and x < width:
+                maze[y][x] = 0
+
+    return maze
+
+
+def parse_maze_size(text):
+    """(width, height) from a "WxH" command-line argument"""
+    try:
+        width, height = map(int, text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"maze size must look like 40x30, got {text!r}") from None
+    if width < MIN_MAZE_SIZE[0] or height < MIN_MAZE_SIZE[1]:
+        raise argparse.ArgumentTypeError(
+            f"mazes must be at least {MIN_MAZE_SIZE[0]}x{MIN_MAZE_SIZE[1]} cells, got {text}")
+    return width, height
+
+
+def create_dots(maze):
+    """List the pixel centres of every dot in the maze"""
+    dots = []
+    for y in range(len(maze)):
+        row = maze[y]
+        for x in range(len(row)):
+            if row[x] == 0:
+                # Don't place dots too close to starting positions
+                dot_x = x * CELL_SIZE + CELL_SIZE // 2
+                dot_y = y * CELL_SIZE + CELL_SIZE // 2
+                if not (40 < dot_x < 80 and 40 < dot_y < 80):  # Avoid Pacman start
+                    dots.append((dot_x, dot_y))
+    return dots
+
+
+def create_power_pellets(maze):
+    """List the pixel centres of the corner power pellets"""
+    pellets = []
+    width = len(maze[0])
+    height = len(maze)
+    # Place power pellets in corners
+    corner_positions = [
+        (3 * CELL_SIZE + CELL_SIZE // 2, 3 * CELL_SIZE + CELL_SIZE // 2),
+        ((width - 4) * CELL_SIZE + CELL_SIZE // 2, 3 * CELL_SIZE + CELL_SIZE // 2),
+        (3 * CELL_SIZE + CELL_SIZE // 2, (height - 4) * CELL_SIZE + CELL_SIZE // 2),
+        ((width - 4) * CELL_SIZE + CELL_SIZE // 2, (height - 4) * CELL_SIZE + CELL_SIZE // 2)
+    ]
+
+    for pos in corner_positions:
+        grid_x = pos[0] // CELL_SIZE
+        grid_y = pos[1] // CELL_SIZE
+        if (0 <= grid_x < width and 0 <= grid_y < height and
+            maze[grid_y][grid_x] == 0):
+            pellets.append(pos)
+
+    return pellets
+
+
+class ItemGrid:
+    """Dots or pellets indexed by maze cell.
+
+    Items sit at cell centres, so a bitmap with one byte per cell replaces
+    the list of pixel positions: pickups only look at the cells around
+    Pacman and the remaining count is kept up to date for the win check.
+    Iterating yields the pixel centres of the remaining items.
+    """
+
+    def __init__(self, width, height, positions=()):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.count = 0
+        # Removal logs of the observers that asked for one
+        self.logs = []
+        for x, y in positions:
+            self.add(x, y)
+
+    @classmethod
+    def from_cells(cls, width, height, cells):
+        """ItemGrid over a copy of a bitmap with one byte (0 or 1) per cell"""
+        grid = cls(width, height)
+        grid.cells[:] = cells
+        grid.count = grid.cells.count(1)
+        return grid
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __contains__(self, pos):
+        index = self.index(*pos)
+        return index is not None and self.cells[index] == 1
+
+    def __iter__(self):
+        width = self.width
+        half = CELL_SIZE // 2
+        index = self.cells.find(1)
+        while index != -1:
+            yield ((index % width) * CELL_SIZE + half, (index // width) * CELL_SIZE + half)
+            index = self.cells.find(1, index + 1)
+
+    def track_removals(self):
+        """New list that the cell index of every removed item is appended to.
+
+        Each caller gets its own log and clears it as it consumes it.
+        """
+        log = []
+        self.logs.append(log)
+        return log
+
+    def stop_tracking(self, log):
+        self.logs = [other for other in self.logs if other is not log]
+
+    def index(self, x, y):
+        """Cell index holding pixel (x, y), or None outside the grid"""
+        grid_x = int(x // CELL_SIZE)
+        grid_y = int(y // CELL_SIZE)
+        if 0 <= grid_x < self.width and 0 <= grid_y < self.height:
+            return grid_y * self.width + grid_x
+        return None
+
+    def add(self, x, y):
+        index = self.index(x, y)
+        if not self.cells[index]:
+            self.cells[index] = 1
+            self.count += 1
+
+    def remove(self, x, y):
+        index = self.index(x, y)
+        if index is None or not self.cells[index]:
+            raise ValueError(f"no item at {(x, y)}")
+        self.cells[index] = 0
+        self.count -= 1
+        for log in self.logs:
+            log.append(index)
+
+    def copy(self):
+        grid = ItemGrid(self.width, self.height)
+        grid.cells[:] = self.cells
+        grid.count = self.count
+        return grid
+
+    def snapshot(self):
+        """Immutable copy of the bitmap and count"""
+        return bytes(self.cells), self.count
+
+    def restore(self, state):
+        cells, self.count = state
+        self.cells[:] = cells
+
+    def collect(self, x, y, radius):
+        """Remove every item closer than radius to (x, y) and return how many"""
+        collected = 0
+        half = CELL_SIZE // 2
+        limit = radius * radius
+        cells = self.cells
+        min_x = max(0, (x - radius) // CELL_SIZE)
+        max_x = min(self.width - 1, (x + radius) // CELL_SIZE)
+        for grid_y in range(max(0, (y - radius) // CELL_SIZE), min(self.height - 1, (y + radius) // CELL_SIZE) + 1):
+            dy = y - (grid_y * CELL_SIZE + half)
+            row = grid_y * self.width
+            for grid_x in range(min_x, max_x + 1):
+                if cells[row + grid_x]:
+                    dx = x - (grid_x * CELL_SIZE + half)
+                    if dx * dx + dy * dy < limit:
+                        cells[row + grid_x] = 0
+                        collected += 1
+                        for log in self.logs:
+                            log.append(row + grid_x)
+        self.count -= collected
+        return collected
+
+
+class Pacman(Mover):
+    __slots__ = ("radius", "mouth_animation", "animation_speed")
+
+    def __init__(self, x, y):
+        super().__init__(x, y, 2)
+        self.direction = 0  # 0: right, 1: down, 2: left, 3: up
+        self.next_direction = 0
+        self.radius = 10
+        self.mouth_animation = 0
+        self.animation_speed = 0.2
+
+    def move(self, walk):
+        # Reverse at once; turns into side corridors wait for a cell centre
+        self.advance(walk)
+
+        # Update mouth animation
+        self.mouth_animation += self.animation_speed
+
+    def snapshot(self):
+        return (self.fx, self.fy, self.direction, self.next_direction, self.mouth_animation)
+
+    def restore(self, state):
+        self.fx, self.fy, self.direction, self.next_direction, self.mouth_animation = state
+
+
+class Ghost(Mover):
+    __slots__ = ("color", "name", "rng", "radius", "body_animation", "animation_speed",
+                 "change_direction_timer", "change_direction_interval", "ai")
+
+    def __init__(self, x, y, color, name, rng=None):
+        super().__init__(x, y, 1.5)
+        self.color = color
+        self.name = name
+        self.rng = rng if rng is not None else random.Random()
+        self.direction = 0  # Start with right direction
+        self.next_direction = 0
+        self.radius = 10
+        self.body_animation = 0
+        self.animation_speed = 0.15
+        self.change_direction_timer = 0
+        self.change_direction_interval = 60  # Change direction every 60 frames
+        # Shared pathfinding.GhostAI; without one the ghost wanders randomly
+        self.ai = None
+
+    def move(self, walk, pacman=None):
+        if self.ai is None:
+            self.wander(pacman)
+        self.advance(walk)
+        self.body_animation += self.animation_speed
+
+    def wander(self, pacman):
+        self.change_direction_timer += 1
+
+        # Simple AI - sometimes head towards Pacman at the next junction
+        if pacman and self.rng.random() < 0.1:  # 10% chance to chase
+            dx = pacman.fx - self.fx
+            dy = pacman.fy - self.fy
+            if abs(dx) > abs(dy):
+                self.next_direction = 0 if dx > 0 else 2
+            else:
+                self.next_direction = 1 if dy > 0 else 3
+
+        # Wander off somewhere else periodically
+        if self.change_direction_timer >= self.change_direction_interval:
+            self.change_direction_timer = 0
+            self.next_direction = self.rng.randrange(4)
+
+    def snapshot(self):
+        return (self.fx, self.fy, self.direction, self.next_direction,
+                self.body_animation, self.change_direction_timer)
+
+    def restore(self, state):
+        (self.fx, self.fy, self.direction, self.next_direction,
+         self.body_animation, self.change_direction_timer) = state
+
+    def at_centre(self, mask):
+        if self.ai is not None:
+            self.direction = self.next_direction = self.ai.choose_direction(self, mask)
+            return
+        if mask & DIRECTION_BITS[self.next_direction]:
+            self.direction = self.next_direction
+        # Change direction when stuck
+        if not mask & DIRECTION_BITS[self.direction]:
+            self.choose_new_direction(mask)
+
+    def choose_new_direction(self, mask):
+        """Choose a new random direction that's open in mask"""
+        directions = [0, 1, 2, 3]
+        self.rng.shuffle(directions)
+
+        for direction in directions:
+            if mask & DIRECTION_BITS[direction]:
+                self.direction = direction
+                self.next_direction = direction
+                break
+
+
+class GameSnapshot:
+    """Everything GameCore.restore() needs to rewind a game to one frame"""
+    __slots__ = ("frame", "score", "lives", "state", "rng_state", "pacman", "ghosts",
+                 "dots", "power_pellets", "ghost_ai")
+
+    def __init__(self, game):
+        self.frame = game.frame
+        self.score = game.score
+        self.lives = game.lives
+        self.state = game.state
+        self.rng_state = game.rng.getstate()
+        self.pacman = game.pacman.snapshot()
+        self.ghosts = [ghost.snapshot() for ghost in game.ghosts]
+        self.dots = game.dots.snapshot()
+        self.power_pellets = game.power_pellets.snapshot()
+        self.ghost_ai = game.ghost_ai.snapshot()
+
+
+class GameCore:
+    """Simulation state and rules with a reset(seed) / step(action) API.
+
+    Subclasses can swap the actor classes through pacman_class and
+    ghost_class, which is how the pygame renderer adds drawing, and the
+    spawn points through pacman_start and ghost_spawns. A levels.Level
+    replaces the generated maze, items and spawns.
+    """
+    pacman_class = Pacman
+    ghost_class = Ghost
+    pacman_start = PACMAN_START
+    ghost_spawns = GHOST_SPAWNS
+
+    def __init__(self, seed=None, verbose=False, record=False, maze_size=None, level=None):
+        # Rules emit typed events into a ring buffer instead of printing;
+        # subscribers and background EventLogs read it (see events.py), and
+        # verbose echoes it to stdout from such a log
+        self.verbose = verbose
+        self.events = EventBuffer()
+        self.event_logs = []
+        if verbose:
+            self.log_events(sys.stdout, TEXT)
+        # (width, height) in cells for generated mazes; None fits the screen
+        if maze_size is not None and (maze_size[0] < MIN_MAZE_SIZE[0]
+                                      or maze_size[1] < MIN_MAZE_SIZE[1]):
+            raise ValueError(f"mazes must be at least {MIN_MAZE_SIZE[0]}x{MIN_MAZE_SIZE[1]} "
+                             f"cells, got {maze_size[0]}x{maze_size[1]}")
+        self.maze_size = maze_size
+        self.level = level
+        if level is not None:
+            self.pacman_start = level.pacman_start
+            self.ghost_spawns = level.ghost_spawns
+        # Keep a Recording of every frame's input, restarted by reset()
+        self.record = record
+        # Optional profiler.FrameProfiler timing each phase of update()
+        self.profiler = None
+        self.maze = self.create_maze()
+        # A level brings its own masks and distance tables
+        self.walk = self.level.walkability() if level is not None else Walkability(self.maze)
+        if level is None and maze_size is not None:
+            self.fit_spawns()
+        # Dots and pellets are placed once per maze and copied on reset
+        self.initial_items = None
+        # Bumped whenever the state jumps (reset or restore) rather than
+        # steps, so incremental observers know to start over
+        self.epoch = 0
+        self.state = PLAYING
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new game; the same seed always replays the same ghosts.
+
+        Without a seed one is drawn at random, so every game can be replayed
+        from self.seed.
+        """
+        if seed is None:
+            seed = random.randrange(1 << 63)
+        self.seed = seed
+        self.epoch += 1
+        self.rng = random.Random(seed)
+        self.pacman = self.pacman_class(*self.pacman_start)
+        self.ghosts = [self.ghost_class(x, y, color, name, self.rng)
+                       for x, y, color, name in self.ghost_spawns]
+        self.ghost_ai = GhostAI(self.walk, self.rng)
+        for ghost in self.ghosts:
+            ghost.ai = self.ghost_ai
+        self.spatial = SpatialHash(self.walk.width)
+        self.spatial.rebuild(self.ghosts)
+        if self.initial_items is None or self.initial_items[0] is not self.maze:
+            self.initial_items = (self.maze, self.create_dots(), self.create_power_pellets())
+        self.dots = self.initial_items[1].copy()
+        self.power_pellets = self.initial_items[2].copy()
+        self.score = 0
+        self.lives = START_LIVES
+        self.frame = 0
+        self.events.emit(0, STATE_CHANGE, self.state, PLAYING)
+        self.state = PLAYING
+        if self.record:
+            self.recording = Recording(seed, maze_size=(self.walk.width, self.walk.height))
+        else:
+            self.recording = None
+
+    def step(self, action=None):
+        """Advance one frame and return (reward, done).
+
+        action is a direction (0: right, 1: down, 2: left, 3: up) queued as
+        Pacman's next turn, or None to keep the current input.
+        """
+        if action is not None:
+            self.pacman.next_direction = action
+        score = self.score
+        self.update()
+        return self.score - score, self.state != PLAYING
+
+    def fit_spawns(self):
+        """Move spawns that miss a small generated maze to the nearest open cell.
+
+        The default spawns are fixed pixel positions laid out for the full
+        screen; on mazes that hold them they are left where they are.
+        """
+        self.pacman_start = self.open_spawn(*self.pacman_start)
+        self.ghost_spawns = [self.open_spawn(x, y) + (color, name)
+                             for x, y, color, name in self.ghost_spawns]
+
+    def open_spawn(self, x, y):
+        walk = self.walk
+        cell_x, cell_y = x // CELL_SIZE, y // CELL_SIZE
+        if (0 <= cell_x < walk.width and 0 <= cell_y < walk.height
+                and walk.masks[cell_y * walk.width + cell_x]):
+            return (x, y)
+        cell = distance_table(walk).nearest_open(cell_x, cell_y)
+        half = CELL_SIZE // 2
+        return ((cell % walk.width) * CELL_SIZE + half, (cell // walk.width) * CELL_SIZE + half)
+
+    def create_maze(self):
+        if self.level is not None:
+            return self.level.maze
+        if self.maze_size is not None:
+            return create_maze(*self.maze_size)
+        return create_maze()
+
+    def create_dots(self):
+        if self.level is not None:
+            return ItemGrid.from_cells(self.level.width, self.level.height, self.level.dots)
+        return ItemGrid(len(self.maze[0]), len(self.maze), create_dots(self.maze))
+
+    def create_power_pellets(self):
+        if self.level is not None:
+            return ItemGrid.from_cells(self.level.width, self.level.height, self.level.pellets)
+        return ItemGrid(len(self.maze[0]), len(self.maze), create_power_pellets(self.maze))
+
+    def update(self):
+        if self.state == PLAYING:
+            profiler = self.profiler
+            self.frame += 1
+            if self.recording is not None:
+                self.recording.record(self.pacman.next_direction)
+            self.pacman.move(self.walk)
+            if profiler is not None:
+                profiler.mark("pacman")
+
+            # Ghosts steer by the shared distance field from Pacman's cell
+            self.ghost_ai.update(self.frame, self.pacman, self.ghosts)
+            for ghost in self.ghosts:
+                ghost.move(self.walk, self.pacman)
+            # Ghosts are bucketed by cell so collision checks only look nearby
+            self.spatial.refresh()
+            if profiler is not None:
+                profiler.mark("ghosts")
+
+            # Check dot collection in the cells around Pacman
+            pacman_x = self.pacman.fx // SUBPIXELS
+            pacman_y = self.pacman.fy // SUBPIXELS
+            dots_collected = self.dots.collect(pacman_x, pacman_y, 15)  # Increased collision radius
+            if dots_collected:
+                self.score += dots_collected * DOT_SCORE
+                self.events.emit(self.frame, DOT_EATEN, dots_collected, self.score)
+
+            # Check power pellet collection
+            pellets_collected = self.power_pellets.collect(pacman_x, pacman_y, 18)
+            if pellets_collected:
+                self.score += pellets_collected * PELLET_SCORE
+                self.events.emit(self.frame, PELLET_EATEN, pellets_collected, self.score)
+            if profiler is not None:
+                profiler.mark("items")
+
+            self.check_ghost_collisions()
+
+            # Check win condition
+            if not self.dots and not self.power_pellets:
+                self.events.emit(self.frame, STATE_CHANGE, self.state, WIN)
+                self.state = WIN
+            if self.state != PLAYING and self.recording is not None:
+                # Seal the recording as the game ends, so input after it
+                # (keys pressed on the game over screen) cannot change the hash
+                self.recording.final_hash = self.state_hash()
+            if profiler is not None:
+                profiler.mark("collisions")
+
+    def check_ghost_collisions(self):
+        """Take a life for every ghost touching Pacman, in ghost order"""
+        caught = self.spatial.near(self.pacman.fx, self.pacman.fy, CATCH_DISTANCE)
+        position = 0
+        while position < len(caught):
+            index = caught[position]
+            position += 1
+            self.lives -= 1
+            self.events.emit(self.frame, LIFE_LOST, self.lives, index)
+            if self.lives <= 0:
+                if self.state != GAME_OVER:
+                    self.events.emit(self.frame, STATE_CHANGE, self.state, GAME_OVER)
+                self.state = GAME_OVER
+            else:
+                self.reset_positions()
+                # Everyone moved: only later ghosts at their spawns can still hit
+                caught = [later for later in self.spatial.near(self.pacman.fx, self.pacman.fy,
+                                                               CATCH_DISTANCE) if later > index]
+                position = 0
+
+    def snapshot(self):
+        """Capture the game state for restore(); the recording is not included"""
+        return GameSnapshot(self)
+
+    def restore(self, snapshot):
+        """Rewind to a snapshot taken from this game (or one on the same maze)"""
+        self.epoch += 1
+        self.frame = snapshot.frame
+        self.score = snapshot.score
+        self.lives = snapshot.lives
+        if snapshot.state != self.state:
+            self.events.emit(snapshot.frame, STATE_CHANGE, self.state, snapshot.state)
+        self.state = snapshot.state
+        self.rng.setstate(snapshot.rng_state)
+        self.pacman.restore(snapshot.pacman)
+        for ghost, state in zip(self.ghosts, snapshot.ghosts):
+            ghost.restore(state)
+        self.dots.restore(snapshot.dots)
+        self.power_pellets.restore(snapshot.power_pellets)
+        self.ghost_ai.restore(snapshot.ghost_ai)
+        self.spatial.rebuild(self.ghosts)
+
+    def state_hash(self):
+        """16-byte digest of everything that decides how the game goes on"""
+        digest = hashlib.blake2b(digest_size=16)
+        actors = [self.pacman] + self.ghosts
+        digest.update(struct.pack("<4q", self.frame, self.score, self.lives, self.state))
+        for actor in actors:
+            digest.update(struct.pack("<4q", actor.fx, actor.fy, actor.direction, actor.next_direction))
+        digest.update(self.dots.cells)
+        digest.update(self.power_pellets.cells)
+        return digest.digest()
+
+    def log_events(self, target, format=JSONL):
+        """Start an events.EventLog writing this game's events to target.
+
+        close_event_logs() stops it; otherwise it is closed at interpreter
+        exit, so the last events are written even if nobody shuts it down.
+        """
+        log = EventLog(self.events, target, format)
+        self.event_logs.append(log)
+        atexit.register(log.close)
+        return log
+
+    def close_event_logs(self):
+        """Write out every pending event and stop the logs"""
+        for log in self.event_logs:
+            log.close()
+            atexit.unregister(log.close)
+        self.event_logs = []
+
+    def finish_recording(self):
+        """Seal the current recording with the state hash and return it.
+
+        A game that ended was sealed on its last frame; one still playing is
+        sealed as it stands.
+        """
+        if self.recording.final_hash is None:
+            self.recording.final_hash = self.state_hash()
+        return self.recording
+
+    def reset_positions(self):
+        """Send Pacman and the ghosts back to their spawn points after a death"""
+        self.pacman.x, self.pacman.y = self.pacman_start
+        for ghost, (x, y, _, _) in zip(self.ghosts, self.ghost_spawns):
+            ghost.x = x
+            ghost.y = y
+        self.spatial.rebuild(self.ghosts)
@@ -0,0 +1,130 @@
+"""Cached HUD and overlay surfaces.
+
+The score and lives only change a few times a second, yet rendering their
+text (and its shadow) costs a font.render() each. Hud renders each label
+once per value and keeps it, along with the life icons for each count and a
+dimming overlay allocated once for the game over and win screens, so
+drawing the HUD renders and allocates nothing unless a value changed.
+
+Even those blits blend every text pixel. draw_cached() therefore keeps a
+copy of the finished HUD region. While the values and the frame beneath are
+the same and nothing else was drawn into the region, it puts back that
+copy, an opaque blit, and composites the HUD again only when something
+changes.
+
+Fonts also live here and are loaded on first use, so starting a game never
+initialises the font module before the HUD is first drawn.
+"""
+import pygame
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+YELLOW = (255, 255, 0)
+
+LARGE = 36
+SMALL = 24
+
+# Colour keyed as transparent in the life icon strips; the icons don't use it
+TRANSPARENT = (255, 0, 255)
+LIFE_RADIUS = 8
+LIFE_SPACING = 25
+
+# Rendered labels kept; the oldest go first (a game shows a few hundred scores)
+MAX_TEXTS = 64
+
+
+def load_font(size):
+    """Default font at size, starting the font module on first use"""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(None, size)
+
+
+class Hud:
+    """Score, lives and message overlays drawn from cached surfaces"""
+
+    def __init__(self, size):
+        self.size = size
+        self.fonts = {}
+        self.texts = {}
+        self.life_icons = {}
+        self.overlay = None
+        # The composited HUD region and what it was composited from
+        self.composite = None
+        self.composite_rect = None
+        self.composite_key = None
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = load_font(size)
+        return font
+
+    def text(self, text, color, size=LARGE):
+        """Surface of text, rendered on the first request for it"""
+        key = (text, color, size)
+        surface = self.texts.get(key)
+        if surface is None:
+            if len(self.texts) >= MAX_TEXTS:
+                del self.texts[next(iter(self.texts))]
+            surface = self.texts[key] = self.font(size).render(text, True, color)
+        return surface
+
+    def lives_strip(self, lives):
+        """One surface holding lives icons in a row"""
+        strip = self.life_icons.get(lives)
+        if strip is None:
+            diameter = 2 * LIFE_RADIUS + 1
+            strip = pygame.Surface(((lives - 1) * LIFE_SPACING + diameter, diameter))
+            strip.fill(TRANSPARENT)
+            for i in range(lives):
+                pygame.draw.circle(strip, YELLOW, (LIFE_RADIUS + i * LIFE_SPACING, LIFE_RADIUS),
+                                   LIFE_RADIUS)
+            strip.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+            self.life_icons[lives] = strip
+        return strip
+
+    def draw(self, screen, score, lives):
+        """Blit the score and lives; returns the region drawn"""
+        score_label = f"Score: {score}"
+        lives_label = f"Lives: {lives}"
+        rect = screen.blit(self.text(score_label, BLACK), (12, 12))
+        rect.union_ip(screen.blit(self.text(score_label, WHITE), (10, 10)))
+        rect.union_ip(screen.blit(self.text(lives_label, BLACK), (12, 52)))
+        rect.union_ip(screen.blit(self.text(lives_label, WHITE), (10, 50)))
+        if lives > 0:
+            rect.union_ip(screen.blit(self.lives_strip(lives),
+                                      (120 - LIFE_RADIUS, 65 - LIFE_RADIUS)))
+        return rect
+
+    def draw_cached(self, screen, score, lives, backdrop, covering=()):
+        """draw(), reusing the last composited HUD while nothing under it changed.
+
+        backdrop identifies the frame drawn beneath the HUD and must change
+        whenever that does; covering lists the rects of anything else drawn
+        this frame before the HUD. Returns the region drawn.
+        """
+        key = (score, lives, backdrop)
+        if key == self.composite_key and self.composite_rect.collidelist(covering) == -1:
+            return screen.blit(self.composite, self.composite_rect)
+        rect = self.draw(screen, score, lives)
+        if rect.collidelist(covering) == -1:
+            self.composite = screen.subsurface(rect).copy()
+            self.composite_rect = rect
+            self.composite_key = key
+        else:
+            self.composite_key = None
+        return rect
+
+    def draw_message(self, screen, title, color):
+        """Dim the frame and show title with the restart hint"""
+        if self.overlay is None:
+            self.overlay = pygame.Surface(self.size)
+            self.overlay.set_alpha(128)
+            self.overlay.fill(BLACK)
+        screen.blit(self.overlay, (0, 0))
+        width, height = self.size
+        title_text = self.text(title, color)
+        restart_text = self.text("Press SPACE to restart", WHITE, SMALL)
+        screen.blit(title_text, title_text.get_rect(center=(width // 2, height // 2 - 20)))
+        screen.blit(restart_text, restart_text.get_rect(center=(width // 2, height // 2 + 20)))
@@ -0,0 +1,98 @@
+"""Timestamped direction input applied on the tick each turn becomes legal.
+
+Key presses are queued with the time they were received instead of
+overwriting Pacman's next direction. Before every tick the oldest pending
+turn steers Pacman; once Pacman is heading that way (the tick the turn was
+legal) it leaves the queue and the next one takes over. Two taps between
+frames, or between ticks of a catch-up burst, are both played in order
+rather than the later one silently winning. A turn that has not become
+legal within buffer_ticks stops blocking the queue. Pacman keeps it as the
+wish until another turn replaces it, just as a single tap always worked.
+
+For tuning the loop, two delays go into profiler.PhaseStats. latency runs
+from a key press to the display flip of the first frame drawn after a tick
+acted on it, which is what the player feels of the loop. turn_delay runs from
+the press to the tick that took the turn, so it also includes waiting for
+Pacman to reach a side corridor. Key presses are stamped when the game loop
+receives them, since pygame events carry no high-resolution time.
+"""
+import time
+from collections import deque
+
+from profiler import PhaseStats
+
+# Ticks a buffered turn may wait to become legal before the next one runs
+BUFFER_TICKS = 20
+# Taps beyond this many pending turns push out the oldest
+MAX_PENDING = 3
+
+
+class InputQueue:
+    """Pending turns of one player, with press-to-turn and press-to-flip statistics"""
+
+    def __init__(self, buffer_ticks=BUFFER_TICKS, max_pending=MAX_PENDING, window=600):
+        self.buffer_ticks = buffer_ticks
+        self.max_pending = max_pending
+        # [direction, press time, ticks waited], oldest first
+        self.pending = deque()
+        # Press times of turns first acted on since the last flip
+        self.shown = []
+        self.turn_delay = PhaseStats(window)
+        self.latency = PhaseStats(window)
+        self.expired = 0
+        self.dropped = 0
+
+    def push(self, direction, pressed_at=None):
+        """Queue a turn; pressed_at defaults to now (time.perf_counter)"""
+        if pressed_at is None:
+            pressed_at = time.perf_counter()
+        if self.pending and self.pending[-1][0] == direction:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.pending.popleft()
+            self.dropped += 1
+        self.pending.append([direction, pressed_at, 0])
+
+    def clear(self):
+        self.pending.clear()
+        self.shown.clear()
+
+    def before_tick(self, pacman):
+        """Steer pacman by the oldest pending turn for the coming tick"""
+        if self.pending:
+            turn = self.pending[0]
+            pacman.next_direction = turn[0]
+            if turn[2] == 0:
+                self.shown.append(turn[1])
+
+    def after_tick(self, pacman):
+        """Retire the oldest turn if pacman took it this tick, else age it"""
+        if not self.pending:
+            return
+        turn = self.pending[0]
+        if pacman.direction == turn[0]:
+            self.pending.popleft()
+            self.turn_delay.add(time.perf_counter() - turn[1])
+            return
+        turn[2] += 1
+        if turn[2] >= self.buffer_ticks:
+            self.pending.popleft()
+            self.expired += 1
+
+    def flipped(self, now=None):
+        """Record press-to-display latency of the turns shown by this flip"""
+        if not self.shown:
+            return
+        if now is None:
+            now = time.perf_counter()
+        for pressed_at in self.shown:
+            self.latency.add(now - pressed_at)
+        self.shown.clear()
+
+    def report(self):
+        turn = self.turn_delay.summary()
+        shown = self.latency.summary()
+        return (f"input: {turn['count']} turns taken, {self.expired} expired, "
+                f"{self.dropped} dropped; press to turn p50 {turn['p50_ms']:.1f} ms, "
+                f"press to flip p50 {shown['p50_ms']:.1f} / p95 {shown['p95_ms']:.1f} / "
+                f"p99 {shown['p99_ms']:.1f} ms")
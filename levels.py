@@ -0,0 +1,386 @@
+"""Text level files and their compiled, memory-mapped form.
+
+A level is a text grid, one character per cell:
+
+    #   wall
+    .   dot
+    o   power pellet
+    *   power pellet on a dot (as the generated maze corners have)
+        (space) empty floor
+    P   Pacman's start (exactly one)
+    1-9 ghost spawns: 1 Blinky, 2 Pinky, 3 Inky, 4 Clyde, then the colours repeat
+
+Lines starting with ';' are comments. Rows shorter than the widest row are
+padded with walls. Spawn cells in the grid start without items; a spawn on a
+cell that has them is given on a line of its own, such as "@P 3 3" or
+"@2 20 12" (spawn, then 0-based cell x and y), and the grid keeps the item.
+
+Parsing a level and working out its walkability masks and distance tables
+costs time that grows with the maze, so load_level() compiles each level once
+into a binary file cached on disk, keyed by the SHA-256 of the source. Later
+loads memory-map that file: the grid, masks, item bitmaps and distance tables
+are read straight from the page cache without being parsed or recomputed.
+
+Compiled layout (little-endian, sections 8-byte aligned):
+
+    header      HEADER (magic, version, width, height, flags, Pacman cell,
+                spawn count, source hash)
+    spawns      SPAWN per ghost (cell x, cell y, ghost number)
+    grid        one byte per cell, 1 for walls
+    masks       movement.Walkability masks
+    dots        one byte per cell, 1 for a dot
+    pellets     one byte per cell, 1 for a power pellet
+    nearest     int64 nearest open cell per cell      (flag NEAREST_OPEN)
+    distances   uint16 cells x cells all-pairs table  (flag DISTANCES)
+
+Usage: python levels.py build LEVEL...      compile levels into their caches
+       python levels.py export PATH [WxH]   write the generated maze as a level
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from constants import CELL_SIZE, GHOST_SPAWNS, MAZE_WIDTH, MAZE_HEIGHT
+from maze import Maze
+from movement import Walkability
+from pathfinding import LARGE_MAZE_CELLS, UNREACHABLE, DistanceTable, distance_table
+
+MAGIC = b"PMZ1"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIIIII32s")
+SPAWN = struct.Struct("<III")
+
+# Section flags
+NEAREST_OPEN = 1
+DISTANCES = 2
+
+# All-pairs tables are stored for mazes up to this many cells (32 MB);
+# bigger mazes fall back to the lazy BFS rows of pathfinding.DistanceTable
+MAX_DISTANCE_CELLS = 1 << 12
+
+WALL = "#"
+DOT = "."
+PELLET = "o"
+DOT_AND_PELLET = "*"
+FLOOR = " "
+PACMAN = "P"
+COMMENT = ";"
+SPAWN_LINE = "@"
+
+CACHE_DIR = "__levelcache__"
+
+
+def align(offset):
+    return (offset + 7) & ~7
+
+
+class Level:
+    """Grid, items and spawn cells of one level.
+
+    masks, dots, pellets and the optional tables may be memoryviews into a
+    mapped file; they are read-only and shared by every game on the level.
+    """
+
+    def __init__(self, width, height, cells, masks, dots, pellets, pacman_cell, ghost_cells,
+                 nearest_open=None, distances=None):
+        self.width = width
+        self.height = height
+        self.maze = Maze(width, height, cells)
+        self.masks = masks
+        self.dots = dots
+        self.pellets = pellets
+        self.pacman_cell = pacman_cell
+        # (cell_x, cell_y, ghost number) in spawn order
+        self.ghost_cells = ghost_cells
+        self.nearest_open = nearest_open
+        self.distances = distances
+
+    @property
+    def pacman_start(self):
+        return cell_centre(*self.pacman_cell)
+
+    @property
+    def ghost_spawns(self):
+        """Ghost spawns in the (x, y, color, name) form of constants.GHOST_SPAWNS"""
+        spawns = []
+        for cell_x, cell_y, number in self.ghost_cells:
+            _, _, color, name = GHOST_SPAWNS[(number - 1) % len(GHOST_SPAWNS)]
+            spawns.append(cell_centre(cell_x, cell_y) + (color, name))
+        return spawns
+
+    def walkability(self):
+        """Walkability over the stored masks, with the stored tables installed"""
+        walk = Walkability.from_masks(self.width, self.height, self.masks)
+        distance_table(walk, self.nearest_open, self.distances)
+        return walk
+
+    def to_text(self):
+        """Text form; spawns on cells with items go on spawn lines after the grid"""
+        spawns = [(self.pacman_cell, PACMAN)]
+        spawns += [((x, y), str(number)) for x, y, number in self.ghost_cells]
+        inline = {}
+        spawn_lines = []
+        for (x, y), char in spawns:
+            index = y * self.width + x
+            if self.dots[index] or self.pellets[index] or (x, y) in inline:
+                spawn_lines.append(f"{SPAWN_LINE}{char} {x} {y}")
+            else:
+                inline[(x, y)] = char
+        lines = []
+        for y in range(self.height):
+            chars = []
+            for x in range(self.width):
+                index = y * self.width + x
+                if (x, y) in inline:
+                    chars.append(inline[(x, y)])
+                elif self.maze.cells[index]:
+                    chars.append(WALL)
+                elif self.pellets[index]:
+                    chars.append(DOT_AND_PELLET if self.dots[index] else PELLET)
+                elif self.dots[index]:
+                    chars.append(DOT)
+                else:
+                    chars.append(FLOOR)
+            lines.append("".join(chars))
+        return "\n".join(lines + spawn_lines) + "\n"
+
+
+def cell_centre(cell_x, cell_y):
+    half = CELL_SIZE // 2
+    return (cell_x * CELL_SIZE + half, cell_y * CELL_SIZE + half)
+
+
+def source_hash(text):
+    """Cache key of a level source, changed by any edit or format bump"""
+    return hashlib.sha256(b"%s%d\n%s" % (MAGIC, VERSION, text.encode())).digest()
+
+
+def parse_level(text):
+    """Level from the text format; tables are left for compile_level()"""
+    rows = []
+    spawn_lines = []
+    for line in text.splitlines():
+        if line.startswith(SPAWN_LINE):
+            spawn_lines.append(line)
+        elif not line.startswith(COMMENT):
+            rows.append(line.rstrip("\r\n"))
+    while rows and not rows[-1].strip():
+        rows.pop()
+    while rows and not rows[0].strip():
+        rows.pop(0)
+    if not rows:
+        raise ValueError("level has no rows")
+    width = max(len(row) for row in rows)
+    height = len(rows)
+    size = width * height
+    cells = bytearray(b"\x01" * size)
+    dots = bytearray(size)
+    pellets = bytearray(size)
+    pacman_cell = None
+    ghost_cells = []
+    for y, row in enumerate(rows):
+        for x, char in enumerate(row):
+            index = y * width + x
+            if char == WALL:
+                continue
+            cells[index] = 0
+            if char == DOT:
+                dots[index] = 1
+            elif char == PELLET:
+                pellets[index] = 1
+            elif char == DOT_AND_PELLET:
+                dots[index] = 1
+                pellets[index] = 1
+            elif char == PACMAN:
+                if pacman_cell is not None:
+                    raise ValueError(f"second Pacman start at row {y + 1}, column {x + 1}")
+                pacman_cell = (x, y)
+            elif "1" <= char <= "9":
+                ghost_cells.append((x, y, int(char)))
+            elif char != FLOOR:
+                raise ValueError(f"unknown cell {char!r} at row {y + 1}, column {x + 1}")
+    for line in spawn_lines:
+        fields = line[len(SPAWN_LINE):].split()
+        try:
+            char, x, y = fields[0], int(fields[1]), int(fields[2])
+        except (IndexError, ValueError):
+            raise ValueError(f"bad spawn line {line!r}") from None
+        if len(fields) != 3 or not (char == PACMAN or char in "123456789"):
+            raise ValueError(f"bad spawn line {line!r}")
+        if not (0 <= x < width and 0 <= y < height) or cells[y * width + x]:
+            raise ValueError(f"spawn line {line!r} is not on an open cell")
+        if char == PACMAN:
+            if pacman_cell is not None:
+                raise ValueError(f"second Pacman start in spawn line {line!r}")
+            pacman_cell = (x, y)
+        else:
+            ghost_cells.append((x, y, int(char)))
+    if pacman_cell is None:
+        raise ValueError("level has no Pacman start")
+    # Spawn order (and so ghost order) follows the ghost numbers
+    ghost_cells.sort(key=lambda spawn: spawn[2])
+    masks = Walkability.build_masks(cells, width, height)
+    return Level(width, height, cells, masks, dots, pellets, pacman_cell, ghost_cells)
+
+
+def level_from_maze(maze, dots, pellets, pacman_start, ghost_spawns):
+    """Level holding a generated maze with its item grids and pixel spawns.
+
+    The items are kept exactly as generated, spawn cells included, so a game
+    on the level plays out as GameCore does on the generated maze.
+    """
+    ghost_cells = []
+    for number, (x, y, _, _) in enumerate(ghost_spawns, 1):
+        ghost_cells.append((x // CELL_SIZE, y // CELL_SIZE, number))
+    pacman_cell = (pacman_start[0] // CELL_SIZE, pacman_start[1] // CELL_SIZE)
+    masks = Walkability.build_masks(maze.cells, maze.width, maze.height)
+    return Level(maze.width, maze.height, maze.cells, masks, bytearray(dots.cells),
+                 bytearray(pellets.cells), pacman_cell, ghost_cells)
+
+
+def compile_level(level, digest):
+    """Binary form of a level, with the tables its size allows"""
+    size = level.width * level.height
+    flags = 0
+    # Reuses the level's stored tables if it was itself read from a compiled
+    # file. The table is private to this call: caching it would leave a copy
+    # in the process (and every process forked from it) shadowing the tables
+    # the compiled level is loaded with
+    walk = Walkability.from_masks(level.width, level.height, level.masks)
+    table = DistanceTable(walk, level.nearest_open, level.distances)
+    tables = []
+    # Tables are stored in native order, so only little-endian hosts write them
+    if sys.byteorder == "little":
+        if size <= LARGE_MAZE_CELLS:
+            flags |= NEAREST_OPEN
+            tables.append(table.nearest_open_cells().tobytes())
+        if size <= MAX_DISTANCE_CELLS:
+            flags |= DISTANCES
+            table.precompute()
+            unreachable = array('H', [UNREACHABLE]) * size
+            tables.append(b"".join(table.row(cell).tobytes() if level.masks[cell]
+                                   else unreachable.tobytes() for cell in range(size)))
+
+    parts = [HEADER.pack(MAGIC, VERSION, level.width, level.height, flags,
+                         level.pacman_cell[0], level.pacman_cell[1], len(level.ghost_cells), digest)]
+    parts += [SPAWN.pack(*spawn) for spawn in level.ghost_cells]
+    offset = HEADER.size + SPAWN.size * len(level.ghost_cells)
+    for section in [level.maze.cells, level.masks, level.dots, level.pellets] + tables:
+        padding = align(offset) - offset
+        parts.append(bytes(padding))
+        parts.append(bytes(section))
+        offset += padding + len(section)
+    return b"".join(parts)
+
+
+def read_compiled(buffer, digest=None):
+    """Level viewing a compiled buffer (bytes or mmap) without copying the tables.
+
+    Returns None if the buffer is not a compiled level of this version, or
+    was compiled from a different source than digest; raises ValueError if
+    it is cut short.
+    """
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, width, height, flags, pacman_x, pacman_y, ghosts, stored = \
+        HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or (digest is not None and stored != digest):
+        return None
+    view = memoryview(buffer)
+    ghost_cells = [SPAWN.unpack_from(buffer, HEADER.size + SPAWN.size * i) for i in range(ghosts)]
+    offset = HEADER.size + SPAWN.size * ghosts
+    size = width * height
+
+    def section(length, format='B'):
+        nonlocal offset
+        start = align(offset)
+        offset = start + length
+        if offset > len(view):
+            raise ValueError("compiled level is truncated")
+        return view[start:offset].cast(format)
+
+    cells = section(size)
+    masks = section(size)
+    dots = section(size)
+    pellets = section(size)
+    nearest_open = section(8 * size, 'q') if flags & NEAREST_OPEN else None
+    distances = section(2 * size * size, 'H') if flags & DISTANCES else None
+    return Level(width, height, cells, masks, dots, pellets, (pacman_x, pacman_y), ghost_cells,
+                 nearest_open, distances)
+
+
+def cache_path(path, digest, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    return os.path.join(cache_dir, digest.hex() + ".pmz")
+
+
+def map_file(path):
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_level(path, cache_dir=None):
+    """Level from a text file, compiled on first use and memory-mapped after.
+
+    The compiled file goes to cache_dir (default: __levelcache__ next to the
+    level). If the cache cannot be written the level is compiled in memory.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    digest = source_hash(text)
+    compiled = cache_path(path, digest, cache_dir)
+    try:
+        level = read_compiled(map_file(compiled), digest)
+    except (OSError, ValueError):
+        level = None
+    if level is not None:
+        return level
+
+    data = compile_level(parse_level(text), digest)
+    try:
+        os.makedirs(os.path.dirname(compiled), exist_ok=True)
+        # Write then rename, so a concurrent load never maps half a file
+        temporary = f"{compiled}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, compiled)
+        return read_compiled(map_file(compiled), digest)
+    except OSError:
+        return read_compiled(data, digest)
+
+
+if __name__ == "__main__":
+    from game_core import GameCore, parse_maze_size
+
+    parser = argparse.ArgumentParser(description="Compile or export Pacman levels")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile levels into their caches")
+    build.add_argument("levels", nargs="+", metavar="LEVEL")
+    build.add_argument("--cache-dir", help="directory for compiled levels")
+    export = commands.add_parser("export", help="write the generated maze as a level file")
+    export.add_argument("path")
+    export.add_argument("size", nargs="?", metavar="WxH", type=parse_maze_size,
+                        default=f"{MAZE_WIDTH}x{MAZE_HEIGHT}")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        for path in args.levels:
+            start = time.perf_counter()
+            level = load_level(path, args.cache_dir)
+            tables = "distances" if level.distances is not None else "no distance table"
+            print(f"{path}: {level.width}x{level.height}, {tables}, "
+                  f"{1e3 * (time.perf_counter() - start):.1f} ms")
+    else:
+        game = GameCore(seed=0, maze_size=args.size)
+        level = level_from_maze(game.maze, game.dots, game.power_pellets, game.pacman_start,
+                                game.ghost_spawns)
+        with open(args.path, "w", encoding="utf-8") as f:
+            f.write(f"{COMMENT} generated {level.width}x{level.height} maze\n")
+            f.write(level.to_text())
+        print(f"wrote {level.width}x{level.height} level to {args.path}")
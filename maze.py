@@ -0,0 +1,56 @@
+"""Compact maze storage.
+
+A Maze keeps one byte per cell (0: open, 1: wall) in a flat bytearray, so a
+1000x1000 maze takes a megabyte instead of a million list slots. maze[y]
+returns a writable memoryview of row y, so code written for rows of lists
+(maze[y][x], len(maze), len(maze[0])) works unchanged.
+"""
+
+
+class Maze:
+    """width x height grid of cells stored row by row in a bytearray"""
+
+    def __init__(self, width, height, cells=None):
+        self.width = width
+        self.height = height
+        if cells is None:
+            cells = bytearray(width * height)
+        elif len(cells) != width * height:
+            raise ValueError(f"{len(cells)} cells do not fill a {width}x{height} maze")
+        self.cells = bytearray(cells)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a Maze from rows of 0 / 1 values"""
+        return cls(len(rows[0]), len(rows), bytes(value for row in rows for value in row))
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.height:
+            if -self.height <= y < 0:
+                y += self.height
+            else:
+                raise IndexError("maze row out of range")
+        start = y * self.width
+        return memoryview(self.cells)[start:start + self.width]
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield self[y]
+
+    def __eq__(self, other):
+        if isinstance(other, Maze):
+            return (self.width, self.height, self.cells) == (other.width, other.height, other.cells)
+        return NotImplemented
+
+    def __getstate__(self):
+        return self.width, self.height, bytes(self.cells)
+
+    def __setstate__(self, state):
+        self.width, self.height, cells = state
+        self.cells = bytearray(cells)
+
+    def tolist(self):
+        return [list(row) for row in self]
@@ -0,0 +1,165 @@
+"""Tile-based movement on fixed-point positions.
+
+The maze is reduced once to a walkability table: one byte per cell whose bits
+say which neighbouring cells can be entered. Actors store their centre in
+integer sub-pixel units and travel along the grid lines between cell centres,
+so every movement decision is a single table lookup at a cell centre. There
+are no per-step allocations and no float drift, and runs are identical on
+every platform.
+"""
+from constants import CELL_SIZE
+
+# Sub-pixel resolution of actor positions
+SUBPIXELS = 8
+CELL_UNITS = CELL_SIZE * SUBPIXELS
+HALF_CELL = CELL_UNITS // 2
+
+# Direction bits in a walkability mask (0: right, 1: down, 2: left, 3: up)
+DIRECTION_BITS = (1, 2, 4, 8)
+DIRECTION_DX = (1, 0, -1, 0)
+DIRECTION_DY = (0, 1, 0, -1)
+OPPOSITE = (2, 3, 0, 1)
+
+# Maps a maze cell value to 1 if actors can enter it (anything but a wall)
+OPEN_TABLE = bytes(0 if value == 1 else 1 for value in range(256))
+
+
+def to_units(pixels):
+    return int(round(pixels * SUBPIXELS))
+
+
+class Walkability:
+    """Passable-direction bitmask for every cell of a maze"""
+
+    def __init__(self, maze):
+        self.height = len(maze)
+        self.width = len(maze[0])
+        cells = getattr(maze, "cells", None)
+        if cells is None:
+            cells = bytes(value for row in maze for value in row)
+        self.masks = self.build_masks(cells, self.width, self.height)
+        # pathfinding.DistanceTable for this maze, attached on first use
+        self.table = None
+
+    @classmethod
+    def from_masks(cls, width, height, masks):
+        """Walkability over masks computed earlier, e.g. by a compiled level"""
+        walk = cls.__new__(cls)
+        walk.width = width
+        walk.height = height
+        walk.masks = masks
+        walk.table = None
+        return walk
+
+    @staticmethod
+    def build_masks(cells, width, height):
+        """Masks for a flat row-major grid where 1 marks a wall.
+
+        Every cell is one byte of a big integer holding 0 or 1, so shifting
+        by 8 bits moves the whole grid one cell and a single AND per direction
+        checks all cells at once; large mazes take milliseconds.
+        """
+        size = width * height
+        full = (1 << 8 * size) - 1
+        passable = int.from_bytes(cells.translate(OPEN_TABLE), "big")
+        # Bytes are big-endian, so cell i + k sits 8 * k bits lower than cell i
+        not_last = int.from_bytes((b"\x01" * (width - 1) + b"\x00") * height, "big")
+        not_first = int.from_bytes((b"\x00" + b"\x01" * (width - 1)) * height, "big")
+        right = (passable << 8) & not_last
+        down = (passable << 8 * width) & full
+        left = (passable >> 8) & not_first
+        up = passable >> 8 * width
+        masks = (right | down << 1 | left << 2 | up << 3) & passable * 0x0F
+        return bytearray(masks.to_bytes(size, "big"))
+
+    def mask_at(self, fx, fy):
+        """Mask of the cell containing the fixed-point position (fx, fy)"""
+        return self.masks[(fy // CELL_UNITS) * self.width + fx // CELL_UNITS]
+
+
+class Mover:
+    """Grid movement shared by Pacman and the ghosts.
+
+    Positions are kept in fx / fy (sub-pixel units); x and y expose them in
+    pixels. Actors may reverse at any time, but only turn or stop at cell
+    centres, where at_centre() is asked to pick the direction.
+    """
+    __slots__ = ("fx", "fy", "speed", "step_units", "direction", "next_direction")
+
+    def __init__(self, x, y, speed):
+        self.fx = to_units(x)
+        self.fy = to_units(y)
+        self.speed = speed
+        self.step_units = to_units(speed)
+        self.direction = 0
+        self.next_direction = 0
+
+    @property
+    def x(self):
+        return self.fx / SUBPIXELS
+
+    @x.setter
+    def x(self, value):
+        self.fx = to_units(value)
+
+    @property
+    def y(self):
+        return self.fy / SUBPIXELS
+
+    @y.setter
+    def y(self, value):
+        self.fy = to_units(value)
+
+    def cell(self):
+        return self.fx // CELL_UNITS, self.fy // CELL_UNITS
+
+    def snapshot(self):
+        return (self.fx, self.fy, self.direction, self.next_direction)
+
+    def restore(self, state):
+        self.fx, self.fy, self.direction, self.next_direction = state
+
+    def at_centre_point(self):
+        return self.fx % CELL_UNITS == HALF_CELL and self.fy % CELL_UNITS == HALF_CELL
+
+    def can_move_in_direction(self, direction, walk):
+        """Between centres only the current corridor is open"""
+        if self.at_centre_point():
+            return bool(walk.mask_at(self.fx, self.fy) & DIRECTION_BITS[direction])
+        return direction == self.direction or direction == OPPOSITE[self.direction]
+
+    def at_centre(self, mask):
+        """Choose the direction to leave a cell centre with the given mask"""
+        if mask & DIRECTION_BITS[self.next_direction]:
+            self.direction = self.next_direction
+
+    def advance(self, walk):
+        """Travel self.step_units units, deciding at each cell centre reached.
+
+        Returns False if the actor is stopped against a wall.
+        """
+        if self.next_direction == OPPOSITE[self.direction]:
+            self.direction = self.next_direction
+
+        budget = self.step_units
+        while budget:
+            offset_x = self.fx % CELL_UNITS - HALF_CELL
+            offset_y = self.fy % CELL_UNITS - HALF_CELL
+            if offset_x == 0 and offset_y == 0:
+                mask = walk.mask_at(self.fx, self.fy)
+                self.at_centre(mask)
+                if not mask & DIRECTION_BITS[self.direction]:
+                    return False
+                gap = CELL_UNITS
+            else:
+                # Distance past the centre along the direction of travel
+                dx = DIRECTION_DX[self.direction]
+                dy = DIRECTION_DY[self.direction]
+                past = offset_x * dx + offset_y * dy
+                gap = -past if past < 0 else CELL_UNITS - past
+
+            step = budget if budget < gap else gap
+            self.fx += DIRECTION_DX[self.direction] * step
+            self.fy += DIRECTION_DY[self.direction] * step
+            budget -= step
+        return True
@@ -0,0 +1,143 @@
+"""Multi-channel grid observations of a game for agents (requires NumPy).
+
+The observation is a (channels, height, width) tensor with one plane per
+feature: walls, dots, power pellets, Pacman, then one plane per ghost, with
+a 1 in every cell holding that feature. It is allocated once and kept up to
+date incrementally. Each update() clears the cells of the dots and pellets
+eaten since the last one (read from the item grids' removal logs) and moves
+each actor's 1 only if the actor entered a new cell, so a tick costs a few
+element writes whatever the maze size. A reset or restore of the game is
+spotted through GameCore.epoch and rebuilds the planes once.
+
+update() returns a read-only view of the tensor, so agents get the data
+without a copy. With downsample=f, downsampled() also offers a max-pooled
+(height / f, width / f) version, refreshed only in the blocks that changed.
+Changed blocks are kept as a set, so however many updates run between two
+downsampled() calls it never holds more than one entry per block.
+"""
+import numpy as np
+
+from movement import CELL_UNITS
+
+WALLS = 0
+DOTS = 1
+PELLETS = 2
+PACMAN = 3
+FIRST_GHOST = 4
+
+
+class Observation:
+    """Incrementally maintained feature planes of one GameCore"""
+
+    def __init__(self, game, dtype=np.uint8, downsample=None):
+        self.game = game
+        self.width = game.maze.width
+        self.height = game.maze.height
+        self.dtype = dtype
+        self.downsample = downsample
+        self.tensor = None
+        self.small = None
+        self.epoch = None
+        self.dot_log = None
+        self.sync()
+
+    def allocate(self):
+        channels = FIRST_GHOST + len(self.game.ghosts)
+        self.tensor = np.zeros((channels, self.height, self.width), dtype=self.dtype)
+        self.planes = self.tensor.reshape(channels, -1)
+        self.view = self.tensor.view()
+        self.view.flags.writeable = False
+        if self.downsample:
+            factor = self.downsample
+            self.small = np.zeros((channels, -(-self.height // factor), -(-self.width // factor)),
+                                  dtype=self.dtype)
+            self.small_view = self.small.view()
+            self.small_view.flags.writeable = False
+
+    def sync(self):
+        """Rebuild every plane from the game"""
+        game = self.game
+        if self.tensor is None or len(self.tensor) != FIRST_GHOST + len(game.ghosts):
+            self.allocate()
+        planes = self.planes
+        planes[:] = 0
+        planes[WALLS] = np.frombuffer(game.maze.cells, dtype=np.uint8) == 1
+        planes[DOTS] = np.frombuffer(game.dots.cells, dtype=np.uint8)
+        planes[PELLETS] = np.frombuffer(game.power_pellets.cells, dtype=np.uint8)
+        self.actor_cells = []
+        for channel, actor in enumerate([game.pacman] + game.ghosts, PACMAN):
+            cell = self.cell_of(actor)
+            planes[channel, cell] = 1
+            self.actor_cells.append(cell)
+
+        if self.dot_log is not None:
+            self.stop_tracking()
+        self.dots_grid = game.dots
+        self.pellets_grid = game.power_pellets
+        self.dot_log = game.dots.track_removals()
+        self.pellet_log = game.power_pellets.track_removals()
+        self.epoch = game.epoch
+        # Every block of the downsampled copy is stale
+        self.dirty = None
+
+    def cell_of(self, actor):
+        cell_x = min(max(actor.fx // CELL_UNITS, 0), self.width - 1)
+        cell_y = min(max(actor.fy // CELL_UNITS, 0), self.height - 1)
+        return cell_y * self.width + cell_x
+
+    def mark(self, channel, cell):
+        factor = self.downsample
+        self.dirty.add((channel, cell // self.width // factor, cell % self.width // factor))
+
+    def update(self):
+        """Bring the tensor up to date with the game; returns a read-only view"""
+        game = self.game
+        if (game.epoch != self.epoch or game.dots is not self.dots_grid
+                or game.power_pellets is not self.pellets_grid):
+            self.sync()
+            return self.view
+        planes = self.planes
+        dirty = self.dirty
+        for log, channel in ((self.dot_log, DOTS), (self.pellet_log, PELLETS)):
+            if log:
+                for cell in log:
+                    planes[channel, cell] = 0
+                    if dirty is not None:
+                        self.mark(channel, cell)
+                log.clear()
+        actor_cells = self.actor_cells
+        for index, actor in enumerate([game.pacman] + game.ghosts):
+            cell = self.cell_of(actor)
+            previous = actor_cells[index]
+            if cell != previous:
+                channel = PACMAN + index
+                planes[channel, previous] = 0
+                planes[channel, cell] = 1
+                actor_cells[index] = cell
+                if dirty is not None:
+                    self.mark(channel, previous)
+                    self.mark(channel, cell)
+        return self.view
+
+    def downsampled(self):
+        """Read-only max-pooled tensor; call after update()"""
+        if not self.downsample:
+            raise ValueError("Observation was created without downsample")
+        factor = self.downsample
+        if self.dirty is None:
+            # Pad to whole blocks, then take the maximum of each block
+            channels, height, width = self.small.shape
+            padded = np.zeros((channels, height * factor, width * factor), dtype=self.dtype)
+            padded[:, :self.height, :self.width] = self.tensor
+            self.small[:] = padded.reshape(channels, height, factor, width, factor).max(axis=(2, 4))
+        else:
+            for channel, block_y, block_x in self.dirty:
+                self.small[channel, block_y, block_x] = self.tensor[
+                    channel, block_y * factor:(block_y + 1) * factor,
+                    block_x * factor:(block_x + 1) * factor].max()
+        self.dirty = set()
+        return self.small_view
+
+    def stop_tracking(self):
+        self.dots_grid.stop_tracking(self.dot_log)
+        self.pellets_grid.stop_tracking(self.pellet_log)
@@ -1,17 +1,25 @@
-import pygame
+import argparse
+import os
 import sys
-import random
 import math
+import time
 
-# Initialize Pygame
-pygame.init()
+# Set before the first pygame import so the support banner stays off the console
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
 
-# Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-CELL_SIZE = 20
-MAZE_WIDTH = SCREEN_WIDTH // CELL_SIZE
-MAZE_HEIGHT = SCREEN_HEIGHT // CELL_SIZE
+import game_core
+from capture import FrameCapture
+from events import TEXT, format_for
+from hud import LARGE, SMALL, Hud
+from input_queue import InputQueue
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT, RED
+from game_core import CELL_SIZE, PLAYING, GAME_OVER, WIN, GameCore, parse_maze_size
+from movement import SUBPIXELS
+from profiler import FrameProfiler
+from sprites import SpriteAtlas
+from levels import load_level
+from tiles import ChunkCache
 
 # Enhanced Colors with gradients and realistic tones
 BLACK = (0, 0, 0)
@@ -22,601 +30,687 @@ YELLOW = (255, 255, 0)
 BRIGHT_YELLOW = (255, 255, 102)
 WHITE = (255, 255, 255)
 CREAM = (255, 253, 208)
-RED = (220, 20, 60)
-PINK = (255, 105, 180)
-CYAN = (0, 206, 209)
-ORANGE = (255, 140, 0)
 PURPLE = (147, 112, 219)
 GRAY = (128, 128, 128)
 DARK_GRAY = (64, 64, 64)
 
-# Game states
-PLAYING = 0
-GAME_OVER = 1
-WIN = 2
-
-class Pacman:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.direction = 0  # 0: right, 1: down, 2: left, 3: up
-        self.next_direction = 0
-        self.speed = 2
-        self.radius = 10
-        self.mouth_animation = 0
-        self.animation_speed = 0.2
-        
-    def move(self, maze):
-        # Try to change direction if requested
-        if self.next_direction != self.direction:
-            if self.can_move_in_direction(self.next_direction, maze):
-                self.direction = self.next_direction
-        
-        # Move in current direction
-        if self.can_move_in_direction(self.direction, maze):
-            if self.direction == 0:  # right
-                self.x += self.speed
-            elif self.direction == 1:  # down
-                self.y += self.speed
-            elif self.direction == 2:  # left
-                self.x -= self.speed
-            elif self.direction == 3:  # up
-                self.y -= self.speed
-        
-        # Keep Pacman within bounds
-        self.x = max(self.radius, min(self.x, SCREEN_WIDTH - self.radius))
-        self.y = max(self.radius, min(self.y, SCREEN_HEIGHT - self.radius))
-        
-        # Update mouth animation
-        self.mouth_animation += self.animation_speed
-    
-    def can_move_in_direction(self, direction, maze):
-        """Check if Pacman can move in the given direction"""
-        test_x = self.x
-        test_y = self.y
-        
-        if direction == 0:  # right
-            test_x += self.speed
-        elif direction == 1:  # down
-            test_y += self.speed
-        elif direction == 2:  # left
-            test_x -= self.speed
-        elif direction == 3:  # up
-            test_y -= self.speed
-        
-        # Debug: Print movement test
-        # print(f"Testing movement: ({test_x:.1f}, {test_y:.1f}) Direction: {direction}")
-        
-        return not self.check_collision(test_x, test_y, maze)
-    
-    def check_collision(self, x, y, maze):
-        # Check boundaries
-        if x - self.radius < 0 or x + self.radius >= SCREEN_WIDTH or y - self.radius < 0 or y + self.radius >= SCREEN_HEIGHT:
-            return True
-        
-        # Check maze walls - simplified collision detection
-        # Check center and edges in movement direction
-        points_to_check = [(x, y)]  # Center point
-        
-        # Add edge points based on current direction
-        if self.direction == 0:  # right
-            points_to_check.extend([(x + self.radius - 2, y), (x + self.radius - 2, y - self.radius//2), (x + self.radius - 2, y + self.radius//2)])
-        elif self.direction == 1:  # down
-            points_to_check.extend([(x, y + self.radius - 2), (x - self.radius//2, y + self.radius - 2), (x + self.radius//2, y + self.radius - 2)])
-        elif self.direction == 2:  # left
-            points_to_check.extend([(x - self.radius + 2, y), (x - self.radius + 2, y - self.radius//2), (x - self.radius + 2, y + self.radius//2)])
-        elif self.direction == 3:  # up
-            points_to_check.extend([(x, y - self.radius + 2), (x - self.radius//2, y - self.radius + 2), (x + self.radius//2, y - self.radius + 2)])
-        
-        for check_x, check_y in points_to_check:
-            grid_x = int(check_x // CELL_SIZE)
-            grid_y = int(check_y // CELL_SIZE)
-            
-            if 0 <= grid_x < MAZE_WIDTH and 0 <= grid_y < MAZE_HEIGHT:
-                if maze[grid_y][grid_x] == 1:
-                    return True
-        return False
-    
+# Arrow keys and WASD, as directions (0: right, 1: down, 2: left, 3: up)
+KEY_DIRECTIONS = {
+    pygame.K_RIGHT: 0, pygame.K_d: 0,
+    pygame.K_DOWN: 1, pygame.K_s: 1,
+    pygame.K_LEFT: 2, pygame.K_a: 2,
+    pygame.K_UP: 3, pygame.K_w: 3,
+}
+
+
+def draw_wall(surface, left, top):
+    # Draw wall with gradient effect
+    rect = pygame.Rect(left, top, CELL_SIZE, CELL_SIZE)
+    pygame.draw.rect(surface, DARK_BLUE, rect)
+    pygame.draw.rect(surface, BLUE, rect, 2)
+    # Add highlight
+    highlight_rect = pygame.Rect(left + 1, top + 1, CELL_SIZE - 2, 2)
+    pygame.draw.rect(surface, LIGHT_BLUE, highlight_rect)
+
+
+def draw_dot(surface, pos):
+    # Draw dots with glow effect
+    pygame.draw.circle(surface, YELLOW, pos, 4)
+    pygame.draw.circle(surface, WHITE, pos, 2)
+
+
+class Interpolated:
+    """Draw position blended between the last two simulation ticks.
+
+    Game stores the position from before each update in previous_fx /
+    previous_fy and calls blend() before drawing, so actors glide smoothly
+    whatever the render rate. Drawing uses draw_x / draw_y, in whole pixels.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snap()
+
+    def remember(self):
+        self.previous_fx = self.fx
+        self.previous_fy = self.fy
+
+    def snap(self):
+        """Forget the previous position, e.g. after a respawn"""
+        self.remember()
+        self.blend(1)
+
+    def blend(self, alpha):
+        # Rounded to whole pixels once here, so shapes drawn around the
+        # centre and the sprite atlas blits land on exactly the same pixels
+        fx = self.previous_fx + (self.fx - self.previous_fx) * alpha
+        fy = self.previous_fy + (self.fy - self.previous_fy) * alpha
+        self.draw_x = int(fx / SUBPIXELS + 0.5)
+        self.draw_y = int(fy / SUBPIXELS + 0.5)
+
+
+class Pacman(Interpolated, game_core.Pacman):
+    __slots__ = ("previous_fx", "previous_fy", "draw_x", "draw_y")
+
+    # Every mouth opening the animation can produce
+    MOUTH_ANGLES = range(45, 66)
+
+    def mouth_angle(self):
+        return 45 + int(20 * abs(math.sin(self.mouth_animation)))
+
     def draw(self, screen):
+        self.draw_frame(screen, self.draw_x, self.draw_y, self.radius, self.direction, self.mouth_angle())
+
+    @staticmethod
+    def draw_frame(screen, x, y, radius, direction, mouth_angle):
+        """Draw one animation frame of Pacman centred on (x, y)"""
         # Draw shadow
         shadow_offset = 2
-        pygame.draw.circle(screen, DARK_GRAY, 
-                         (int(self.x + shadow_offset), int(self.y + shadow_offset)), 
-                         self.radius, 0)
-        
+        pygame.draw.circle(screen, DARK_GRAY,
+                         (int(x + shadow_offset), int(y + shadow_offset)),
+                         radius, 0)
+
         # Draw main body with gradient effect
-        pygame.draw.circle(screen, BRIGHT_YELLOW, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), self.radius - 2)
-        
+        pygame.draw.circle(screen, BRIGHT_YELLOW, (int(x), int(y)), radius)
+        pygame.draw.circle(screen, YELLOW, (int(x), int(y)), radius - 2)
+
         # Add shine effect
-        shine_x = int(self.x - self.radius * 0.3)
-        shine_y = int(self.y - self.radius * 0.3)
-        pygame.draw.circle(screen, CREAM, (shine_x, shine_y), self.radius // 3)
-        
+        shine_x = int(x - radius * 0.3)
+        shine_y = int(y - radius * 0.3)
+        pygame.draw.circle(screen, CREAM, (shine_x, shine_y), radius // 3)
+
         # Animated mouth
-        mouth_angle = 45 + int(20 * abs(math.sin(self.mouth_animation)))
-        start_angle = self.direction * 90 - mouth_angle // 2
-        end_angle = self.direction * 90 + mouth_angle // 2
-        
+        start_angle = direction * 90 - mouth_angle // 2
+        end_angle = direction * 90 + mouth_angle // 2
+
         # Create mouth points
-        points = [(int(self.x), int(self.y))]
+        points = [(int(x), int(y))]
         num_points = max(8, mouth_angle // 5)
         for i in range(num_points + 1):
             angle = start_angle + i * (mouth_angle / num_points)
             angle_rad = math.radians(angle)
-            x = int(self.x + (self.radius - 1) * math.cos(angle_rad))
-            y = int(self.y + (self.radius - 1) * math.sin(angle_rad))
-            points.append((x, y))
-        
+            point_x = int(x + (radius - 1) * math.cos(angle_rad))
+            point_y = int(y + (radius - 1) * math.sin(angle_rad))
+            points.append((point_x, point_y))
+
         if len(points) > 2:
             pygame.draw.polygon(screen, BLACK, points)
-        
+
         # Draw eye
-        eye_offset = self.radius * 0.4
-        if self.direction == 0:  # right
-            eye_x = int(self.x - eye_offset * 0.5)
-            eye_y = int(self.y - eye_offset)
-        elif self.direction == 1:  # down
-            eye_x = int(self.x + eye_offset * 0.7)
-            eye_y = int(self.y - eye_offset * 0.5)
-        elif self.direction == 2:  # left
-            eye_x = int(self.x + eye_offset * 0.5)
-            eye_y = int(self.y - eye_offset)
+        eye_offset = radius * 0.4
+        if direction == 0:  # right
+            eye_x = int(x - eye_offset * 0.5)
+            eye_y = int(y - eye_offset)
+        elif direction == 1:  # down
+            eye_x = int(x + eye_offset * 0.7)
+            eye_y = int(y - eye_offset * 0.5)
+        elif direction == 2:  # left
+            eye_x = int(x + eye_offset * 0.5)
+            eye_y = int(y - eye_offset)
         else:  # up
-            eye_x = int(self.x + eye_offset * 0.7)
-            eye_y = int(self.y + eye_offset * 0.5)
-        
+            eye_x = int(x + eye_offset * 0.7)
+            eye_y = int(y + eye_offset * 0.5)
+
         pygame.draw.circle(screen, BLACK, (eye_x, eye_y), 3)
         pygame.draw.circle(screen, WHITE, (eye_x - 1, eye_y - 1), 1)
 
+    def dirty_rect(self):
+        """Screen area covered by Pacman and its shadow"""
+        return pygame.Rect(int(self.draw_x) - self.radius - 1, int(self.draw_y) - self.radius - 1,
+                           2 * self.radius + 5, 2 * self.radius + 5)
+
+
+class Ghost(Interpolated, game_core.Ghost):
+    __slots__ = ("previous_fx", "previous_fy", "draw_x", "draw_y")
+
+    # Every skirt wave height the animation can produce
+    WAVE_AMPLITUDES = range(3, 6)
+
+    def wave_amplitude(self):
+        return 3 + int(2 * abs(math.sin(self.body_animation)))
 
-class Ghost:
-    def __init__(self, x, y, color, name):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.name = name
-        self.direction = 0  # Start with right direction
-        self.speed = 1.5
-        self.radius = 10
-        self.body_animation = 0
-        self.animation_speed = 0.15
-        self.target_x = x
-        self.target_y = y
-        self.change_direction_timer = 0
-        self.change_direction_interval = 60  # Change direction every 60 frames
-        
-    def move(self, maze, pacman=None):
-        self.change_direction_timer += 1
-        
-        # Simple AI - sometimes chase Pacman
-        if pacman and random.random() < 0.1:  # 10% chance to chase
-            dx = pacman.x - self.x
-            dy = pacman.y - self.y
-            if abs(dx) > abs(dy):
-                new_direction = 0 if dx > 0 else 2
-            else:
-                new_direction = 1 if dy > 0 else 3
-            
-            if self.can_move_in_direction(new_direction, maze):
-                self.direction = new_direction
-        
-        # Change direction when stuck or periodically
-        if not self.can_move_in_direction(self.direction, maze) or self.change_direction_timer >= self.change_direction_interval:
-            self.change_direction_timer = 0
-            self.choose_new_direction(maze)
-        
-        # Move in current direction
-        if self.can_move_in_direction(self.direction, maze):
-            if self.direction == 0:  # right
-                self.x += self.speed
-            elif self.direction == 1:  # down
-                self.y += self.speed
-            elif self.direction == 2:  # left
-                self.x -= self.speed
-            elif self.direction == 3:  # up
-                self.y -= self.speed
-        
-        # Keep ghost within bounds
-        self.x = max(self.radius, min(self.x, SCREEN_WIDTH - self.radius))
-        self.y = max(self.radius, min(self.y, SCREEN_HEIGHT - self.radius))
-        
-        self.body_animation += self.animation_speed
-    
-    def can_move_in_direction(self, direction, maze):
-        """Check if ghost can move in the given direction"""
-        test_x = self.x
-        test_y = self.y
-        
-        if direction == 0:  # right
-            test_x += self.speed
-        elif direction == 1:  # down
-            test_y += self.speed
-        elif direction == 2:  # left
-            test_x -= self.speed
-        elif direction == 3:  # up
-            test_y -= self.speed
-        
-        return not self.check_collision(test_x, test_y, maze)
-    
-    def choose_new_direction(self, maze):
-        """Choose a new random direction that's valid"""
-        directions = [0, 1, 2, 3]
-        random.shuffle(directions)
-        
-        for direction in directions:
-            if self.can_move_in_direction(direction, maze):
-                self.direction = direction
-                break
-    
-    def check_collision(self, x, y, maze):
-        if x - self.radius < 0 or x + self.radius >= SCREEN_WIDTH or y - self.radius < 0 or y + self.radius >= SCREEN_HEIGHT:
-            return True
-        
-        # Simplified collision detection for ghosts
-        points_to_check = [(x, y)]  # Center point
-        
-        # Add edge points based on current direction
-        if self.direction == 0:  # right
-            points_to_check.extend([(x + self.radius - 2, y), (x + self.radius - 2, y - self.radius//2), (x + self.radius - 2, y + self.radius//2)])
-        elif self.direction == 1:  # down
-            points_to_check.extend([(x, y + self.radius - 2), (x - self.radius//2, y + self.radius - 2), (x + self.radius//2, y + self.radius - 2)])
-        elif self.direction == 2:  # left
-            points_to_check.extend([(x - self.radius + 2, y), (x - self.radius + 2, y - self.radius//2), (x - self.radius + 2, y + self.radius//2)])
-        elif self.direction == 3:  # up
-            points_to_check.extend([(x, y - self.radius + 2), (x - self.radius//2, y - self.radius + 2), (x + self.radius//2, y - self.radius + 2)])
-        
-        for check_x, check_y in points_to_check:
-            grid_x = int(check_x // CELL_SIZE)
-            grid_y = int(check_y // CELL_SIZE)
-            
-            if 0 <= grid_x < MAZE_WIDTH and 0 <= grid_y < MAZE_HEIGHT:
-                if maze[grid_y][grid_x] == 1:
-                    return True
-        return False
-    
     def draw(self, screen):
+        self.draw_frame(screen, self.draw_x, self.draw_y, self.radius, self.color, self.wave_amplitude())
+
+    @staticmethod
+    def draw_frame(screen, x, y, radius, color, wave_amplitude):
+        """Draw one animation frame of a ghost centred on (x, y)"""
         # Draw shadow
         shadow_offset = 2
-        pygame.draw.circle(screen, DARK_GRAY, 
-                         (int(self.x + shadow_offset), int(self.y + shadow_offset)), 
-                         self.radius, 0)
-        
+        pygame.draw.circle(screen, DARK_GRAY,
+                         (int(x + shadow_offset), int(y + shadow_offset)),
+                         radius, 0)
+
         # Draw body (top half circle)
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y - 2)), self.radius)
-        
+        pygame.draw.circle(screen, color, (int(x), int(y - 2)), radius)
+
         # Draw wavy bottom
-        bottom_y = int(self.y + self.radius - 2)
+        bottom_y = int(y + radius - 2)
         wave_points = []
-        wave_amplitude = 3 + int(2 * abs(math.sin(self.body_animation)))
-        
+
         for i in range(5):
-            wave_x = int(self.x - self.radius + i * (2 * self.radius / 4))
+            wave_x = int(x - radius + i * (2 * radius / 4))
             if i % 2 == 0:
                 wave_y = bottom_y - wave_amplitude
             else:
                 wave_y = bottom_y + wave_amplitude
             wave_points.append((wave_x, wave_y))
-        
+
         # Complete the ghost shape
-        wave_points.insert(0, (int(self.x - self.radius), int(self.y)))
-        wave_points.append((int(self.x + self.radius), int(self.y)))
-        
-        pygame.draw.polygon(screen, self.color, wave_points)
-        
+        wave_points.insert(0, (int(x - radius), int(y)))
+        wave_points.append((int(x + radius), int(y)))
+
+        pygame.draw.polygon(screen, color, wave_points)
+
         # Draw eyes
         eye_size = 3
-        left_eye_x = int(self.x - self.radius * 0.4)
-        right_eye_x = int(self.x + self.radius * 0.4)
-        eye_y = int(self.y - self.radius * 0.3)
-        
+        left_eye_x = int(x - radius * 0.4)
+        right_eye_x = int(x + radius * 0.4)
+        eye_y = int(y - radius * 0.3)
+
         # White eye background
         pygame.draw.circle(screen, WHITE, (left_eye_x, eye_y), eye_size + 1)
         pygame.draw.circle(screen, WHITE, (right_eye_x, eye_y), eye_size + 1)
-        
+
         # Black pupils
         pygame.draw.circle(screen, BLACK, (left_eye_x, eye_y), eye_size)
         pygame.draw.circle(screen, BLACK, (right_eye_x, eye_y), eye_size)
-        
+
         # Eye shine
         pygame.draw.circle(screen, WHITE, (left_eye_x - 1, eye_y - 1), 1)
         pygame.draw.circle(screen, WHITE, (right_eye_x - 1, eye_y - 1), 1)
 
+    def dirty_rect(self):
+        """Screen area covered by the ghost, its wavy skirt and shadow"""
+        return pygame.Rect(int(self.draw_x) - self.radius - 1, int(self.draw_y) - self.radius - 3,
+                           2 * self.radius + 5, 2 * self.radius + 8)
+
 
-class Game:
-    def __init__(self):
+class Game(GameCore):
+    pacman_class = Pacman
+    ghost_class = Ghost
+
+    def __init__(self, dirty_rects=False, use_sprites=True, seed=None, record_path=None,
+                 profile_path=None, tick_rate=60, fps=60, max_catchup=5, maze_size=None,
+                 level=None, capture_path=None, capture_compress=False, verbose=True,
+                 events_path=None):
+        # Importing this module initialises nothing; a game starts only the
+        # display (no audio), and fonts load on the first HUD render
+        pygame.display.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Enhanced Pacman Game")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        
-        # Create enhanced maze
-        self.maze = self.create_maze()
-        self.dots = self.create_dots()
-        self.power_pellets = self.create_power_pellets()
-        
-        # Create game objects
-        self.pacman = Pacman(CELL_SIZE * 3 + CELL_SIZE // 2, CELL_SIZE * 3 + CELL_SIZE // 2)
-        self.ghosts = [
-            Ghost(CELL_SIZE * 15 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, RED, "Blinky"),
-            Ghost(CELL_SIZE * 20 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, PINK, "Pinky"),
-            Ghost(CELL_SIZE * 25 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, CYAN, "Inky"),
-            Ghost(CELL_SIZE * 30 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, ORANGE, "Clyde")
-        ]
-        
-        self.score = 0
-        self.lives = 3
-        self.state = PLAYING
-        
-    def create_maze(self):
-        maze = [[0 for _ in range(MAZE_WIDTH)] for _ in range(MAZE_HEIGHT)]
-        
-        # Create border walls
-        for x in range(MAZE_WIDTH):
-            maze[0][x] = 1
-            maze[MAZE_HEIGHT-1][x] = 1
-        for y in range(MAZE_HEIGHT):
-            maze[y][0] = 1
-            maze[y][MAZE_WIDTH-1] = 1
-            
-        # Create more interesting maze patterns
-        # Horizontal walls
-        for y in range(3, MAZE_HEIGHT-3, 6):
-            for x in range(3, MAZE_WIDTH-3):
-                if x % 8 != 0 and x % 8 != 1:
-                    maze[y][x] = 1
-                    
-        # Vertical walls
-        for x in range(6, MAZE_WIDTH-6, 12):
-            for y in range(6, MAZE_HEIGHT-6):
-                if y % 6 != 0:
-                    maze[y][x] = 1
-                    
-        # Add some boxes
-        box_positions = [(10, 8), (25, 8), (10, 20), (25, 20)]
-        for bx, by in box_positions:
-            for i in range(3):
-                for j in range(3):
-                    if bx+i < MAZE_WIDTH and by+j < MAZE_HEIGHT:
-                        maze[by+j][bx+i] = 1
-        
-        # Ensure starting area is clear
-        for y in range(2, 6):
-            for x in range(2, 6):
-                if y < MAZE_HEIGHT and x < MAZE_WIDTH:
-                    maze[y][x] = 0
-                        
-        return maze
-    
-    def create_dots(self):
-        dots = []
-        for y in range(MAZE_HEIGHT):
-            for x in range(MAZE_WIDTH):
-                if self.maze[y][x] == 0:
-                    # Don't place dots too close to starting positions
-                    dot_x = x * CELL_SIZE + CELL_SIZE // 2
-                    dot_y = y * CELL_SIZE + CELL_SIZE // 2
-                    if not (40 < dot_x < 80 and 40 < dot_y < 80):  # Avoid Pacman start
-                        dots.append((dot_x, dot_y))
-        return dots
-    
-    def create_power_pellets(self):
-        pellets = []
-        # Place power pellets in corners
-        corner_positions = [
-            (3 * CELL_SIZE + CELL_SIZE // 2, 3 * CELL_SIZE + CELL_SIZE // 2),
-            ((MAZE_WIDTH - 4) * CELL_SIZE + CELL_SIZE // 2, 3 * CELL_SIZE + CELL_SIZE // 2),
-            (3 * CELL_SIZE + CELL_SIZE // 2, (MAZE_HEIGHT - 4) * CELL_SIZE + CELL_SIZE // 2),
-            ((MAZE_WIDTH - 4) * CELL_SIZE + CELL_SIZE // 2, (MAZE_HEIGHT - 4) * CELL_SIZE + CELL_SIZE // 2)
-        ]
-        
-        for pos in corner_positions:
-            grid_x = pos[0] // CELL_SIZE
-            grid_y = pos[1] // CELL_SIZE
-            if (0 <= grid_x < MAZE_WIDTH and 0 <= grid_y < MAZE_HEIGHT and 
-                self.maze[grid_y][grid_x] == 0):
-                pellets.append(pos)
-        
-        return pellets
-    
+
+        # The simulation runs at tick_rate fixed steps per second whatever
+        # the render rate; fps caps rendering (0 renders as fast as possible)
+        # and at most max_catchup ticks run per frame when drawing lags
+        self.tick_rate = tick_rate
+        self.fps = fps
+        self.max_catchup = max_catchup
+        self.alpha = 1.0
+        self.dropped_ticks = 0
+        self.started = time.perf_counter()
+        # Labels, life icons and the message overlay are rendered once
+        self.hud = Hud((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+        # Render caches: the walls are drawn once per maze and the background
+        # adds the remaining dots; dirty_rects pushes only changed regions
+        self.dirty_rects = dirty_rects
+        self.maze_surface = None
+        self.maze_source = None
+        self.background = None
+        self.background_dots = None
+        # Bumped whenever the background changes, so cached HUD pixels expire
+        self.background_version = 0
+        self.pulse = 0
+        self.eaten_log = None
+        self.previous_rects = []
+        self.hud_rect = pygame.Rect(10, 10, 0, 0)
+        self.hud_values = None
+        self.full_redraw = True
+
+        # Mazes bigger than the screen scroll: a camera follows Pacman and
+        # only the pre-rendered chunks, pellets and actors in view are drawn
+        self.scrolling = False
+        self.chunks = None
+        self.camera = (0, 0)
+
+        # Direction keys wait here, timestamped, for the tick they can apply
+        self.inputs = InputQueue()
+
+        # Inputs of the latest game are saved here for replay.py
+        self.record_path = record_path
+
+        # Maze, dots and actors live in the simulation core
+        super().__init__(seed=seed, record=record_path is not None,
+                         maze_size=maze_size, level=level)
+        # Game events are echoed to the console (verbose) and written to
+        # events_path by background EventLogs, started by run()
+        self.verbose = verbose
+        self.events_path = events_path
+
+        # Actor animation frames pre-rendered once; None draws shapes directly
+        self.sprites = None
+        if use_sprites:
+            colors = list(dict.fromkeys(color for _, _, color, _ in self.ghost_spawns))
+            self.sprites = SpriteAtlas(self.pacman_class, self.ghost_class, colors)
+
+        # Per-phase timing, on with profile_path or F3; F3 toggles the overlay
+        self.profile_path = profile_path
+        self.profiler = FrameProfiler() if profile_path else None
+        self.show_profile = False
+        self.profile_surface = None
+        self.profile_refresh = 0
+
+        # Every drawn frame is copied out and written to capture_path on a
+        # background thread, dropping frames rather than stalling the game
+        self.capture = FrameCapture(capture_path, capture_compress) if capture_path else None
+
+    @property
+    def font(self):
+        return self.hud.font(LARGE)
+
+    @property
+    def small_font(self):
+        return self.hud.font(SMALL)
+
     def handle_events(self):
+        # Direction keys are queued with the time they arrived and applied
+        # tick by tick in update(); nothing is polled between events
+        now = time.perf_counter()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-                    self.pacman.next_direction = 0
-                elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                    self.pacman.next_direction = 1
-                elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
-                    self.pacman.next_direction = 2
-                elif event.key == pygame.K_UP or event.key == pygame.K_w:
-                    self.pacman.next_direction = 3
+                if event.key in KEY_DIRECTIONS:
+                    self.inputs.push(KEY_DIRECTIONS[event.key], now)
                 elif event.key == pygame.K_SPACE and self.state != PLAYING:
                     self.reset_game()
-        
-        # Handle continuous key presses for smoother movement
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.pacman.next_direction = 0
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.pacman.next_direction = 1
-        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.pacman.next_direction = 2
-        elif keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.pacman.next_direction = 3
-        
+                elif event.key == pygame.K_F3:
+                    self.toggle_profile()
+            elif event.type == pygame.KEYUP and event.key in KEY_DIRECTIONS:
+                # Letting go of one key hands over to another still held
+                keys = pygame.key.get_pressed()
+                for key, direction in KEY_DIRECTIONS.items():
+                    if keys[key]:
+                        self.inputs.push(direction, now)
+                        break
         return True
-    
+
+    def toggle_profile(self):
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+            self.profiler.start_frame()
+        self.show_profile = not self.show_profile
+        self.profile_surface = None
+        self.full_redraw = True
+
+    def mark(self, phase):
+        """End a profiled phase of the frame"""
+        if self.profiler is not None:
+            self.profiler.mark(phase)
+
+    def build_maze_surface(self):
+        """Pre-render the walls once per maze"""
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        surface.fill(BLACK)
+        for y in range(len(self.maze)):
+            row = self.maze[y]
+            for x in range(len(row)):
+                if row[x] == 1:
+                    draw_wall(surface, x * CELL_SIZE, y * CELL_SIZE)
+        return surface
+
+    def draw_cell(self, surface, cell_x, cell_y, left, top):
+        """Paint one maze cell for the chunk cache"""
+        if self.maze[cell_y][cell_x] == 1:
+            draw_wall(surface, left, top)
+        elif self.dots.cells[cell_y * self.dots.width + cell_x]:
+            draw_dot(surface, (left + CELL_SIZE // 2, top + CELL_SIZE // 2))
+
+    def sync_background(self):
+        """Keep the cached maze-and-dots layer in step with the game.
+
+        Returns the cell rects of dots eaten since the last frame.
+        """
+        if self.maze is not self.maze_source:
+            self.maze_source = self.maze
+            self.background_dots = None
+            width = len(self.maze[0])
+            height = len(self.maze)
+            self.scrolling = width * CELL_SIZE > SCREEN_WIDTH or height * CELL_SIZE > SCREEN_HEIGHT
+            if self.scrolling:
+                self.maze_surface = self.background = None
+                self.chunks = ChunkCache(width, height, self.draw_cell, BLACK)
+            else:
+                self.maze_surface = self.build_maze_surface()
+                self.chunks = None
+
+        if self.dots is not self.background_dots:
+            if self.scrolling:
+                self.chunks.clear()
+            else:
+                self.background = self.maze_surface.copy()
+                for dot in self.dots:
+                    draw_dot(self.background, dot)
+            self.background_dots = self.dots
+            self.background_version += 1
+            if self.eaten_log is not None:
+                self.dots.stop_tracking(self.eaten_log)
+            self.eaten_log = self.dots.track_removals()
+            self.full_redraw = True
+            return []
+
+        eaten = []
+        if self.eaten_log:
+            self.background_version += 1
+        for index in self.eaten_log:
+            cell_x = index % self.dots.width
+            cell_y = index // self.dots.width
+            if self.scrolling:
+                self.chunks.redraw_cell(cell_x, cell_y)
+                continue
+            rect = pygame.Rect(cell_x * CELL_SIZE, cell_y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+            self.background.blit(self.maze_surface, rect, rect)
+            eaten.append(rect)
+        self.eaten_log.clear()
+        return eaten
+
+    def follow_pacman(self):
+        """Centre the camera on Pacman, clamped to the maze"""
+        max_x = max(0, len(self.maze[0]) * CELL_SIZE - SCREEN_WIDTH)
+        max_y = max(0, len(self.maze) * CELL_SIZE - SCREEN_HEIGHT)
+        camera_x = min(max(int(self.pacman.draw_x) - SCREEN_WIDTH // 2, 0), max_x)
+        camera_y = min(max(int(self.pacman.draw_y) - SCREEN_HEIGHT // 2, 0), max_y)
+        self.camera = (camera_x, camera_y)
+
     def update(self):
-        if self.state == PLAYING:
-            # Debug: Print Pacman position and direction
-            # print(f"Pacman: ({self.pacman.x:.1f}, {self.pacman.y:.1f}) Direction: {self.pacman.direction}")
-            
-            self.pacman.move(self.maze)
-            
-            # Move ghosts with Pacman reference for AI
-            for i, ghost in enumerate(self.ghosts):
-                # Debug: Print ghost positions
-                # print(f"Ghost {i}: ({ghost.x:.1f}, {ghost.y:.1f}) Direction: {ghost.direction}")
-                ghost.move(self.maze, self.pacman)
-            
-            # Check dot collection
-            pacman_pos = (int(self.pacman.x), int(self.pacman.y))
-            dots_collected = 0
-            for dot in self.dots[:]:
-                dot_x, dot_y = dot
-                distance = ((pacman_pos[0] - dot_x) ** 2 + (pacman_pos[1] - dot_y) ** 2) ** 0.5
-                if distance < 15:  # Increased collision radius
-                    self.dots.remove(dot)
-                    self.score += 10
-                    dots_collected += 1
-            
-            # Debug: Print dots collected
-            if dots_collected > 0:
-                print(f"Collected {dots_collected} dots! Score: {self.score}")
-            
-            # Check power pellet collection
-            for pellet in self.power_pellets[:]:
-                pellet_x, pellet_y = pellet
-                distance = ((pacman_pos[0] - pellet_x) ** 2 + (pacman_pos[1] - pellet_y) ** 2) ** 0.5
-                if distance < 18:  # Increased collision radius
-                    self.power_pellets.remove(pellet)
-                    self.score += 50
-                    print(f"Power pellet collected! Score: {self.score}")
-            
-            # Check ghost collision
-            for ghost in self.ghosts:
-                distance = ((self.pacman.x - ghost.x) ** 2 + (self.pacman.y - ghost.y) ** 2) ** 0.5
-                if distance < 18:
-                    self.lives -= 1
-                    print(f"Ghost collision! Lives: {self.lives}")
-                    if self.lives <= 0:
-                        self.state = GAME_OVER
-                    else:
-                        # Reset positions
-                        self.pacman.x = CELL_SIZE * 3 + CELL_SIZE // 2
-                        self.pacman.y = CELL_SIZE * 3 + CELL_SIZE // 2
-                        for i, ghost in enumerate(self.ghosts):
-                            ghost.x = CELL_SIZE * (15 + i * 5) + CELL_SIZE // 2
-                            ghost.y = CELL_SIZE * 15 + CELL_SIZE // 2
-            
-            # Check win condition
-            if not self.dots and not self.power_pellets:
-                self.state = WIN
-    
+        # Keep the positions before this tick for draw-time interpolation
+        self.pacman.remember()
+        for ghost in self.ghosts:
+            ghost.remember()
+        # Only ticks that play drain the queue; keys pressed on the game over
+        # or win screen never reach Pacman
+        if self.state != PLAYING:
+            super().update()
+            return
+        self.inputs.before_tick(self.pacman)
+        super().update()
+        self.inputs.after_tick(self.pacman)
+
+    def reset_positions(self):
+        super().reset_positions()
+        self.snap_actors()
+
+    def snap_actors(self):
+        self.pacman.snap()
+        for ghost in self.ghosts:
+            ghost.snap()
+
     def draw(self):
-        # Fill with dark background
-        self.screen.fill(BLACK)
-        
-        # Draw maze with enhanced graphics
-        for y in range(MAZE_HEIGHT):
-            for x in range(MAZE_WIDTH):
-                if self.maze[y][x] == 1:
-                    rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                    # Draw wall with gradient effect
-                    pygame.draw.rect(self.screen, DARK_BLUE, rect)
-                    pygame.draw.rect(self.screen, BLUE, rect, 2)
-                    # Add highlight
-                    highlight_rect = pygame.Rect(x * CELL_SIZE + 1, y * CELL_SIZE + 1, 
-                                               CELL_SIZE - 2, 2)
-                    pygame.draw.rect(self.screen, LIGHT_BLUE, highlight_rect)
-        
-        # Draw dots with glow effect
-        for dot in self.dots:
-            pygame.draw.circle(self.screen, YELLOW, dot, 4)
-            pygame.draw.circle(self.screen, WHITE, dot, 2)
-        
-        # Draw power pellets with pulsing effect
-        for pellet in self.power_pellets:
-            pulse = int(3 + 2 * abs(math.sin(pygame.time.get_ticks() * 0.01)))
-            pygame.draw.circle(self.screen, BRIGHT_YELLOW, pellet, pulse)
-            pygame.draw.circle(self.screen, WHITE, pellet, pulse - 2)
-        
-        # Draw game objects
-        self.pacman.draw(self.screen)
+        # Place the actors self.alpha of the way through the current tick
+        self.pacman.blend(self.alpha)
         for ghost in self.ghosts:
-            ghost.draw(self.screen)
-        
-        # Draw enhanced UI
-        # Score with shadow
-        score_shadow = self.font.render(f"Score: {self.score}", True, BLACK)
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_shadow, (12, 12))
-        self.screen.blit(score_text, (10, 10))
-        
-        # Lives with shadow
-        lives_shadow = self.font.render(f"Lives: {self.lives}", True, BLACK)
-        lives_text = self.font.render(f"Lives: {self.lives}", True, WHITE)
-        self.screen.blit(lives_shadow, (12, 52))
-        self.screen.blit(lives_text, (10, 50))
-        
-        # Draw life icons
-        for i in range(self.lives):
-            life_x = 120 + i * 25
-            pygame.draw.circle(self.screen, YELLOW, (life_x, 65), 8)
-        
-        # Game state messages with background
+            ghost.blend(self.alpha)
+        eaten = self.sync_background()
+        if self.scrolling:
+            # Actors are drawn at screen positions relative to the camera
+            self.follow_pacman()
+            camera_x, camera_y = self.camera
+            for actor in [self.pacman] + self.ghosts:
+                actor.draw_x -= camera_x
+                actor.draw_y -= camera_y
+        if (self.dirty_rects and not self.full_redraw and self.state == PLAYING
+                and not self.show_profile and not self.scrolling):
+            self.draw_dirty(eaten)
+        else:
+            self.draw_full()
+        self.inputs.flipped()
+        if self.capture is not None:
+            self.capture.capture(self.screen, self.frame)
+            self.mark("capture")
+
+    def draw_full(self):
+        # Maze and remaining dots come from the cached background
+        if self.scrolling:
+            self.screen.fill(BLACK)
+            self.chunks.draw(self.screen, *self.camera)
+        else:
+            self.screen.blit(self.background, (0, 0))
+        self.mark("background")
+
+        self.draw_pellets()
+        self.mark("pellets")
+        self.draw_actors()
+        self.mark("actors")
+        self.draw_hud()
+        self.mark("hud")
+
+        # Game state messages over the dimmed frame
         if self.state == GAME_OVER:
-            # Semi-transparent overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill(BLACK)
-            self.screen.blit(overlay, (0, 0))
-            
-            game_over_text = self.font.render("GAME OVER", True, RED)
-            restart_text = self.small_font.render("Press SPACE to restart", True, WHITE)
-            
-            game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20))
-            restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
-            
-            self.screen.blit(game_over_text, game_over_rect)
-            self.screen.blit(restart_text, restart_rect)
-            
+            self.hud.draw_message(self.screen, "GAME OVER", RED)
         elif self.state == WIN:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill(BLACK)
-            self.screen.blit(overlay, (0, 0))
-            
-            win_text = self.font.render("YOU WIN!", True, BRIGHT_YELLOW)
-            restart_text = self.small_font.render("Press SPACE to restart", True, WHITE)
-            
-            win_rect = win_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20))
-            restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
-            
-            self.screen.blit(win_text, win_rect)
-            self.screen.blit(restart_text, restart_rect)
-        
+            self.hud.draw_message(self.screen, "YOU WIN!", BRIGHT_YELLOW)
+
+        if self.show_profile:
+            self.draw_profile()
+        self.mark("overlay")
+
         pygame.display.flip()
-    
+        self.mark("flip")
+        self.previous_rects = self.moving_rects()
+        self.full_redraw = self.state != PLAYING
+
+    def draw_dirty(self, eaten):
+        """Redraw and push only the regions touched since the last frame"""
+        rects = self.moving_rects()
+        dirty = self.previous_rects + rects + eaten
+        hud_changed = (self.score, self.lives) != self.hud_values
+        if hud_changed or self.hud_rect.collidelist(dirty) != -1:
+            dirty.append(self.hud_rect)
+
+        # Restore the background under everything that moved, then redraw
+        for rect in dirty:
+            self.screen.blit(self.background, rect, rect)
+        self.mark("background")
+        self.draw_pellets()
+        self.mark("pellets")
+        self.draw_actors()
+        self.mark("actors")
+        if self.hud_rect in dirty:
+            dirty.append(self.draw_hud())
+        self.mark("hud")
+
+        pygame.display.update(dirty)
+        self.mark("flip")
+        self.previous_rects = rects
+
+    def moving_rects(self):
+        """Screen regions covered by the actors and the pulsing pellets"""
+        return self.actor_rects() + self.pellet_rects()
+
+    def actor_rects(self):
+        return [self.pacman.dirty_rect()] + [ghost.dirty_rect() for ghost in self.ghosts]
+
+    def pellet_rects(self):
+        camera_x, camera_y = self.camera
+        return [pygame.Rect(pellet_x - camera_x - 6, pellet_y - camera_y - 6, 12, 12)
+                for pellet_x, pellet_y in self.power_pellets]
+
+    def draw_pellets(self):
+        # Draw power pellets with pulsing effect; pygame's own tick counter
+        # needs the timer subsystem, so time is kept from game start
+        milliseconds = (time.perf_counter() - self.started) * 1000
+        pulse = self.pulse = int(3 + 2 * abs(math.sin(milliseconds * 0.01)))
+        camera_x, camera_y = self.camera
+        for pellet_x, pellet_y in self.power_pellets:
+            pellet = (pellet_x - camera_x, pellet_y - camera_y)
+            if (-CELL_SIZE < pellet[0] < SCREEN_WIDTH + CELL_SIZE
+                    and -CELL_SIZE < pellet[1] < SCREEN_HEIGHT + CELL_SIZE):
+                pygame.draw.circle(self.screen, BRIGHT_YELLOW, pellet, pulse)
+                pygame.draw.circle(self.screen, WHITE, pellet, pulse - 2)
+
+    def draw_actors(self):
+        # Draw game objects, one blit each when the sprite atlas is available
+        if self.sprites is not None:
+            self.sprites.draw_pacman(self.screen, self.pacman)
+        else:
+            self.pacman.draw(self.screen)
+        screen_rect = self.screen.get_rect()
+        for ghost in self.ghosts:
+            # Ghosts outside the viewport are skipped
+            if not screen_rect.colliderect(ghost.dirty_rect()):
+                continue
+            if self.sprites is not None:
+                self.sprites.draw_ghost(self.screen, ghost)
+            else:
+                ghost.draw(self.screen)
+
+    def draw_hud(self):
+        """Draw score and lives; returns the region the HUD occupies"""
+        # The HUD is composited only when its values or the pixels beneath
+        # change. Pellets under it pulse, so their pulse is part of the
+        # backdrop; the actors are not cached and force a fresh composite.
+        covering = self.actor_rects()
+        pellets = self.pellet_rects()
+        if self.hud_rect.collidelist(pellets) != -1:
+            backdrop = (self.background_version, self.camera, self.pulse)
+        else:
+            backdrop = (self.background_version, self.camera)
+            covering += pellets
+        rect = self.hud.draw_cached(self.screen, self.score, self.lives, backdrop, covering)
+
+        # Grow only, so a shrinking score or lost life is still cleared
+        self.hud_rect.union_ip(rect)
+        self.hud_values = (self.score, self.lives)
+        return self.hud_rect
+
+    def draw_profile(self):
+        """Overlay the rolling p50 / p95 / p99 of every phase in the top right"""
+        if self.profile_surface is None or self.profiler.frames >= self.profile_refresh:
+            # Re-render the table twice a second rather than every frame
+            self.profile_refresh = self.profiler.frames + 30
+            rows = [("phase (ms)", "p50", "p95", "p99")]
+            rows += [(phase, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}")
+                     for phase, p50, p95, p99 in self.profiler.recent()]
+            columns = (0, 115, 175, 235)
+            line_height = self.small_font.get_linesize()
+            surface = pygame.Surface((295, line_height * len(rows) + 10))
+            surface.set_alpha(200)
+            surface.fill(DARK_GRAY)
+            for i, row in enumerate(rows):
+                for column, text in zip(columns, row):
+                    label = self.small_font.render(text, True, WHITE if i else CREAM)
+                    surface.blit(label, (8 + column, 5 + i * line_height))
+            self.profile_surface = surface
+        self.screen.blit(self.profile_surface,
+                         (SCREEN_WIDTH - self.profile_surface.get_width() - 10, 10))
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        self.snap_actors()
+        # Eaten dots may be back; rebuild the background layer
+        self.background_dots = None
+
     def reset_game(self):
-        self.pacman = Pacman(CELL_SIZE * 3 + CELL_SIZE // 2, CELL_SIZE * 3 + CELL_SIZE // 2)
-        self.ghosts = [
-            Ghost(CELL_SIZE * 15 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, RED, "Blinky"),
-            Ghost(CELL_SIZE * 20 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, PINK, "Pinky"),
-            Ghost(CELL_SIZE * 25 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, CYAN, "Inky"),
-            Ghost(CELL_SIZE * 30 + CELL_SIZE // 2, CELL_SIZE * 15 + CELL_SIZE // 2, ORANGE, "Clyde")
-        ]
-        self.dots = self.create_dots()
-        self.power_pellets = self.create_power_pellets()
-        self.score = 0
-        self.lives = 3
-        self.state = PLAYING
-    
+        self.save_recording()
+        self.inputs.clear()
+        self.reset()
+
+    def save_recording(self):
+        if self.recording is not None and self.recording.runs:
+            self.finish_recording().save(self.record_path)
+            print(f"Recorded {self.recording.frames} frames (seed {self.seed}) to {self.record_path}")
+
     def run(self):
+        if self.verbose:
+            self.log_events(sys.stdout, TEXT)
+        if self.events_path:
+            self.log_events(self.events_path, format_for(self.events_path))
         running = True
+        tick = 1.0 / self.tick_rate
+        lag = 0.0
+        previous = time.perf_counter()
         while running:
+            if self.profiler is not None:
+                self.profiler.start_frame()
+            now = time.perf_counter()
+            lag += now - previous
+            previous = now
             running = self.handle_events()
-            self.update()
+            self.mark("events")
+
+            # Run the fixed ticks real time calls for, bounded so a slow
+            # frame can't snowball; a backlog beyond that is dropped
+            steps = 0
+            while lag >= tick and steps < self.max_catchup:
+                self.update()
+                lag -= tick
+                steps += 1
+            if lag >= tick:
+                self.dropped_ticks += int(lag // tick)
+                lag %= tick
+            self.alpha = lag / tick
+
             self.draw()
-            self.clock.tick(60)
-        
+            if self.fps:
+                self.clock.tick(self.fps)
+            if self.profiler is not None:
+                self.profiler.mark("idle")
+                self.profiler.end_frame()
+
+        self.save_recording()
+        self.close_event_logs()
+        print(self.inputs.report())
+        if self.capture is not None:
+            self.capture.close()
+            print(self.capture.report())
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
+            print(f"Frame timings for {self.profiler.frames} frames written to {self.profile_path}")
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Enhanced Pacman Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and push the screen regions that changed")
+    parser.add_argument("--no-sprites", action="store_true",
+                        help="draw actors shape by shape instead of from the sprite atlas")
+    parser.add_argument("--seed", type=int,
+                        help="seed for the first game (random by default)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save the inputs of the latest game for replay.py")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="time every frame phase and write the stats to PATH (.json or .csv) "
+                             "on exit; F3 shows them in game")
+    parser.add_argument("--maze-size", metavar="WxH", type=parse_maze_size,
+                        help="generate a maze of this many cells (at least 8x8); "
+                             "larger than the window scrolls")
+    parser.add_argument("--level", metavar="PATH",
+                        help="play a level file (see levels.py) instead of the generated maze")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="write every frame to PATH on a background thread (see capture.py)")
+    parser.add_argument("--capture-compress", action="store_true",
+                        help="zlib-compress captured frames (smaller files, more writer CPU)")
+    parser.add_argument("--events", metavar="PATH",
+                        help="log game events to PATH: JSON lines for .jsonl, text for .txt, "
+                             "binary otherwise (see events.py)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="don't echo game events to the console")
+    parser.add_argument("--tick-rate", type=int, default=60,
+                        help="simulation steps per second (default 60)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="render frame cap; 0 renders uncapped for high-refresh displays")
+    args = parser.parse_args()
+
+    game = Game(dirty_rects=args.dirty_rects, use_sprites=not args.no_sprites,
+                seed=args.seed, record_path=args.record, profile_path=args.profile,
+                tick_rate=args.tick_rate, fps=args.fps,
+                maze_size=args.maze_size,
+                level=load_level(args.level) if args.level else None,
+                capture_path=args.capture, capture_compress=args.capture_compress,
+                verbose=not args.quiet, events_path=args.events)
     game.run()
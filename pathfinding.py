@@ -0,0 +1,325 @@
+"""Shared BFS distance fields and classic ghost targeting.
+
+Distances are counted in cells along the maze corridors. A DistanceTable holds
+one BFS distance row per target cell. Each row is computed the first time it
+is needed and kept, so a maze's table fills in to the full all-pairs table
+(or is filled at once by precompute()), unless a compiled level supplies the
+full table up front. A table is attached to the Walkability it was built
+for, and the few most recently used are also cached by maze layout, so new
+games on the same maze share them without every maze seen staying alive.
+
+GhostAI gives each ghost its classic personality. Blinky chases Pacman's cell,
+Pinky ambushes four cells ahead of him, Inky mirrors Blinky around the cell
+two ahead, and Clyde chases until he gets close and then retreats to his
+corner. At a junction a ghost takes the open exit with the shortest distance
+to its target, which is one table lookup per exit.
+"""
+from array import array
+from collections import OrderedDict
+
+from movement import CELL_UNITS, DIRECTION_BITS, DIRECTION_DX, DIRECTION_DY, OPPOSITE
+
+UNREACHABLE = 0xFFFF
+
+# Scatter / chase schedule in frames (60 per second); chase forever after
+MODE_SCHEDULE = [(7 * 60, 20 * 60), (7 * 60, 20 * 60), (5 * 60, 20 * 60), (5 * 60, None)]
+SCATTER = 0
+CHASE = 1
+
+# Clyde gives up the chase when closer than this many cells
+CLYDE_SHYNESS = 8
+
+# Cap on cached distance entries, so huge mazes keep only recent rows
+MAX_TABLE_ENTRIES = 1 << 24
+
+# Above this many cells a BFS stops SEARCH_DEPTH cells from its target, so its
+# cost does not grow with the maze; ghosts further away head for the target
+# in a straight line until they come within range. Up to 8192 cells a full
+# BFS costs about 3 ms, close to a bounded one; at 250x250 it takes 25 ms,
+# and a tick that needs three new rows misses several frames
+BOUNDED_SEARCH_CELLS = 1 << 13
+SEARCH_DEPTH = 64
+
+# Above this many cells nearest-open lookups search locally instead of
+# mapping the whole grid once
+LARGE_MAZE_CELLS = 1 << 16
+
+# Tables kept by maze layout beyond the Walkability objects holding them
+MAX_CACHED_TABLES = 4
+
+_tables = OrderedDict()
+
+
+class DistanceTable:
+    """Lazily filled all-pairs BFS distances between the cells of a maze"""
+
+    def __init__(self, walk, nearest_open=None, distances=None):
+        self.width = walk.width
+        self.height = walk.height
+        self.size = walk.width * walk.height
+        self.masks = walk.masks
+        offsets = (1, walk.width, -1, -walk.width)
+        # Offsets of the open neighbours for each of the 16 possible masks
+        self.exits = [tuple(offsets[d] for d in range(4) if mask & DIRECTION_BITS[d])
+                      for mask in range(16)]
+        self.rows = OrderedDict()
+        self.max_rows = max(1, MAX_TABLE_ENTRIES // self.size)
+        self.max_depth = SEARCH_DEPTH if self.size > BOUNDED_SEARCH_CELLS else None
+        self._nearest_open = nearest_open
+        self._open_near = {}
+        # Precomputed cells x cells distances, sliced into rows on demand
+        self.distances = distances
+
+    def row(self, target):
+        """Distances from every cell to target (UNREACHABLE through walls)"""
+        rows = self.rows
+        distances = rows.get(target)
+        if distances is None:
+            if self.distances is None:
+                distances = self.bfs(target)
+            else:
+                distances = self.distances[target * self.size:(target + 1) * self.size]
+            rows[target] = distances
+            if len(rows) > self.max_rows:
+                rows.popitem(last=False)
+        return distances
+
+    def distance(self, a, b):
+        return self.row(b)[a]
+
+    def bfs(self, source):
+        distances = array('H', [UNREACHABLE]) * self.size
+        distances[source] = 0
+        masks = self.masks
+        exits = self.exits
+        frontier = [source]
+        depth = 0
+        max_depth = self.max_depth
+        while frontier and depth != max_depth:
+            depth += 1
+            reached = []
+            for cell in frontier:
+                for offset in exits[masks[cell]]:
+                    neighbour = cell + offset
+                    if distances[neighbour] == UNREACHABLE:
+                        distances[neighbour] = depth
+                        reached.append(neighbour)
+            frontier = reached
+        return distances
+
+    def precompute(self):
+        """Fill in the rows for every open cell"""
+        for cell in range(self.size):
+            if self.masks[cell]:
+                self.row(cell)
+        return self
+
+    def nearest_open(self, cell_x, cell_y):
+        """Closest open cell to (cell_x, cell_y), clamped into the maze"""
+        cell_x = min(max(cell_x, 0), self.width - 1)
+        cell_y = min(max(cell_y, 0), self.height - 1)
+        cell = cell_y * self.width + cell_x
+        if self.size <= LARGE_MAZE_CELLS:
+            return self.nearest_open_cells()[cell]
+        # Large mazes search around the cell instead of mapping the whole grid
+        if self.masks[cell]:
+            return cell
+        nearest = self._open_near.get(cell)
+        if nearest is None:
+            nearest = self._open_near[cell] = self._search_open(cell)
+        return nearest
+
+    def nearest_open_cells(self):
+        """Closest open cell to every cell, walls included"""
+        if self._nearest_open is None:
+            self._nearest_open = self._build_nearest_open()
+        return self._nearest_open
+
+    def _search_open(self, start):
+        seen = {start}
+        frontier = [start]
+        width = self.width
+        while frontier:
+            reached = []
+            for cell in frontier:
+                x = cell % width
+                for neighbour, ok in ((cell + 1, x + 1 < width), (cell - 1, x > 0),
+                                      (cell + width, cell + width < self.size),
+                                      (cell - width, cell >= width)):
+                    if ok and neighbour not in seen:
+                        if self.masks[neighbour]:
+                            return neighbour
+                        seen.add(neighbour)
+                        reached.append(neighbour)
+            frontier = reached
+        return start
+
+    def _build_nearest_open(self):
+        # Multi-source BFS over the whole grid
+        nearest = array('q', [-1]) * self.size
+        frontier = [cell for cell in range(self.size) if self.masks[cell]]
+        for cell in frontier:
+            nearest[cell] = cell
+        width = self.width
+        while frontier:
+            reached = []
+            for cell in frontier:
+                x = cell % width
+                for neighbour, ok in ((cell + 1, x + 1 < width), (cell - 1, x > 0),
+                                      (cell + width, cell + width < self.size),
+                                      (cell - width, cell >= width)):
+                    if ok and nearest[neighbour] == -1:
+                        nearest[neighbour] = nearest[cell]
+                        reached.append(neighbour)
+            frontier = reached
+        return nearest
+
+
+def distance_table(walk, nearest_open=None, distances=None):
+    """Shared DistanceTable for the maze behind a Walkability table.
+
+    The table is attached to walk, so later calls (one per reset) are an
+    attribute lookup. nearest_open and distances are precomputed tables (as
+    stored by a compiled level); a cached table without them is replaced by
+    one reading them, so a level mapped from a file or shared memory is
+    always served from its stored tables.
+    """
+    if walk.table is not None:
+        return walk.table
+    key = (walk.width, bytes(walk.masks))
+    table = _tables.pop(key, None)
+    if (table is None or (distances is not None and table.distances is None)
+            or (nearest_open is not None and table._nearest_open is None)):
+        table = DistanceTable(walk, nearest_open, distances)
+    _tables[key] = table
+    if len(_tables) > MAX_CACHED_TABLES:
+        _tables.popitem(last=False)
+    walk.table = table
+    return table
+
+
+def clear_tables():
+    """Forget the cached tables, e.g. the ones a forked process inherited"""
+    _tables.clear()
+
+
+def scatter_corners(table):
+    """Home cell of each ghost in scatter mode, keyed by name"""
+    right = table.width - 2
+    bottom = table.height - 2
+    return {
+        "Blinky": table.nearest_open(right, 1),
+        "Pinky": table.nearest_open(1, 1),
+        "Inky": table.nearest_open(right, bottom),
+        "Clyde": table.nearest_open(1, bottom),
+    }
+
+
+def mode_at(frame):
+    """Ghost mode (SCATTER or CHASE) for a frame of the current game"""
+    for scatter, chase in MODE_SCHEDULE:
+        if frame < scatter:
+            return SCATTER
+        if chase is None:
+            return CHASE
+        frame -= scatter
+        if frame < chase:
+            return CHASE
+        frame -= chase
+    return CHASE
+
+
+class GhostAI:
+    """Targeting shared by all ghosts in one game"""
+
+    def __init__(self, walk, rng):
+        self.table = distance_table(walk)
+        self.width = walk.width
+        self.rng = rng
+        self.mode = SCATTER
+        self.pacman_cell = None
+        self.pacman_field = None
+        self.pacman_direction = 0
+        self.blinky_cell = None
+        self.corners = scatter_corners(self.table)
+
+    def update(self, frame, pacman, ghosts):
+        """Refresh the shared state once per frame before the ghosts move"""
+        mode = mode_at(frame)
+        if mode != self.mode:
+            self.mode = mode
+            # Ghosts turn around whenever the mode changes
+            for ghost in ghosts:
+                ghost.next_direction = OPPOSITE[ghost.direction]
+
+        cell = self.cell_of(pacman)
+        if cell != self.pacman_cell:
+            # One BFS field from Pacman's cell, shared by every ghost
+            self.pacman_cell = cell
+            self.pacman_field = self.table.row(cell)
+        self.pacman_direction = pacman.direction
+        for ghost in ghosts:
+            if ghost.name == "Blinky":
+                self.blinky_cell = self.cell_of(ghost)
+                break
+
+    def snapshot(self):
+        return (self.mode, self.pacman_cell, self.pacman_field, self.pacman_direction,
+                self.blinky_cell)
+
+    def restore(self, state):
+        (self.mode, self.pacman_cell, self.pacman_field, self.pacman_direction,
+         self.blinky_cell) = state
+
+    def cell_of(self, actor):
+        return (actor.fy // CELL_UNITS) * self.width + actor.fx // CELL_UNITS
+
+    def target(self, ghost):
+        """Cell the ghost is heading for; None means Pacman himself"""
+        name = ghost.name
+        if self.mode == SCATTER and name in self.corners:
+            return self.corners[name]
+        if name == "Pinky":
+            return self.ahead_of_pacman(4)
+        if name == "Inky" and self.blinky_cell is not None:
+            pivot = self.ahead_of_pacman(2)
+            pivot_x, pivot_y = pivot % self.width, pivot // self.width
+            blinky_x, blinky_y = self.blinky_cell % self.width, self.blinky_cell // self.width
+            return self.table.nearest_open(2 * pivot_x - blinky_x, 2 * pivot_y - blinky_y)
+        if name == "Clyde" and self.pacman_field[self.cell_of(ghost)] < CLYDE_SHYNESS:
+            return self.corners[name]
+        return None
+
+    def ahead_of_pacman(self, cells):
+        x = self.pacman_cell % self.width + DIRECTION_DX[self.pacman_direction] * cells
+        y = self.pacman_cell // self.width + DIRECTION_DY[self.pacman_direction] * cells
+        return self.table.nearest_open(x, y)
+
+    def choose_direction(self, ghost, mask):
+        """Open exit from a cell centre that gets closest to the target"""
+        target = self.target(ghost)
+        field = self.pacman_field if target is None else self.table.row(target)
+        cell = self.cell_of(ghost)
+        offsets = (1, self.width, -1, -self.width)
+        reverse = OPPOSITE[ghost.direction]
+
+        options = [direction for direction in range(4)
+                   if mask & DIRECTION_BITS[direction] and direction != reverse]
+        if not options:
+            # Dead end: the only way out is back
+            return reverse if mask & DIRECTION_BITS[reverse] else ghost.direction
+        distances = [field[cell + offsets[direction]] for direction in options]
+        best_distance = min(distances)
+        if best_distance == UNREACHABLE and self.table.max_depth is not None:
+            # Out of search range in a large maze: close in as the crow flies
+            goal = self.pacman_cell if target is None else target
+            goal_x, goal_y = goal % self.width, goal // self.width
+            x, y = cell % self.width, cell // self.width
+            distances = [abs(x + DIRECTION_DX[direction] - goal_x)
+                         + abs(y + DIRECTION_DY[direction] - goal_y) for direction in options]
+            best_distance = min(distances)
+        best = [direction for direction, distance in zip(options, distances)
+                if distance == best_distance]
+        if len(best) == 1:
+            return best[0]
+        return self.rng.choice(best)
@@ -0,0 +1,137 @@
+"""Low-resolution pixel observations drawn straight into NumPy arrays.
+
+For pixel-based agents, the full pygame renderer (800x600, layered circles,
+shadows and text, a display surface) costs milliseconds per frame.
+PixelRenderer draws a small RGB image (84x84 by default) with flat
+primitives instead: walls come from a maze layer rendered once, each dot is
+one pixel, pellets are a small cross and actors are filled discs. Whole
+batches of games are drawn with a handful of vectorized array operations,
+from a list of GameCores or straight from a batch_env.BatchGame. No display
+is needed. Requires NumPy.
+"""
+import numpy as np
+
+from constants import CELL_SIZE
+from movement import CELL_UNITS
+
+FLOOR_COLOR = (0, 0, 0)
+WALL_COLOR = (33, 33, 222)
+DOT_COLOR = (255, 184, 151)
+PELLET_COLOR = (255, 255, 255)
+PACMAN_COLOR = (255, 255, 0)
+
+PELLET_STAMP = ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class PixelRenderer:
+    """Draws games on one maze into (height, width, 3) uint8 images"""
+
+    def __init__(self, maze, size=(84, 84)):
+        self.maze_width = len(maze[0])
+        self.maze_height = len(maze)
+        self.width, self.height = size
+        cells = getattr(maze, "cells", None)
+        if cells is None:
+            cells = bytes(value for row in maze for value in row)
+        walls = np.frombuffer(bytes(cells), dtype=np.uint8).reshape(self.maze_height,
+                                                                    self.maze_width) == 1
+
+        # Nearest-cell sampling: the maze cell under every pixel
+        rows = np.arange(self.height) * self.maze_height // self.height
+        columns = np.arange(self.width) * self.maze_width // self.width
+        self.maze_layer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.maze_layer[:] = FLOOR_COLOR
+        self.maze_layer[walls[rows][:, columns]] = WALL_COLOR
+
+        # Pixel holding the centre of every cell, for dots and pellets
+        half = CELL_SIZE // 2
+        centre_y = np.arange(self.maze_height) * CELL_SIZE + half
+        centre_x = np.arange(self.maze_width) * CELL_SIZE + half
+        self.cell_y = np.repeat(centre_y * self.height // (self.maze_height * CELL_SIZE),
+                                self.maze_width)
+        self.cell_x = np.tile(centre_x * self.width // (self.maze_width * CELL_SIZE),
+                              self.maze_height)
+
+        # Actors are discs about three quarters of a cell across, and at
+        # least 3x3 pixels so they stay visible in tiny images
+        radius = max(1, int(0.375 * min(self.width / self.maze_width,
+                                        self.height / self.maze_height)))
+        stamp = [(dy, dx) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)
+                 if dx * dx + dy * dy <= radius * radius + radius]
+        self.actor_dy = np.array([dy for dy, _ in stamp], dtype=np.int64)
+        self.actor_dx = np.array([dx for _, dx in stamp], dtype=np.int64)
+
+    def check_maze(self, width, height):
+        if (width, height) != (self.maze_width, self.maze_height):
+            raise ValueError(f"renderer is for a {self.maze_width}x{self.maze_height} maze, "
+                             f"not {width}x{height}")
+
+    def render(self, game, out=None):
+        """Image of one GameCore"""
+        if out is not None:
+            out = out[None]
+        return self.render_batch([game], out)[0]
+
+    def render_batch(self, games, out=None):
+        """(len(games), height, width, 3) images of GameCores on this maze"""
+        for game in games:
+            self.check_maze(game.maze.width, game.maze.height)
+        dots = np.stack([np.frombuffer(game.dots.cells, dtype=bool) for game in games])
+        pellets = np.stack([np.frombuffer(game.power_pellets.cells, dtype=bool) for game in games])
+        pacman_x = np.array([game.pacman.fx for game in games], dtype=np.int64)
+        pacman_y = np.array([game.pacman.fy for game in games], dtype=np.int64)
+        ghost_x = np.array([[ghost.fx for ghost in game.ghosts] for game in games], dtype=np.int64)
+        ghost_y = np.array([[ghost.fy for ghost in game.ghosts] for game in games], dtype=np.int64)
+        colors = np.array([ghost.color for ghost in games[0].ghosts], dtype=np.uint8)
+        return self.render_arrays(dots, pellets, pacman_x, pacman_y,
+                                  ghost_x.reshape(len(games), -1), ghost_y.reshape(len(games), -1),
+                                  colors.reshape(-1, 3), out)
+
+    def render_batch_env(self, batch, colors, out=None):
+        """Images of every game in a batch_env.BatchGame; colors are the ghosts' RGB"""
+        height, width = batch.maze.shape
+        self.check_maze(width, height)
+        count = batch.num_games
+        return self.render_arrays(batch.dots.reshape(count, -1), batch.pellets.reshape(count, -1),
+                                  batch.pacman_x, batch.pacman_y, batch.ghost_x, batch.ghost_y,
+                                  np.array(colors, dtype=np.uint8), out)
+
+    def render_arrays(self, dots, pellets, pacman_x, pacman_y, ghost_x, ghost_y, ghost_colors,
+                      out=None):
+        """Draw a batch from arrays.
+
+        dots and pellets are (games, cells) bool bitmaps, pacman_x / pacman_y
+        (games,) and ghost_x / ghost_y (games, ghosts) fixed-point positions,
+        and ghost_colors (ghosts, 3). out, if given, is reused.
+        """
+        count = len(dots)
+        if out is None:
+            out = np.empty((count, self.height, self.width, 3), dtype=np.uint8)
+        out[:] = self.maze_layer
+
+        game, cell = np.nonzero(dots)
+        out[game, self.cell_y[cell], self.cell_x[cell]] = DOT_COLOR
+        game, cell = np.nonzero(pellets)
+        for dy, dx in PELLET_STAMP:
+            out[game, np.clip(self.cell_y[cell] + dy, 0, self.height - 1),
+                np.clip(self.cell_x[cell] + dx, 0, self.width - 1)] = PELLET_COLOR
+
+        # Ghosts first so Pacman stays visible on top of them
+        if ghost_x.size:
+            ghosts = ghost_x.shape[1]
+            game = np.repeat(np.arange(count), ghosts)
+            colors = np.tile(np.asarray(ghost_colors, dtype=np.uint8), (count, 1))
+            self.stamp(out, game, ghost_x.ravel(), ghost_y.ravel(), colors)
+        self.stamp(out, np.arange(count), pacman_x, pacman_y, PACMAN_COLOR)
+        return out
+
+    def stamp(self, out, game, x, y, color):
+        """Draw a disc per (game, x, y), positions in fixed-point units"""
+        centre_x = x * self.width // (self.maze_width * CELL_UNITS)
+        centre_y = y * self.height // (self.maze_height * CELL_UNITS)
+        pixel_x = np.clip(centre_x[:, None] + self.actor_dx, 0, self.width - 1)
+        pixel_y = np.clip(centre_y[:, None] + self.actor_dy, 0, self.height - 1)
+        color = np.asarray(color, dtype=np.uint8)
+        if color.ndim == 2:
+            color = np.repeat(color, len(self.actor_dx), axis=0)
+        out[np.repeat(game, len(self.actor_dx)), pixel_y.ravel(), pixel_x.ravel()] = color
@@ -0,0 +1,148 @@
+"""Per-phase frame timing.
+
+The game calls mark(phase) as each phase of a frame finishes, and
+FrameProfiler charges the time since the previous mark to that phase. Each
+phase keeps a rolling window of recent frames for live p50/p95/p99 figures,
+plus a log-bucketed histogram of the whole run for export. Profiling is
+opt-in: without a profiler the game only pays for an `is not None` check per
+phase.
+"""
+import csv
+import json
+import math
+import time
+from array import array
+
+# Histogram buckets grow by 2 ** (1 / 8), about 9% per bucket, from 1 us
+BUCKETS_PER_OCTAVE = 8
+BUCKET_BASE = 1e-6
+NUM_BUCKETS = 8 * 24  # up to about 16 seconds
+
+FRAME = "frame"
+
+
+def bucket_of(seconds):
+    if seconds <= BUCKET_BASE:
+        return 0
+    bucket = int(math.log2(seconds / BUCKET_BASE) * BUCKETS_PER_OCTAVE) + 1
+    return min(bucket, NUM_BUCKETS - 1)
+
+
+def bucket_upper(bucket):
+    """Upper edge of a bucket in seconds"""
+    return BUCKET_BASE * 2 ** (bucket / BUCKETS_PER_OCTAVE)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class PhaseStats:
+    """Rolling samples and whole-run histogram of one phase"""
+
+    def __init__(self, window):
+        self.window = array('d', bytes(8 * window))
+        self.filled = 0
+        self.position = 0
+        self.histogram = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.window[self.position] = seconds
+        self.position = (self.position + 1) % len(self.window)
+        if self.filled < len(self.window):
+            self.filled += 1
+        self.histogram[bucket_of(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def recent(self):
+        """p50, p95 and p99 in seconds over the rolling window"""
+        values = sorted(self.window[:self.filled])
+        return percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99)
+
+    def overall(self, fraction):
+        """Percentile over the whole run, to histogram resolution"""
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return min(bucket_upper(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": 1e3 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1e3 * self.overall(0.5),
+            "p95_ms": 1e3 * self.overall(0.95),
+            "p99_ms": 1e3 * self.overall(0.99),
+            "max_ms": 1e3 * self.max,
+        }
+
+
+class FrameProfiler:
+    """Splits every frame into named phases and keeps their timing statistics"""
+
+    def __init__(self, window=600):
+        self.window = window
+        self.phases = {}
+        self.current = {}
+        self.frame_start = None
+        self.last = None
+        self.frames = 0
+
+    def start_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase"""
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        self.current[FRAME] = self.last - self.frame_start
+        for phase, seconds in self.current.items():
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = PhaseStats(self.window)
+            stats.add(seconds)
+        self.current.clear()
+        self.frame_start = None
+        self.frames += 1
+
+    def recent(self):
+        """(phase, p50, p95, p99) in milliseconds over the rolling window"""
+        rows = []
+        for phase, stats in self.phases.items():
+            p50, p95, p99 = stats.recent()
+            rows.append((phase, 1e3 * p50, 1e3 * p95, 1e3 * p99))
+        return rows
+
+    def export(self, path):
+        """Write whole-run statistics as CSV if path ends in .csv, else JSON"""
+        summaries = {phase: stats.summary() for phase, stats in self.phases.items()}
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for phase, summary in summaries.items():
+                    writer.writerow([phase] + [round(value, 4) if isinstance(value, float) else value
+                                               for value in summary.values()])
+            return
+        for phase, summary in summaries.items():
+            histogram = self.phases[phase].histogram
+            summary["histogram_ms"] = [[round(1e3 * bucket_upper(bucket), 6), count]
+                                       for bucket, count in enumerate(histogram) if count]
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames, "phases": summaries}, f, indent=2)
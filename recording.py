@@ -0,0 +1,122 @@
+"""Compact binary recordings of Pacman's inputs.
+
+A game is fully determined by its seed and the direction Pacman was steered
+in on every frame, so that is all a recording stores. Directions take two
+bits and are run-length encoded: each run is one unsigned LEB128 varint
+holding (length << 2) | direction, so holding a key for a second costs a
+single byte.
+
+File layout (all integers are varints unless noted):
+
+    b"PMR2"  seed  frames  width  height  hash (16 raw bytes)  runs...
+
+width and height are the maze size in cells, so games on generated mazes of
+any size replay; PMR1 files have no size and were played on the default
+maze. hash is GameCore.state_hash() of the final state, which replay.py
+checks.
+"""
+
+MAGIC = b"PMR2"
+# Recordings from before the maze size was stored
+MAGIC_V1 = b"PMR1"
+HASH_SIZE = 16
+
+
+def write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Decode the varint at data[pos]; returns (value, next position)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated recording")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recording:
+    """Seed, maze size, per-frame input runs and final state hash of one game"""
+
+    def __init__(self, seed, runs=None, final_hash=None, maze_size=None):
+        if not isinstance(seed, int) or seed < 0:
+            raise ValueError(f"only non-negative integer seeds can be recorded, got {seed!r}")
+        self.seed = seed
+        self.runs = runs if runs is not None else []  # [direction, length] pairs
+        self.final_hash = final_hash
+        # (width, height) in cells; None for the default maze
+        self.maze_size = maze_size
+
+    @property
+    def frames(self):
+        return sum(length for _, length in self.runs)
+
+    def record(self, direction):
+        """Append one frame of input"""
+        runs = self.runs
+        if runs and runs[-1][0] == direction:
+            runs[-1][1] += 1
+        else:
+            runs.append([direction, 1])
+
+    def inputs(self):
+        """Yield the direction of every recorded frame"""
+        for direction, length in self.runs:
+            for _ in range(length):
+                yield direction
+
+    def to_bytes(self):
+        if self.final_hash is None or len(self.final_hash) != HASH_SIZE:
+            raise ValueError("recording has no final state hash")
+        if self.maze_size is None:
+            raise ValueError("recording has no maze size")
+        out = bytearray(MAGIC)
+        write_varint(out, self.seed)
+        write_varint(out, self.frames)
+        write_varint(out, self.maze_size[0])
+        write_varint(out, self.maze_size[1])
+        out += self.final_hash
+        for direction, length in self.runs:
+            write_varint(out, (length << 2) | direction)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic = bytes(data[:len(MAGIC)])
+        if magic not in (MAGIC, MAGIC_V1):
+            raise ValueError("not a Pacman recording")
+        seed, pos = read_varint(data, len(MAGIC))
+        frames, pos = read_varint(data, pos)
+        maze_size = None
+        if magic == MAGIC:
+            width, pos = read_varint(data, pos)
+            height, pos = read_varint(data, pos)
+            maze_size = (width, height)
+        final_hash = bytes(data[pos:pos + HASH_SIZE])
+        pos += HASH_SIZE
+        runs = []
+        while pos < len(data):
+            value, pos = read_varint(data, pos)
+            runs.append([value & 3, value >> 2])
+        recording = cls(seed, runs, final_hash, maze_size)
+        if recording.frames != frames:
+            raise ValueError(f"recording holds {recording.frames} frames, header says {frames}")
+        return recording
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,52 @@
+"""Re-simulate a recorded game headlessly and check its final state.
+
+Usage: python replay.py recording.pmr [--level LEVEL]
+"""
+import argparse
+import sys
+import time
+
+from game_core import GameCore, PLAYING, GAME_OVER, WIN
+from levels import load_level
+from recording import Recording
+
+STATE_NAMES = {PLAYING: "playing", GAME_OVER: "game over", WIN: "won"}
+
+
+def replay(recording, level=None):
+    """Step a fresh GameCore through the recorded inputs.
+
+    level must be the levels.Level the game was recorded on, if any; without
+    one the maze is generated at the recorded size. Returns the game and
+    whether its final state hash matches the recording.
+    """
+    size = recording.maze_size
+    if level is not None and size is not None and size != (level.width, level.height):
+        raise ValueError(f"recording was played on a {size[0]}x{size[1]} maze, "
+                         f"level is {level.width}x{level.height}")
+    game = GameCore(seed=recording.seed, maze_size=size, level=level)
+    step = game.step
+    for direction in recording.inputs():
+        step(direction)
+    return game, game.state_hash() == recording.final_hash
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded Pacman game headlessly")
+    parser.add_argument("recording", help="file written by pac_man.py --record")
+    parser.add_argument("--level", metavar="PATH", help="level file the game was played on")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    level = load_level(args.level) if args.level else None
+    start = time.perf_counter()
+    game, matched = replay(recording, level)
+    elapsed = time.perf_counter() - start
+
+    print(f"seed {recording.seed}: {recording.frames} frames in {len(recording.runs)} runs")
+    print(f"score {game.score}, lives {game.lives}, {STATE_NAMES[game.state]}")
+    print(f"replayed at {recording.frames / max(elapsed, 1e-9):,.0f} frames/s")
+    if not matched:
+        print("final state hash MISMATCH: the simulation diverged from the recording")
+        sys.exit(1)
+    print("final state hash matches")
@@ -0,0 +1,212 @@
+"""Seeded episode rollouts spread across a process pool.
+
+Evaluating an agent or a ghost AI change takes thousands of seeded episodes.
+Rollouts hand out chunks of seeds to worker processes. Each worker plays its
+episodes headlessly on one GameCore that it resets per seed.
+
+The level is compiled once in the parent (see levels.compile_level) and
+copied into a multiprocessing.shared_memory block. Each worker maps that
+block and reads the grid, masks, item bitmaps and distance tables in place
+with levels.read_compiled. Nothing level-sized is pickled per task, and the
+tables exist once in memory however many workers run. Tasks carry only seed
+lists. Results come back one batch per chunk as workers finish them, so a
+long run can be aggregated into a Summary as it goes.
+
+An agent is a picklable callable that takes an episode's seed and returns a
+function from the game to an action (a direction, or None to keep the
+current input). The default, RandomTurns, picks a random direction every
+half second.
+
+Usage: python rollout.py [EPISODES] [--workers N] [--level PATH]
+                         [--agent MODULE:NAME] [--max-steps N] [--seed N]
+"""
+import argparse
+import importlib
+import math
+import os
+import random
+import signal
+import time
+from multiprocessing import Pool, shared_memory
+
+from game_core import GAME_OVER, PLAYING, START_LIVES, WIN, GameCore
+from levels import compile_level, level_from_maze, load_level, read_compiled, source_hash
+from pathfinding import clear_tables
+
+# Episodes still running after this many frames are cut off
+MAX_STEPS = 20000
+# Seeds per task; each task returns one batch of results
+BATCH_SIZE = 16
+
+OUTCOME_NAMES = {WIN: "won", GAME_OVER: "lost", PLAYING: "timed out"}
+
+
+class RandomTurns:
+    """Agent steering a random direction every period frames, seeded per episode"""
+
+    def __init__(self, seed, period=30):
+        self.rng = random.Random(seed)
+        self.period = period
+
+    def __call__(self, game):
+        if game.frame % self.period == 0:
+            return self.rng.randrange(4)
+        return None
+
+
+def default_level():
+    """The generated maze, with its items and spawns, as a levels.Level.
+
+    Episodes on it play exactly as they do on GameCore's own generated maze.
+    """
+    game = GameCore(seed=0)
+    return level_from_maze(game.maze, game.dots, game.power_pellets, game.pacman_start,
+                           game.ghost_spawns)
+
+
+def play_episode(game, seed, agent=RandomTurns, max_steps=MAX_STEPS):
+    """Reset game to seed and play it out; returns (seed, score, lives lost, steps, state)"""
+    game.reset(seed)
+    act = agent(seed)
+    step = game.step
+    while game.state == PLAYING and game.frame < max_steps:
+        step(act(game))
+    return (seed, game.score, START_LIVES - game.lives, game.frame, game.state)
+
+
+# Per-process state of a pool worker, set up by init_worker
+_worker = None
+
+
+def init_worker(name, agent, max_steps):
+    # A forked worker inherits the parent's handlers; SDL's (when the parent
+    # runs pygame) turns SIGTERM into a quit event, so Pool.terminate() would
+    # wait on the worker forever
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    # Tables a forked worker inherited from the parent would stand in for the
+    # shared ones; the game must read the level's tables from shared memory
+    clear_tables()
+    memory = shared_memory.SharedMemory(name=name)
+    level = read_compiled(memory.buf)
+    global _worker
+    _worker = (memory, GameCore(seed=0, level=level), agent, max_steps)
+
+
+def run_batch(seeds):
+    _, game, agent, max_steps = _worker
+    return [play_episode(game, seed, agent, max_steps) for seed in seeds]
+
+
+def rollouts(seeds, level=None, workers=None, agent=RandomTurns, max_steps=MAX_STEPS,
+             batch_size=BATCH_SIZE):
+    """Play an episode per seed across worker processes.
+
+    Yields lists of play_episode() results as batches finish, in completion
+    order rather than seed order. level defaults to default_level() and
+    workers to the CPU count.
+    """
+    if level is None:
+        level = default_level()
+    data = compile_level(level, source_hash(level.to_text()))
+    seeds = list(seeds)
+    chunks = [seeds[i:i + batch_size] for i in range(0, len(seeds), batch_size)]
+    memory = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        memory.buf[:len(data)] = data
+        with Pool(workers or os.cpu_count(), init_worker,
+                  (memory.name, agent, max_steps)) as pool:
+            yield from pool.imap_unordered(run_batch, chunks)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+class Stat:
+    """Running count, mean, standard deviation and range of one quantity"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.low = None
+        self.high = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.squares += value * value
+        self.low = value if self.low is None else min(self.low, value)
+        self.high = value if self.high is None else max(self.high, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stdev(self):
+        if self.count < 2:
+            return 0.0
+        variance = (self.squares - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def __str__(self):
+        return f"{self.mean:9.1f} +- {self.stdev:7.1f}  [{self.low}, {self.high}]"
+
+
+class Summary:
+    """Aggregate of episode results, fed batch by batch"""
+
+    def __init__(self):
+        self.episodes = 0
+        self.outcomes = dict.fromkeys(OUTCOME_NAMES, 0)
+        self.score = Stat()
+        self.lives_lost = Stat()
+        self.steps = Stat()
+
+    def add(self, results):
+        for _, score, lives_lost, steps, state in results:
+            self.episodes += 1
+            self.outcomes[state] += 1
+            self.score.add(score)
+            self.lives_lost.add(lives_lost)
+            self.steps.add(steps)
+
+    def report(self):
+        outcomes = ", ".join(f"{count} {OUTCOME_NAMES[state]}"
+                             for state, count in self.outcomes.items())
+        return "\n".join([
+            f"episodes    {self.episodes} ({outcomes})",
+            f"score       {self.score}",
+            f"lives lost  {self.lives_lost}",
+            f"steps       {self.steps}",
+        ])
+
+
+def load_agent(spec):
+    """Agent named by "module:name" """
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play seeded Pacman episodes on every core")
+    parser.add_argument("episodes", nargs="?", type=int, default=1000)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--level", metavar="PATH", help="level file (default: generated maze)")
+    parser.add_argument("--agent", metavar="MODULE:NAME", help="agent factory (default: RandomTurns)")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0, help="first episode seed")
+    args = parser.parse_args()
+
+    summary = Summary()
+    start = time.perf_counter()
+    for batch in rollouts(range(args.seed, args.seed + args.episodes),
+                          load_level(args.level) if args.level else None, args.workers,
+                          load_agent(args.agent) if args.agent else RandomTurns,
+                          args.max_steps, args.batch_size):
+        summary.add(batch)
+    elapsed = time.perf_counter() - start
+    print(summary.report())
+    print(f"{summary.episodes / elapsed:.1f} episodes/s, "
+          f"{summary.steps.total / elapsed:,.0f} steps/s in {elapsed:.2f} s")
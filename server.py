@@ -0,0 +1,438 @@
+"""Authoritative game server streaming delta-compressed state over TCP.
+
+The server owns the only GameCore and steps it at a fixed tick rate. Clients
+send directions for Pacman (the latest one received before a tick is used)
+and receive the game as a stream of small binary messages:
+
+    WELCOME     once per connection: maze size, tick rate and walls
+    KEYFRAME    the full state: counters, every actor, dot and pellet bitmaps
+    DELTA       one per tick: what changed since the previous tick
+
+A delta lists only the actors that moved (as position differences), the
+cells of the dots and pellets eaten that tick, and the score, lives or state
+if they changed, so a tick of the default game is usually about 20 bytes.
+Keyframes go to every client when it joins, after a restart and every
+keyframe_interval ticks, and to a client that fell behind once its
+connection has drained.
+
+Every message is a varint length followed by the payload, whose first byte
+is the message type; integers inside are varints (zigzag for signed values)
+and bitmaps are zlib-compressed. An empty payload, or a client message over
+MAX_MESSAGE bytes, is a protocol error and closes the connection.
+
+Usage: python server.py [--port 7777] [--seed N] [--level PATH]
+"""
+import argparse
+import asyncio
+import time
+import zlib
+
+from game_core import PLAYING, GameCore
+from levels import load_level
+from recording import read_varint, write_varint
+
+DEFAULT_PORT = 7777
+
+# Server -> client message types
+WELCOME = 1
+KEYFRAME = 2
+DELTA = 3
+
+# Client -> server message types
+INPUT = 16
+RESTART = 17
+
+# Bits of a delta's change flags
+SCORE_CHANGED = 1
+LIVES_CHANGED = 2
+STATE_CHANGED = 4
+
+# Keyframe every 5 seconds at 60 ticks per second
+KEYFRAME_INTERVAL = 300
+
+# A client with more than this many bytes unsent skips deltas until it drains
+MAX_BACKLOG = 1 << 16
+
+# Longest message the server accepts; client messages are a few bytes
+MAX_MESSAGE = 1 << 16
+# Longest message a client accepts; keyframes of huge mazes run to megabytes
+MAX_STATE_MESSAGE = 1 << 28
+
+
+class ProtocolError(ValueError):
+    """A peer sent a message that breaks the framing"""
+
+
+def zigzag(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def write_cells(out, cells):
+    """Sorted cell indices as a count and the gaps between them"""
+    write_varint(out, len(cells))
+    previous = 0
+    for cell in sorted(cells):
+        write_varint(out, cell - previous)
+        previous = cell
+
+
+def read_cells(data, pos):
+    count, pos = read_varint(data, pos)
+    cells = []
+    cell = 0
+    for _ in range(count):
+        gap, pos = read_varint(data, pos)
+        cell += gap
+        cells.append(cell)
+    return cells, pos
+
+
+def write_blob(out, data):
+    packed = zlib.compress(bytes(data))
+    write_varint(out, len(packed))
+    out += packed
+
+
+def read_blob(data, pos):
+    length, pos = read_varint(data, pos)
+    return zlib.decompress(data[pos:pos + length]), pos + length
+
+
+def frame_message(payload):
+    """payload prefixed with its varint length, ready to write to a stream"""
+    message = bytearray()
+    write_varint(message, len(payload))
+    message += payload
+    return bytes(message)
+
+
+async def read_message(reader, max_length=MAX_MESSAGE):
+    """Next framed payload from a stream.
+
+    Raises IncompleteReadError at EOF, and ProtocolError for an empty
+    payload or one longer than max_length (checked before it is read).
+    """
+    length = 0
+    shift = 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if length > max_length:
+            raise ProtocolError(f"message longer than {max_length} bytes")
+        if byte < 0x80:
+            break
+        shift += 7
+    if length == 0:
+        raise ProtocolError("empty message")
+    return await reader.readexactly(length)
+
+
+def encode_welcome(game, tick_rate):
+    out = bytearray([WELCOME])
+    write_varint(out, game.maze.width)
+    write_varint(out, game.maze.height)
+    write_varint(out, tick_rate)
+    write_blob(out, game.maze.cells)
+    return out
+
+
+def encode_keyframe(game):
+    out = bytearray([KEYFRAME])
+    write_varint(out, game.frame)
+    write_varint(out, game.score)
+    write_varint(out, zigzag(game.lives))
+    out.append(game.state)
+    actors = [game.pacman] + game.ghosts
+    write_varint(out, len(actors))
+    for actor in actors:
+        write_varint(out, actor.fx)
+        write_varint(out, actor.fy)
+        out.append(actor.direction)
+    write_blob(out, game.dots.cells)
+    write_blob(out, game.power_pellets.cells)
+    return out
+
+
+class DeltaEncoder:
+    """Turns each tick of a game into a DELTA against the tick before"""
+
+    def __init__(self, game):
+        self.sync(game)
+
+    def sync(self, game):
+        """Start over from the game's current state, as sent in a keyframe"""
+        self.game = game
+        self.counters = (game.score, game.lives, game.state)
+        self.actors = [(actor.fx, actor.fy, actor.direction) for actor in [game.pacman] + game.ghosts]
+        self.dots_eaten = game.dots.track_removals()
+        self.pellets_eaten = game.power_pellets.track_removals()
+
+    def encode(self):
+        game = self.game
+        out = bytearray([DELTA])
+        write_varint(out, game.frame)
+        counters = (game.score, game.lives, game.state)
+        flags = 0
+        if counters[0] != self.counters[0]:
+            flags |= SCORE_CHANGED
+        if counters[1] != self.counters[1]:
+            flags |= LIVES_CHANGED
+        if counters[2] != self.counters[2]:
+            flags |= STATE_CHANGED
+        out.append(flags)
+        if flags & SCORE_CHANGED:
+            write_varint(out, game.score)
+        if flags & LIVES_CHANGED:
+            write_varint(out, zigzag(game.lives))
+        if flags & STATE_CHANGED:
+            out.append(game.state)
+        self.counters = counters
+
+        moved = bytearray()
+        count = 0
+        previous = self.actors
+        for index, actor in enumerate([game.pacman] + game.ghosts):
+            fx, fy, direction = previous[index]
+            if actor.fx != fx or actor.fy != fy or actor.direction != direction:
+                write_varint(moved, index)
+                write_varint(moved, zigzag(actor.fx - fx))
+                write_varint(moved, zigzag(actor.fy - fy))
+                moved.append(actor.direction)
+                previous[index] = (actor.fx, actor.fy, actor.direction)
+                count += 1
+        write_varint(out, count)
+        out += moved
+
+        write_cells(out, self.dots_eaten)
+        write_cells(out, self.pellets_eaten)
+        self.dots_eaten.clear()
+        self.pellets_eaten.clear()
+        return out
+
+
+class ClientState:
+    """A client's copy of the game, rebuilt from WELCOME, KEYFRAME and DELTA"""
+
+    def __init__(self):
+        self.width = self.height = 0
+        self.tick_rate = 0
+        self.maze = None
+        self.frame = 0
+        self.score = 0
+        self.lives = 0
+        self.state = PLAYING
+        self.actors = []  # [fx, fy, direction], Pacman first
+        self.dots = None
+        self.pellets = None
+        self.keyframes = 0
+        self.deltas = 0
+
+    def apply(self, payload):
+        """Apply one server message; returns its type"""
+        if not payload:
+            raise ProtocolError("empty message")
+        kind = payload[0]
+        pos = 1
+        if kind == WELCOME:
+            self.width, pos = read_varint(payload, pos)
+            self.height, pos = read_varint(payload, pos)
+            self.tick_rate, pos = read_varint(payload, pos)
+            self.maze, pos = read_blob(payload, pos)
+        elif kind == KEYFRAME:
+            self.frame, pos = read_varint(payload, pos)
+            self.score, pos = read_varint(payload, pos)
+            lives, pos = read_varint(payload, pos)
+            self.lives = unzigzag(lives)
+            self.state = payload[pos]
+            count, pos = read_varint(payload, pos + 1)
+            self.actors = []
+            for _ in range(count):
+                fx, pos = read_varint(payload, pos)
+                fy, pos = read_varint(payload, pos)
+                self.actors.append([fx, fy, payload[pos]])
+                pos += 1
+            dots, pos = read_blob(payload, pos)
+            pellets, pos = read_blob(payload, pos)
+            self.dots = bytearray(dots)
+            self.pellets = bytearray(pellets)
+            self.keyframes += 1
+        elif kind == DELTA:
+            self.frame, pos = read_varint(payload, pos)
+            flags = payload[pos]
+            pos += 1
+            if flags & SCORE_CHANGED:
+                self.score, pos = read_varint(payload, pos)
+            if flags & LIVES_CHANGED:
+                lives, pos = read_varint(payload, pos)
+                self.lives = unzigzag(lives)
+            if flags & STATE_CHANGED:
+                self.state = payload[pos]
+                pos += 1
+            count, pos = read_varint(payload, pos)
+            for _ in range(count):
+                index, pos = read_varint(payload, pos)
+                dx, pos = read_varint(payload, pos)
+                dy, pos = read_varint(payload, pos)
+                actor = self.actors[index]
+                actor[0] += unzigzag(dx)
+                actor[1] += unzigzag(dy)
+                actor[2] = payload[pos]
+                pos += 1
+            dots, pos = read_cells(payload, pos)
+            for cell in dots:
+                self.dots[cell] = 0
+            pellets, pos = read_cells(payload, pos)
+            for cell in pellets:
+                self.pellets[cell] = 0
+            self.deltas += 1
+        else:
+            raise ProtocolError(f"unknown message type {kind}")
+        return kind
+
+    def matches(self, game):
+        """Whether this copy agrees with the server's game on everything streamed"""
+        actors = [[actor.fx, actor.fy, actor.direction] for actor in [game.pacman] + game.ghosts]
+        return ((self.frame, self.score, self.lives, self.state, self.actors)
+                == (game.frame, game.score, game.lives, game.state, actors)
+                and self.dots == game.dots.cells and self.pellets == game.power_pellets.cells)
+
+
+class Connection:
+    """One connected client and whether it needs a keyframe"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.needs_keyframe = True
+        self.bytes_sent = 0
+        self.skipped = 0
+
+
+class GameServer:
+    """Runs a GameCore at tick_rate and streams it to every connected client"""
+
+    def __init__(self, game=None, tick_rate=60, keyframe_interval=KEYFRAME_INTERVAL,
+                 max_backlog=MAX_BACKLOG):
+        self.game = game if game is not None else GameCore()
+        self.tick_rate = tick_rate
+        self.keyframe_interval = keyframe_interval
+        self.max_backlog = max_backlog
+        self.encoder = DeltaEncoder(self.game)
+        self.connections = set()
+        self.welcome = frame_message(encode_welcome(self.game, tick_rate))
+        self.next_direction = None
+        self.restart_requested = False
+        self.ticks = 0
+        self.late_ticks = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Listen for clients; port 0 picks a free port, see self.port"""
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle_client(self, reader, writer):
+        connection = Connection(writer)
+        writer.write(self.welcome)
+        connection.bytes_sent += len(self.welcome)
+        self.connections.add(connection)
+        try:
+            while True:
+                payload = await read_message(reader)
+                if payload[0] == INPUT and len(payload) == 2 and payload[1] < 4:
+                    self.next_direction = payload[1]
+                elif payload[0] == RESTART:
+                    self.restart_requested = True
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            pass
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+    def tick(self):
+        """Advance the game one step and send the result to every client"""
+        game = self.game
+        keyframe = False
+        if self.restart_requested:
+            self.restart_requested = False
+            game.reset()
+            self.encoder.sync(game)
+            keyframe = True
+        if self.next_direction is not None:
+            game.pacman.next_direction = self.next_direction
+            self.next_direction = None
+        game.update()
+        self.ticks += 1
+        keyframe = keyframe or self.ticks % self.keyframe_interval == 0
+        delta = frame_message(self.encoder.encode())
+        full = frame_message(encode_keyframe(game)) if keyframe else None
+
+        for connection in self.connections:
+            transport = connection.writer.transport
+            if transport.get_write_buffer_size() > self.max_backlog:
+                # Deltas only apply in order, so a lagging client resyncs later
+                connection.needs_keyframe = True
+                connection.skipped += 1
+                continue
+            if connection.needs_keyframe and full is None:
+                full = frame_message(encode_keyframe(game))
+            message = full if (keyframe or connection.needs_keyframe) else delta
+            connection.needs_keyframe = False
+            connection.writer.write(message)
+            connection.bytes_sent += len(message)
+
+    async def run(self, ticks=None):
+        """Tick in real time, forever or for a number of ticks"""
+        period = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        while ticks is None or self.ticks < ticks:
+            self.tick()
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Running late: let clients in, then carry on from now
+                self.late_ticks += 1
+                await asyncio.sleep(0)
+                if -delay > 5 * period:
+                    next_tick = time.perf_counter()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for connection in list(self.connections):
+            connection.writer.close()
+
+
+async def serve(game, host, port, tick_rate):
+    server = await GameServer(game, tick_rate).start(host, port)
+    print(f"serving seed {game.seed} on {host}:{server.port} at {tick_rate} ticks/s")
+    try:
+        await server.run()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an authoritative Pacman game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--level", metavar="PATH", help="level file to play (see levels.py)")
+    parser.add_argument("--tick-rate", type=int, default=60)
+    args = parser.parse_args()
+
+    game = GameCore(seed=args.seed, level=load_level(args.level) if args.level else None)
+    try:
+        asyncio.run(serve(game, args.host, args.port, args.tick_rate))
+    except KeyboardInterrupt:
+        pass
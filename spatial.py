@@ -0,0 +1,123 @@
+"""Uniform-grid spatial hash for actor proximity queries.
+
+Actors are bucketed by the maze cell holding their centre, so a query only
+looks at the cells within its radius instead of at every actor. Buckets hold
+indices into the actor list the hash was built from. After the actors move,
+refresh() re-buckets only those that crossed into a new cell, which costs a
+couple of integer operations per actor. All distances are compared squared, in the same
+fixed-point units as the actors' fx / fy.
+"""
+from movement import CELL_UNITS
+
+
+class SpatialHash:
+    """Indices of a list of actors, bucketed by maze cell"""
+
+    def __init__(self, width):
+        self.width = width
+        self.buckets = {}
+        self.cells = []
+        self.actors = []
+        self._offsets = {}
+
+    def __len__(self):
+        return len(self.actors)
+
+    def cell_of(self, actor):
+        return (actor.fy // CELL_UNITS) * self.width + actor.fx // CELL_UNITS
+
+    def rebuild(self, actors):
+        """Re-bucket every actor, e.g. after a reset or restore"""
+        self.actors = actors
+        self.buckets = buckets = {}
+        self.cells = cells = []
+        for index, actor in enumerate(actors):
+            cell = self.cell_of(actor)
+            cells.append(cell)
+            bucket = buckets.get(cell)
+            if bucket is None:
+                buckets[cell] = [index]
+            else:
+                bucket.append(index)
+
+    def refresh(self):
+        """Re-bucket the actors that crossed into a new cell since the last call"""
+        width = self.width
+        cells = self.cells
+        for index, actor in enumerate(self.actors):
+            cell = (actor.fy // CELL_UNITS) * width + actor.fx // CELL_UNITS
+            if cell != cells[index]:
+                self.move(index, cell)
+
+    def move(self, index, cell):
+        buckets = self.buckets
+        previous = self.cells[index]
+        self.cells[index] = cell
+        bucket = buckets[previous]
+        bucket.remove(index)
+        if not bucket:
+            del buckets[previous]
+        bucket = buckets.get(cell)
+        if bucket is None:
+            buckets[cell] = [index]
+        else:
+            bucket.append(index)
+
+    def offsets(self, radius):
+        """Cell index offsets of the square of cells a radius can reach"""
+        offsets = self._offsets.get(radius)
+        if offsets is None:
+            span = radius // CELL_UNITS + 1
+            offsets = [dy * self.width + dx for dy in range(-span, span + 1)
+                       for dx in range(-span, span + 1)]
+            self._offsets[radius] = offsets
+        return offsets
+
+    def near(self, fx, fy, radius):
+        """Sorted indices of the actors closer than radius to (fx, fy)"""
+        limit = radius * radius
+        centre = (fy // CELL_UNITS) * self.width + fx // CELL_UNITS
+        buckets = self.buckets
+        actors = self.actors
+        found = []
+        for offset in self.offsets(radius):
+            bucket = buckets.get(centre + offset)
+            if bucket is not None:
+                for index in bucket:
+                    actor = actors[index]
+                    dx = fx - actor.fx
+                    dy = fy - actor.fy
+                    if dx * dx + dy * dy < limit:
+                        found.append(index)
+        found.sort()
+        return found
+
+    def pairs(self, radius):
+        """Sorted (i, j) index pairs, i < j, of actors closer than radius"""
+        limit = radius * radius
+        # Each pair of buckets is visited once: itself, then only forward offsets
+        forward = [offset for offset in self.offsets(radius) if offset > 0]
+        buckets = self.buckets
+        actors = self.actors
+        found = []
+        for cell, bucket in buckets.items():
+            for position, index in enumerate(bucket):
+                actor = actors[index]
+                for other in bucket[position + 1:]:
+                    dx = actor.fx - actors[other].fx
+                    dy = actor.fy - actors[other].fy
+                    if dx * dx + dy * dy < limit:
+                        found.append((min(index, other), max(index, other)))
+            for offset in forward:
+                neighbours = buckets.get(cell + offset)
+                if neighbours is None:
+                    continue
+                for index in bucket:
+                    actor = actors[index]
+                    for other in neighbours:
+                        dx = actor.fx - actors[other].fx
+                        dy = actor.fy - actors[other].fy
+                        if dx * dx + dy * dy < limit:
+                            found.append((min(index, other), max(index, other)))
+        found.sort()
+        return found
@@ -0,0 +1,69 @@
+"""Pre-rendered sprite atlas for the actors.
+
+Pacman and the ghosts only ever show a small set of animation frames: four
+directions times the possible mouth openings, and one frame per ghost colour
+and skirt wave height. SpriteAtlas draws each of them once at startup, so
+drawing an actor during the game is a single blit.
+"""
+import pygame
+
+# Colour keyed as transparent in the sprite surfaces; no actor uses it
+TRANSPARENT = (255, 0, 255)
+
+
+class SpriteAtlas:
+    """Animation frames for Pacman and every ghost colour, keyed by phase.
+
+    pacman_class and ghost_class provide draw_frame() plus the phase lists
+    MOUTH_ANGLES and WAVE_AMPLITUDES, so the frames are drawn by exactly the
+    same code as the direct path. Actors are placed at their draw_x /
+    draw_y position, which is in whole pixels, so a blit covers the same
+    pixels as drawing the frame in place.
+    """
+
+    def __init__(self, pacman_class, ghost_class, ghost_colors, radius=10):
+        # Room for the shadow to the lower right and the skirt below
+        self.origin = (radius + 2, radius + 4)
+        self.size = (2 * radius + 6, 2 * radius + 10)
+        self.pacman_frames = {}
+        self.ghost_frames = {}
+
+        for direction in range(4):
+            for mouth_angle in pacman_class.MOUTH_ANGLES:
+                surface = self.new_frame()
+                pacman_class.draw_frame(surface, self.origin[0], self.origin[1],
+                                        radius, direction, mouth_angle)
+                self.pacman_frames[direction, mouth_angle] = self.finish_frame(surface)
+
+        for color in ghost_colors:
+            for amplitude in ghost_class.WAVE_AMPLITUDES:
+                surface = self.new_frame()
+                ghost_class.draw_frame(surface, self.origin[0], self.origin[1],
+                                       radius, color, amplitude)
+                self.ghost_frames[color, amplitude] = self.finish_frame(surface)
+
+    def new_frame(self):
+        surface = pygame.Surface(self.size)
+        surface.fill(TRANSPARENT)
+        return surface
+
+    def finish_frame(self, surface):
+        surface.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def __len__(self):
+        return len(self.pacman_frames) + len(self.ghost_frames)
+
+    def draw_pacman(self, screen, pacman):
+        frame = self.pacman_frames[pacman.direction, pacman.mouth_angle()]
+        return screen.blit(frame, (pacman.draw_x - self.origin[0], pacman.draw_y - self.origin[1]))
+
+    def draw_ghost(self, screen, ghost):
+        frame = self.ghost_frames.get((ghost.color, ghost.wave_amplitude()))
+        if frame is None:
+            # Colour not in the atlas (custom ghosts); fall back to drawing it
+            ghost.draw(screen)
+            return ghost.dirty_rect()
+        return screen.blit(frame, (ghost.draw_x - self.origin[0], ghost.draw_y - self.origin[1]))
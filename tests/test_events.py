@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+from events import LIFE_LOST, EventBuffer, event_dict
+from game_core import GAME_OVER, PLAYING, GameCore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def play_to_the_end(game):
+    frame = 0
+    while game.state == PLAYING:
+        game.step(frame // 30 % 4)
+        frame += 1
+
+
+def test_ring_buffer_counts_overwritten_events():
+    buffer = EventBuffer(capacity=4)
+    subscription = buffer.subscribe()
+    for tick in range(6):
+        buffer.emit(tick, LIFE_LOST, tick, 0)
+    assert [event.tick for event in subscription.poll()] == [2, 3, 4, 5]
+    assert subscription.missed == 2
+    assert subscription.poll() == []
+
+
+def test_log_holds_every_event(tmp_path):
+    game = GameCore(seed=0)
+    subscription = game.events.subscribe()
+    path = str(tmp_path / "events.jsonl")
+    game.log_events(path)
+    play_to_the_end(game)
+    game.close_event_logs()
+    with open(path) as f:
+        logged = [json.loads(line) for line in f]
+    assert logged == [event_dict(event) for event in subscription.poll()]
+    assert logged[-1]["event"] == "state_change"
+
+
+def test_verbose_log_is_flushed_at_exit():
+    # Nothing closes the log: the last events must still reach stdout
+    script = ("from game_core import GameCore, PLAYING\n"
+              "game = GameCore(seed=0, verbose=True)\n"
+              "frame = 0\n"
+              "while game.state == PLAYING:\n"
+              "    game.step(frame // 30 % 4)\n"
+              "    frame += 1\n")
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, timeout=60, check=True).stdout
+    game = GameCore(seed=0)
+    play_to_the_end(game)
+    assert game.state == GAME_OVER
+    assert output.rstrip().endswith("Game over!")
+    assert output.count("Ghost collision!") == 3
@@ -0,0 +1,110 @@
+import os
+import random
+
+import pytest
+
+import pathfinding
+from constants import PLAYING
+from game_core import GameCore
+from levels import compile_level, level_from_maze, load_level, parse_level, read_compiled
+
+CLASSIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "levels", "classic.txt")
+
+
+def generated_level(width=40, height=30):
+    game = GameCore(seed=0, maze_size=(width, height))
+    level = level_from_maze(game.maze, game.dots, game.power_pellets, game.pacman_start,
+                            game.ghost_spawns)
+    return game, level
+
+
+def play(level, frames=3000, maze_size=None):
+    """State hash after frames of seeded random turns, resetting on game end"""
+    pathfinding._tables.clear()
+    game = GameCore(seed=3, level=level, maze_size=maze_size)
+    rng = random.Random(0)
+    for frame in range(frames):
+        game.step(rng.randrange(4) if frame % 20 == 0 else None)
+        if game.state != PLAYING:
+            game.reset(3)
+    return game.state_hash()
+
+
+def same_items(game, level):
+    return (bytes(level.dots) == bytes(game.dots.cells)
+            and bytes(level.pellets) == bytes(game.power_pellets.cells))
+
+
+@pytest.mark.parametrize("size", [(40, 30), (61, 47)])
+def test_text_round_trip_keeps_generated_items(size):
+    game, level = generated_level(*size)
+    parsed = parse_level(level.to_text())
+    assert same_items(game, parsed)
+    assert parsed.pacman_start == game.pacman_start
+    assert parsed.ghost_spawns == list(game.ghost_spawns)
+    assert bytes(parsed.maze.cells) == bytes(game.maze.cells)
+
+
+def test_classic_level_matches_generated_maze(tmp_path):
+    game = GameCore(seed=0)
+    level = load_level(CLASSIC, str(tmp_path))
+    assert len(game.dots) == 897
+    assert bytes(level.dots).count(1) == len(game.dots)
+    assert bytes(level.pellets).count(1) == len(game.power_pellets)
+    assert same_items(game, level)
+
+
+def test_classic_level_plays_like_generated_maze(tmp_path):
+    assert play(load_level(CLASSIC, str(tmp_path))) == play(None)
+
+
+def test_compiled_level_plays_like_parsed_level(tmp_path):
+    _, level = generated_level()
+    path = tmp_path / "maze.txt"
+    path.write_text(level.to_text())
+    # The mapped level's ghosts read its stored table, the parsed one's run a BFS
+    assert play(load_level(str(path), str(tmp_path / "cache"))) == play(parse_level(level.to_text()))
+
+
+def test_compiled_round_trip():
+    _, level = generated_level()
+    compiled = read_compiled(compile_level(level, bytes(32)), bytes(32))
+    assert (compiled.width, compiled.height) == (level.width, level.height)
+    assert bytes(compiled.maze.cells) == bytes(level.maze.cells)
+    assert bytes(compiled.dots) == bytes(level.dots)
+    assert bytes(compiled.pellets) == bytes(level.pellets)
+    assert compiled.pacman_cell == level.pacman_cell
+    assert [tuple(spawn) for spawn in compiled.ghost_cells] == level.ghost_cells
+    assert compiled.distances is not None
+    assert read_compiled(compile_level(level, bytes(32)), b"x" * 32) is None
+
+
+def test_inline_spawns_start_empty():
+    level = parse_level("#####\n#P.1#\n#####\n")
+    assert level.pacman_cell == (1, 1)
+    assert level.ghost_cells == [(3, 1, 1)]
+    assert bytes(level.dots) == bytes([0] * 7 + [1] + [0] * 7)
+
+
+def test_spawn_lines_keep_items():
+    level = parse_level("#####\n#o.*#\n#####\n@P 1 1\n@2 2 1\n@1 2 1\n")
+    assert level.pacman_cell == (1, 1)
+    assert level.ghost_cells == [(2, 1, 1), (2, 1, 2)]
+    assert (level.pellets[6], level.dots[7], level.dots[8], level.pellets[8]) == (1, 1, 1, 1)
+    assert parse_level(level.to_text()).to_text() == level.to_text()
+
+
+@pytest.mark.parametrize("text", [
+    "#####\n#P.P#\n#####\n",
+    "#####\n#P..#\n#####\n@P 2 1\n",
+    "#####\n#P..#\n#####\n@1 0 0\n",
+    "#####\n#P..#\n#####\n@1 9 1\n",
+    "#####\n#P..#\n#####\n@x 2 1\n",
+    "#####\n#P..#\n#####\n@1 2\n",
+    "#####\n#...#\n#####\n",
+    "#####\n#P.x#\n#####\n",
+])
+def test_bad_levels_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_level(text)
@@ -0,0 +1,43 @@
+import argparse
+import random
+
+import pytest
+
+from constants import CELL_SIZE, GHOST_SPAWNS, PACMAN_START
+from game_core import PLAYING, GameCore, parse_maze_size
+
+
+def open_cell(game, x, y):
+    cell_x, cell_y = x // CELL_SIZE, y // CELL_SIZE
+    return (0 <= cell_x < game.walk.width and 0 <= cell_y < game.walk.height
+            and game.walk.masks[cell_y * game.walk.width + cell_x] != 0)
+
+
+@pytest.mark.parametrize("size", [(8, 8), (10, 8), (20, 15), (31, 13)])
+def test_small_mazes_play(size):
+    game = GameCore(seed=0, maze_size=size)
+    assert open_cell(game, *game.pacman_start)
+    assert all(open_cell(game, x, y) for x, y, _, _ in game.ghost_spawns)
+    for seed in range(3):
+        game.reset(seed)
+        rng = random.Random(seed)
+        while game.state == PLAYING and game.frame < 2000:
+            game.step(rng.randrange(4) if game.frame % 20 == 0 else None)
+
+
+def test_spawns_that_fit_are_kept():
+    game = GameCore(seed=0, maze_size=(60, 45))
+    assert game.pacman_start == PACMAN_START
+    assert game.ghost_spawns == GHOST_SPAWNS
+
+
+def test_too_small_mazes_are_rejected():
+    with pytest.raises(ValueError):
+        GameCore(seed=0, maze_size=(7, 20))
+
+
+def test_parse_maze_size():
+    assert parse_maze_size("250x180") == (250, 180)
+    for text in ("10x7", "big", "10"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_maze_size(text)
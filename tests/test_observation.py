@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+
+from game_core import PLAYING, GameCore
+from observation import Observation
+
+FACTOR = 4
+
+
+def pool(tensor, factor):
+    channels, height, width = tensor.shape
+    padded = np.zeros((channels, -(-height // factor) * factor, -(-width // factor) * factor),
+                      dtype=tensor.dtype)
+    padded[:, :height, :width] = tensor
+    return padded.reshape(channels, padded.shape[1] // factor, factor,
+                          padded.shape[2] // factor, factor).max(axis=(2, 4))
+
+
+def play(game, observation, steps):
+    rng = random.Random(0)
+    for step in range(steps):
+        if step % 20 == 0:
+            action = rng.randrange(4)
+        game.step(action)
+        if game.state != PLAYING:
+            game.reset()
+        observation.update()
+
+
+def test_dirty_blocks_stay_bounded_without_downsampled():
+    game = GameCore(seed=0)
+    observation = Observation(game, downsample=FACTOR)
+    observation.downsampled()
+    channels, height, width = observation.small.shape
+    rng = random.Random(0)
+    marked = 0
+    for step in range(3000):
+        if step % 20 == 0:
+            action = rng.randrange(4)
+        game.step(action)
+        if game.state != PLAYING:
+            game.reset()
+            observation.update()
+            # The reset rebuilt everything; start tracking blocks again
+            observation.downsampled()
+            continue
+        observation.update()
+        marked = max(marked, len(observation.dirty))
+    assert 0 < marked <= channels * height * width
+
+
+def test_downsampled_matches_pooling_after_long_gap():
+    game = GameCore(seed=0)
+    observation = Observation(game, downsample=FACTOR)
+    observation.downsampled()
+    play(game, observation, 500)
+    assert np.array_equal(observation.downsampled(), pool(observation.tensor, FACTOR))
+    assert not observation.dirty
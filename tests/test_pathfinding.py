@@ -0,0 +1,31 @@
+import pathfinding
+from game_core import GameCore
+from movement import Walkability
+
+
+def test_cache_keeps_only_recent_mazes():
+    for width in range(20, 32):
+        GameCore(seed=0, maze_size=(width, 20))
+    assert len(pathfinding._tables) <= pathfinding.MAX_CACHED_TABLES
+
+
+def test_table_lives_on_the_walkability():
+    game = GameCore(seed=0)
+    table = game.ghost_ai.table
+    assert game.walk.table is table
+    game.reset(1)
+    assert game.ghost_ai.table is table
+
+
+def test_games_on_one_maze_share_a_table():
+    first = GameCore(seed=0, maze_size=(33, 21))
+    second = GameCore(seed=1, maze_size=(33, 21))
+    assert first.ghost_ai.table is second.ghost_ai.table
+    assert first.walk is not second.walk
+
+
+def test_evicted_table_stays_with_its_maze():
+    walk = Walkability(GameCore(seed=0, maze_size=(34, 21)).maze)
+    table = pathfinding.distance_table(walk)
+    pathfinding._tables.clear()
+    assert pathfinding.distance_table(walk) is table
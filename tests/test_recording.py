@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from game_core import GAME_OVER, PLAYING, GameCore
+from recording import Recording
+from replay import replay
+
+
+def play_out(game, seed, max_frames=20000):
+    """Steer randomly every half second until the game ends"""
+    rng = random.Random(seed)
+    while game.state == PLAYING and game.frame < max_frames:
+        game.step(rng.randrange(4) if game.frame % 30 == 0 else None)
+
+
+def test_round_trip():
+    recording = Recording(7, [[0, 3], [2, 200], [1, 1]], bytes(range(16)), (250, 180))
+    loaded = Recording.from_bytes(recording.to_bytes())
+    assert loaded.seed == 7
+    assert loaded.maze_size == (250, 180)
+    assert loaded.runs == recording.runs
+    assert loaded.final_hash == recording.final_hash
+
+
+def test_version_1_recordings_still_load():
+    data = b"PMR1" + bytes([7, 3]) + bytes(range(16)) + bytes([(3 << 2) | 1])
+    loaded = Recording.from_bytes(data)
+    assert (loaded.seed, loaded.maze_size, loaded.runs) == (7, None, [[1, 3]])
+
+
+def test_truncated_recording_is_rejected():
+    data = Recording(7, [[0, 300]], bytes(16), (40, 30)).to_bytes()
+    with pytest.raises(ValueError):
+        Recording.from_bytes(data[:-1])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_replay_matches(seed):
+    game = GameCore(seed=seed, record=True)
+    play_out(game, seed)
+    recording = Recording.from_bytes(game.finish_recording().to_bytes())
+    replayed, matched = replay(recording)
+    assert matched
+    assert (replayed.score, replayed.lives, replayed.state) == (game.score, game.lives, game.state)
+
+
+def test_replay_on_a_resized_maze():
+    game = GameCore(seed=4, record=True, maze_size=(60, 45))
+    play_out(game, 4, max_frames=1500)
+    recording = Recording.from_bytes(game.finish_recording().to_bytes())
+    assert recording.maze_size == (60, 45)
+    replayed, matched = replay(recording)
+    assert matched
+    assert replayed.maze.width == 60
+
+
+def test_replay_of_unfinished_game_matches():
+    game = GameCore(seed=3, record=True)
+    for frame in range(300):
+        game.step(frame // 40 % 4)
+    assert game.state == PLAYING
+    _, matched = replay(game.finish_recording())
+    assert matched
+
+
+def test_input_after_game_over_keeps_the_hash():
+    game = GameCore(seed=0, record=True)
+    play_out(game, 0)
+    assert game.state == GAME_OVER
+    for direction in (1, 2, 3, 0, 2):
+        game.step(direction)
+    _, matched = replay(game.finish_recording())
+    assert matched
+
+
+def test_keys_pressed_after_game_over_replay(tmp_path):
+    pytest.importorskip("pygame")
+    from pac_man import Game
+
+    path = str(tmp_path / "game.pmr")
+    game = Game(seed=0, record_path=path, verbose=False)
+    play_out(game, 0)
+    assert game.state == GAME_OVER
+    for direction in (1, 2, 3):
+        game.inputs.push(direction)
+        game.update()
+    game.save_recording()
+    _, matched = replay(Recording.load(path))
+    assert matched
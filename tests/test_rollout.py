@@ -0,0 +1,55 @@
+from multiprocessing import Pool, shared_memory
+
+import rollout
+from game_core import GameCore
+from levels import compile_level
+from rollout import RandomTurns, Summary, default_level, play_episode, rollouts
+
+SEEDS = range(6)
+
+
+def test_default_level_plays_like_game_core():
+    level_game = GameCore(seed=0, level=default_level())
+    game = GameCore(seed=0)
+    for seed in SEEDS:
+        assert play_episode(level_game, seed) == play_episode(game, seed)
+
+
+def test_workers_match_single_process():
+    game = GameCore(seed=0)
+    expected = sorted(play_episode(game, seed) for seed in SEEDS)
+    results = [result for batch in rollouts(SEEDS, workers=2, batch_size=2)
+               for result in batch]
+    assert sorted(results) == expected
+
+
+def test_summary_counts_episodes():
+    game = GameCore(seed=0)
+    summary = Summary()
+    summary.add([play_episode(game, seed, RandomTurns, max_steps=100) for seed in SEEDS])
+    assert summary.episodes == len(SEEDS)
+    assert summary.steps.high <= 100
+
+
+def worker_table(_):
+    """Whether this worker's distances are read from the shared block"""
+    memory, game, _, _ = rollout._worker
+    play_episode(game, 0, max_steps=500)
+    table = game.ghost_ai.table
+    return table.distances is not None and table.distances.obj is memory.buf.obj
+
+
+def test_workers_read_the_shared_tables():
+    level = default_level()
+    # A parent that has played (and compiled) on the maze holds its own table
+    play_episode(GameCore(seed=0), 0, max_steps=500)
+    data = compile_level(level, bytes(32))
+    memory = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        memory.buf[:len(data)] = data
+        with Pool(2, rollout.init_worker, (memory.name, RandomTurns, 500)) as pool:
+            shared = pool.map(worker_table, range(4), chunksize=1)
+    finally:
+        memory.close()
+        memory.unlink()
+    assert shared == [True] * 4
@@ -0,0 +1,106 @@
+import asyncio
+import random
+
+import pytest
+
+from client import HeadlessClient
+from constants import PLAYING
+from game_core import GameCore
+from server import (KEYFRAME, MAX_MESSAGE, WELCOME, ClientState, DeltaEncoder, GameServer,
+                    ProtocolError, encode_keyframe, encode_welcome, frame_message, read_message)
+
+
+def stream(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def read(data, *args):
+    async def first_message():
+        return await read_message(stream(data), *args)
+
+    return asyncio.run(first_message())
+
+
+def test_codec_mirrors_the_game():
+    game = GameCore(seed=1)
+    encoder = DeltaEncoder(game)
+    client = ClientState()
+    assert client.apply(encode_welcome(game, 60)) == WELCOME
+    assert client.apply(encode_keyframe(game)) == KEYFRAME
+    rng = random.Random(0)
+    restarts = 0
+    for tick in range(3000):
+        if game.state != PLAYING:
+            # A restart resyncs the encoder and sends a keyframe
+            game.reset(tick)
+            encoder.sync(game)
+            client.apply(encode_keyframe(game))
+            restarts += 1
+        if tick % 20 == 0:
+            game.pacman.next_direction = rng.randrange(4)
+        game.update()
+        client.apply(encoder.encode())
+        assert client.matches(game)
+    assert restarts > 0
+    assert bytes(client.maze) == bytes(game.maze.cells)
+
+
+def test_messages_round_trip():
+    assert read(frame_message(b"\x10\x02")) == b"\x10\x02"
+    big = bytes([KEYFRAME]) + bytes(5000)
+    assert read(frame_message(big) + frame_message(b"\x11"), len(big)) == big
+
+
+def test_empty_message_is_rejected():
+    with pytest.raises(ProtocolError):
+        read(b"\x00\x10\x02")
+    with pytest.raises(ProtocolError):
+        ClientState().apply(b"")
+
+
+def test_oversized_message_is_rejected_before_reading():
+    # Only the length prefix is sent: the limit trips without waiting for a body
+    header = frame_message(bytes(MAX_MESSAGE + 1))[:3]
+    with pytest.raises(ProtocolError):
+        read(header)
+    with pytest.raises(ProtocolError):
+        read(b"\xff" * 10)
+
+
+def test_server_drops_a_client_breaking_the_framing():
+    async def scenario():
+        server = await GameServer(GameCore(seed=1)).start(port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        assert (await read_message(reader, 1 << 20))[0] == WELCOME
+        writer.write(b"\x00")
+        with pytest.raises((asyncio.IncompleteReadError, ConnectionError)):
+            while True:
+                await read_message(reader, 1 << 20)
+        count = len(server.connections)
+        writer.close()
+        await server.close()
+        return count
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_clients_match_the_server():
+    async def scenario():
+        server = await GameServer(GameCore(seed=1), keyframe_interval=50).start(port=0)
+        clients = [await HeadlessClient().connect(port=server.port) for _ in range(3)]
+        clients[0].steer(1)
+        await server.run(ticks=120)
+        for _ in range(100):
+            if all(client.state.frame == server.game.frame for client in clients):
+                break
+            await asyncio.sleep(0.02)
+        matched = [client.state.matches(server.game) for client in clients]
+        for client in clients:
+            await client.close()
+        await server.close()
+        return matched
+
+    assert asyncio.run(scenario()) == [True, True, True]
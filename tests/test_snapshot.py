@@ -0,0 +1,59 @@
+import copy
+import random
+
+from constants import GAME_OVER, PLAYING
+from game_core import GameCore
+
+DEPTH = 200
+
+
+def play(game, actions):
+    for action in actions:
+        game.step(action)
+    return game.state_hash()
+
+
+def test_restore_after_rollouts_matches_straight_play():
+    rng = random.Random(0)
+    game = GameCore(seed=1)
+    play(game, [rng.randrange(4) for _ in range(300)])
+    root = game.snapshot()
+    actions = [rng.randrange(4) for _ in range(DEPTH)]
+
+    # Reference: continue the original game without ever rewinding
+    reference = play(copy.deepcopy(game), actions)
+    for _ in range(20):
+        game.restore(root)
+        play(game, [rng.randrange(4) for _ in range(DEPTH)])
+    game.restore(root)
+    assert play(game, actions) == reference
+
+
+def test_restore_rewinds_state_and_items():
+    game = GameCore(seed=2)
+    play(game, [0] * 50)
+    root = game.snapshot()
+    before = (game.frame, game.score, game.lives, len(game.dots), game.state_hash())
+    play(game, [1, 2, 3, 0] * 100)
+    game.restore(root)
+    assert (game.frame, game.score, game.lives, len(game.dots), game.state_hash()) == before
+
+
+def test_restore_across_game_over():
+    game = GameCore(seed=0)
+    root = game.snapshot()
+    rng = random.Random(0)
+    while game.state == PLAYING:
+        game.step(rng.randrange(4) if game.frame % 30 == 0 else None)
+    assert game.state == GAME_OVER
+    game.restore(root)
+    assert game.state == PLAYING
+    assert game.lives == root.lives
+    assert game.state_hash() == GameCore(seed=0).state_hash()
+
+
+def test_restore_bumps_epoch():
+    game = GameCore(seed=3)
+    epoch = game.epoch
+    game.restore(game.snapshot())
+    assert game.epoch == epoch + 1
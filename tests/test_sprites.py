@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from constants import GHOST_SPAWNS
+from movement import SUBPIXELS
+from pac_man import Ghost, Pacman
+from sprites import SpriteAtlas
+
+FRAMES = 1500
+SIZE = (64, 64)
+
+
+def interpolated_actor(rng, index):
+    x = rng.randrange(24, 40) + rng.random()
+    y = rng.randrange(24, 40) + rng.random()
+    if index % 5 == 0:
+        actor = Pacman(x, y)
+        actor.direction = rng.randrange(4)
+        actor.mouth_animation = rng.random() * 10
+    else:
+        _, _, color, name = GHOST_SPAWNS[index % len(GHOST_SPAWNS)]
+        actor = Ghost(x, y, color, name)
+        actor.body_animation = rng.random() * 10
+    # Part way through a tick of up to two pixels in any direction
+    actor.remember()
+    actor.fx += rng.randint(-2 * SUBPIXELS, 2 * SUBPIXELS)
+    actor.fy += rng.randint(-2 * SUBPIXELS, 2 * SUBPIXELS)
+    actor.blend(rng.random())
+    return actor
+
+
+def test_atlas_matches_direct_drawing():
+    atlas = SpriteAtlas(Pacman, Ghost, [color for _, _, color, _ in GHOST_SPAWNS])
+    direct = pygame.Surface(SIZE)
+    blitted = pygame.Surface(SIZE)
+    rng = random.Random(0)
+    differing = 0
+    for index in range(FRAMES):
+        actor = interpolated_actor(rng, index)
+        direct.fill((0, 0, 0))
+        blitted.fill((0, 0, 0))
+        actor.draw(direct)
+        if isinstance(actor, Pacman):
+            atlas.draw_pacman(blitted, actor)
+        else:
+            atlas.draw_ghost(blitted, actor)
+        differing += bytes(direct.get_buffer()) != bytes(blitted.get_buffer())
+    assert differing == 0
@@ -0,0 +1,85 @@
+"""Chunked, pre-rendered maze tiles for mazes larger than the screen.
+
+The maze is split into square chunks of cells. A chunk is drawn to its own
+surface the first time it scrolls into view and kept in an LRU cache, so a
+frame only blits the handful of chunks under the camera no matter how big
+the maze is. Eaten dots are patched into cached chunks one cell at a time.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from constants import CELL_SIZE
+
+CHUNK_CELLS = 16
+CHUNK_CAPACITY = 96
+
+
+class ChunkCache:
+    """Lazily rendered chunk surfaces of a maze.
+
+    draw_cell(surface, cell_x, cell_y, left, top) paints one cell (wall, dot
+    or nothing) at (left, top) of a surface already cleared to the floor.
+    """
+
+    def __init__(self, width, height, draw_cell, floor=(0, 0, 0),
+                 chunk_cells=CHUNK_CELLS, capacity=CHUNK_CAPACITY):
+        self.width = width
+        self.height = height
+        self.draw_cell = draw_cell
+        self.floor = floor
+        self.chunk_cells = chunk_cells
+        self.chunk_size = chunk_cells * CELL_SIZE
+        self.capacity = capacity
+        self.chunks = OrderedDict()
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def clear(self):
+        self.chunks.clear()
+
+    def chunk(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self.render(chunk_x, chunk_y)
+            self.chunks[key] = surface
+            if len(self.chunks) > self.capacity:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def render(self, chunk_x, chunk_y):
+        surface = pygame.Surface((self.chunk_size, self.chunk_size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(self.floor)
+        first_x = chunk_x * self.chunk_cells
+        first_y = chunk_y * self.chunk_cells
+        for cell_y in range(first_y, min(first_y + self.chunk_cells, self.height)):
+            for cell_x in range(first_x, min(first_x + self.chunk_cells, self.width)):
+                self.draw_cell(surface, cell_x, cell_y,
+                               (cell_x - first_x) * CELL_SIZE, (cell_y - first_y) * CELL_SIZE)
+        return surface
+
+    def redraw_cell(self, cell_x, cell_y):
+        """Repaint one cell of its chunk if that chunk is cached"""
+        surface = self.chunks.get((cell_x // self.chunk_cells, cell_y // self.chunk_cells))
+        if surface is not None:
+            left = (cell_x % self.chunk_cells) * CELL_SIZE
+            top = (cell_y % self.chunk_cells) * CELL_SIZE
+            surface.fill(self.floor, (left, top, CELL_SIZE, CELL_SIZE))
+            self.draw_cell(surface, cell_x, cell_y, left, top)
+
+    def draw(self, screen, camera_x, camera_y):
+        """Blit the chunks under a camera whose top-left is (camera_x, camera_y)"""
+        view_width, view_height = screen.get_size()
+        size = self.chunk_size
+        last_x = min((camera_x + view_width - 1) // size, (self.width - 1) // self.chunk_cells)
+        last_y = min((camera_y + view_height - 1) // size, (self.height - 1) // self.chunk_cells)
+        for chunk_y in range(max(0, camera_y // size), last_y + 1):
+            for chunk_x in range(max(0, camera_x // size), last_x + 1):
+                screen.blit(self.chunk(chunk_x, chunk_y),
+                            (chunk_x * size - camera_x, chunk_y * size - camera_y))